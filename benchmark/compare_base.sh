@@ -0,0 +1,22 @@
+#!/bin/sh
+# Compares the microbenchmarks of the working tree against those of REF, both measured on this machine.
+# The exit status is that of `microbench.py --baseline`: 1 if anything is slower than REF beyond the tolerance.
+#
+# Usage: benchmark/compare_base.sh [REF] [microbench.py options...]   (REF defaults to origin/master)
+set -eu
+
+ref="${1:-origin/master}"
+[ $# -gt 0 ] && shift
+
+root="$(cd "$(dirname "$0")/.." && pwd)"
+base="$(mktemp -d)"
+trap 'git -C "$root" worktree remove --force "$base"; rm -f "$base.json"' EXIT
+
+git -C "$root" worktree add --detach "$base" "$ref" > /dev/null
+
+# REF is measured by this version of the suite, so that both sides run the same benchmarks
+mkdir -p "$base/benchmark"
+cp "$root/benchmark/microbench.py" "$base/benchmark/microbench.py"
+
+python "$base/benchmark/microbench.py" --save-baseline "$base.json" "$@" > /dev/null
+python "$root/benchmark/microbench.py" --baseline "$base.json" "$@"
@@ -0,0 +1,313 @@
+#!/usr/bin/env python
+# coding: UTF-8
+
+"""
+Measures the Python overhead of the library per operation, in nanoseconds.
+
+Usage: `python benchmark/microbench.py [-h] [--target FILE] [--repeat N] [--min-time SEC] [--only NAME[,...]]
+[--output FILE] [--save-baseline] [--baseline FILE] [--tolerance RATIO] [--ignore-env]`
+
+I/O runs against a small file in tmpfs (`/dev/shm` if present), so the kernel side of each request is as cheap
+as it gets and the timings are dominated by Python. Each benchmark is repeated `--repeat` times and the fastest
+run is reported, like :mod:`timeit`.
+
+Results are printed as JSON. With `--baseline`, they are compared against a stored baseline
+(`benchmark/microbench_baseline.json` by default) and the exit status is 1 if any benchmark is slower than
+the baseline by more than `--tolerance`. `--save-baseline` overwrites the baseline with the results instead.
+
+Timings are only comparable on the same machine and Python version. The environment is stored with the results,
+and a baseline of another Python version, implementation, architecture or CPU is refused with exit status 2
+unless `--ignore-env` is given. The stored baseline is therefore only a reference for the machine it was taken on.
+To guard a change, `benchmark/compare_base.sh REF` measures REF and the working tree on the same machine and
+compares them, which CI reports for pull requests without failing the build. Refresh the stored baseline with `--save-baseline`
+after an intended change of the hot path.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linux_aio_bind import IOCBCMD  # noqa: E402
+
+from linux_aio import AIOContext, ReadBlock, ReadVBlock, WriteBlock  # noqa: E402
+
+_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'microbench_baseline.json')
+_BATCH_SIZES = (1, 4, 16, 64, 256, 1024)
+_BLOCK_SIZE = 4096
+
+# a benchmark runs `loops` operations and returns the nanoseconds they took
+Benchmark = Callable[[int], int]
+
+
+def bench_construct_read(fd: int) -> Benchmark:
+    buffer = bytearray(_BLOCK_SIZE)
+
+    def run(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            ReadBlock(fd, buffer)
+        return time.perf_counter_ns() - start
+
+    return run
+
+
+def bench_construct_write(fd: int) -> Benchmark:
+    buffer = bytearray(_BLOCK_SIZE)
+
+    def run(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            WriteBlock(fd, buffer)
+        return time.perf_counter_ns() - start
+
+    return run
+
+
+def bench_construct_readv(fd: int) -> Benchmark:
+    buffers = tuple(bytearray(_BLOCK_SIZE // 4) for _ in range(4))
+
+    def run(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            ReadVBlock(fd, buffers)
+        return time.perf_counter_ns() - start
+
+    return run
+
+
+def bench_change_cmd(fd: int) -> Benchmark:
+    block = ReadBlock(fd, bytearray(_BLOCK_SIZE))
+
+    def run(loops: int) -> int:
+        nonlocal block
+        start = time.perf_counter_ns()
+        for _ in range(loops >> 1):
+            block = block.change_cmd(IOCBCMD.PWRITE).change_cmd(IOCBCMD.PREAD)
+        return time.perf_counter_ns() - start
+
+    return run
+
+
+def _wait_ring(ctx: AIOContext, count: int) -> None:
+    """
+    waits until `count` completions are in the ring, so reaping them does not block.
+    Versions without the mapped ring, which `compare_base.sh` may measure, do not wait.
+    """
+    ring = getattr(ctx, '_ring', None)
+    while ring is not None and (ring.tail - ring.head) % ring.nr < count:
+        time.sleep(0)
+
+
+def bench_submit(fd: int, batch_size: int) -> Benchmark:
+    """`io_submit` of `batch_size` blocks, per block"""
+    blocks = tuple(ReadBlock(fd, bytearray(_BLOCK_SIZE)) for _ in range(batch_size))
+
+    def run(loops: int) -> int:
+        elapsed = 0
+        with AIOContext(batch_size) as ctx:
+            for _ in range(max(loops // batch_size, 1)):
+                start = time.perf_counter_ns()
+                ctx.submit(*blocks)
+                elapsed += time.perf_counter_ns() - start
+
+                reaped = 0
+                while reaped < batch_size:
+                    reaped += len(ctx.get_events(batch_size - reaped, batch_size))
+        return elapsed * loops // (max(loops // batch_size, 1) * batch_size)
+
+    return run
+
+
+def bench_get_events(fd: int, batch_size: int) -> Benchmark:
+    """decoding of `batch_size` completions that are already in the ring, per completion"""
+    blocks = tuple(ReadBlock(fd, bytearray(_BLOCK_SIZE)) for _ in range(batch_size))
+
+    def run(loops: int) -> int:
+        elapsed = 0
+        with AIOContext(batch_size) as ctx:
+            for _ in range(max(loops // batch_size, 1)):
+                ctx.submit(*blocks)
+                _wait_ring(ctx, batch_size)
+
+                start = time.perf_counter_ns()
+                reaped = 0
+                while reaped < batch_size:
+                    reaped += len(ctx.get_events(batch_size - reaped, batch_size))
+                elapsed += time.perf_counter_ns() - start
+        return elapsed * loops // (max(loops // batch_size, 1) * batch_size)
+
+    return run
+
+
+def _reaped_event(fd: int):
+    with AIOContext(1) as ctx:
+        # kept alive until it is reaped
+        block = ReadBlock(fd, bytearray(_BLOCK_SIZE))
+        ctx.submit(block)
+        return ctx.get_events(1, 1)[0]
+
+
+def bench_event_buffer(fd: int) -> Benchmark:
+    event = _reaped_event(fd)
+
+    def run(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            event.buffer
+        return time.perf_counter_ns() - start
+
+    return run
+
+
+def bench_event_stripped_buffer(fd: int) -> Benchmark:
+    event = _reaped_event(fd)
+
+    def run(loops: int) -> int:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            event.stripped_buffer()
+        return time.perf_counter_ns() - start
+
+    return run
+
+
+def benchmarks(fd: int) -> Dict[str, Benchmark]:
+    result = {
+        'construct_read': bench_construct_read(fd),
+        'construct_write': bench_construct_write(fd),
+        'construct_readv': bench_construct_readv(fd),
+        'change_cmd': bench_change_cmd(fd),
+    }
+    for batch_size in _BATCH_SIZES:
+        result[f'submit_{batch_size}'] = bench_submit(fd, batch_size)
+    for batch_size in _BATCH_SIZES:
+        result[f'get_events_{batch_size}'] = bench_get_events(fd, batch_size)
+    result['event_buffer'] = bench_event_buffer(fd)
+    result['event_stripped_buffer'] = bench_event_stripped_buffer(fd)
+    return result
+
+
+def measure(benchmark: Benchmark, repeat: int, min_time: float) -> float:
+    """the fastest of `repeat` runs in nanoseconds per operation, with enough loops to last `min_time` seconds"""
+    loops = 1
+    while True:
+        elapsed = benchmark(loops)
+        if elapsed >= min_time * 1e9 or loops >= 1 << 24:
+            break
+        loops <<= 1
+
+    return min([elapsed] + [benchmark(loops) for _ in range(repeat - 1)]) / loops
+
+
+def _cpu_model() -> str:
+    try:
+        with open('/proc/cpuinfo') as fp:
+            for line in fp:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor()
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'cpu': _cpu_model(),
+        'kernel': platform.release(),
+    }
+
+
+_COMPARABLE_FIELDS = ('python', 'implementation', 'machine', 'cpu')
+
+
+def mismatches(current: Dict[str, str], baseline: Dict[str, str]) -> List[str]:
+    """fields of the environment that differ between `current` and `baseline`, which make their timings incomparable"""
+    return [field for field in _COMPARABLE_FIELDS if current.get(field) != baseline.get(field)]
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """names of benchmarks that are slower than `baseline` by more than `tolerance`"""
+    return [name for name, value in results.items() if name in baseline and value > baseline[name] * (1 + tolerance)]
+
+
+def _target_dir() -> Optional[str]:
+    return '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def main(argv: Iterable[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', help='file to read from (default: a temporary file in /dev/shm)')
+    parser.add_argument('--repeat', type=int, default=5, help='runs of each benchmark (default: 5)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds of each run (default: 0.05)')
+    parser.add_argument('--only', type=lambda value: value.split(','), help='names of benchmarks to run')
+    parser.add_argument('--output', help='file to write the results to (default: stdout)')
+    parser.add_argument('--baseline', nargs='?', const=_BASELINE, help=f'compare against (default: {_BASELINE})')
+    parser.add_argument('--save-baseline', nargs='?', const=_BASELINE, help='write the results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown ratio (default: 0.25)')
+    parser.add_argument('--ignore-env', action='store_true',
+                        help='compare against a baseline taken in another environment')
+    args = parser.parse_args(argv)
+
+    if args.target is None:
+        fd, path = tempfile.mkstemp(prefix='linux_aio_microbench_', dir=_target_dir())
+        os.unlink(path)
+        os.write(fd, os.urandom(_BLOCK_SIZE))
+    else:
+        fd = os.open(args.target, os.O_RDONLY)
+
+    try:
+        selected = benchmarks(fd)
+        if args.only:
+            selected = {name: benchmark for name, benchmark in selected.items() if name in args.only}
+        results = {name: round(measure(benchmark, args.repeat, args.min_time), 1)
+                   for name, benchmark in selected.items()}
+    finally:
+        os.close(fd)
+
+    report = {'unit': 'ns/op', **environment(), 'results': results}
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as fp:
+            fp.write(text + '\n')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as fp:
+            fp.write(text + '\n')
+
+    if args.baseline:
+        with open(args.baseline) as fp:
+            baseline_report = json.load(fp)
+        baseline = baseline_report['results']
+
+        differences = mismatches(report, baseline_report)
+        if differences and not args.ignore_env:
+            for field in differences:
+                print(f'{field}: {report.get(field)!r}, baseline {baseline_report.get(field)!r}', file=sys.stderr)
+            print('the baseline is taken in another environment. '
+                  'refresh it with --save-baseline, or pass --ignore-env to compare anyway', file=sys.stderr)
+            return 2
+
+        regressions = compare(results, baseline, args.tolerance)
+        for name in regressions:
+            print(f'{name}: {results[name]} ns/op, baseline {baseline[name]} ns/op', file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
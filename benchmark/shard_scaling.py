@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# coding: UTF-8
+
+"""
+Measures random read IOPS of :class:`linux_aio.ShardedEngine` from 1 to N shards.
+
+Usage: `python benchmark/shard_scaling.py [-h] [--size SIZE] [--block-size SIZE] [--depth N] [--duration SEC]
+[--max-shards N] [--direct] [--numa] FILE`
+
+`FILE` is created with random contents if it does not exist.
+"""
+
+import argparse
+import mmap
+import os
+import random
+import sys
+import time
+from concurrent.futures import wait
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linux_aio import BufferArena, ReadBlock, ShardedEngine  # noqa: E402
+from linux_aio.copy import parse_size  # noqa: E402
+
+
+def _prepare(path: str, size: int) -> None:
+    if os.path.exists(path) and os.path.getsize(path) >= size:
+        return
+
+    with open(path, 'wb') as fp:
+        for _ in range(0, size, 1 << 20):
+            fp.write(os.urandom(1 << 20))
+
+
+def run(path: str, shards: int, block_size: int, depth: int, duration: float, direct: bool, numa: bool) -> float:
+    """returns IOPS of random reads of `block_size` with `depth` reads in flight on each shard"""
+    fd = os.open(path, os.O_RDONLY | (os.O_DIRECT if direct else 0))
+    blocks_in_file = os.fstat(fd).st_size // block_size
+    in_flight = shards * depth
+
+    arena = BufferArena({block_size: in_flight})
+    blocks = [ReadBlock(fd, arena.acquire(block_size)) for _ in range(in_flight)]
+
+    # spread reads of the single file over every shard
+    engine = ShardedEngine(shards, depth, router=lambda block: block.offset // block_size, numa=numa)
+    ops = 0
+
+    try:
+        start = time.perf_counter()
+        deadline = start + duration
+
+        while time.perf_counter() < deadline:
+            for block in blocks:
+                block.offset = random.randrange(blocks_in_file) * block_size
+
+            wait(engine.submit_many(blocks))
+            ops += len(blocks)
+
+        elapsed = time.perf_counter() - start
+
+    finally:
+        engine.close()
+        del blocks
+        arena.close()
+        os.close(fd)
+
+    return ops / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file')
+    parser.add_argument('--size', type=parse_size, default=256 << 20, help='size of FILE (default: 256M)')
+    parser.add_argument('--block-size', type=parse_size, default=mmap.PAGESIZE)
+    parser.add_argument('--depth', type=int, default=32, help='reads in flight on each shard (default: 32)')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds for each shard count (default: 3)')
+    parser.add_argument('--max-shards', type=int, default=len(os.sched_getaffinity(0)))
+    parser.add_argument('--direct', action='store_true', help='bypass the page cache with O_DIRECT')
+    parser.add_argument('--numa', action='store_true', help='pin shards to NUMA nodes')
+    args = parser.parse_args()
+
+    _prepare(args.file, args.size)
+
+    print(f'{"shards":>6} {"IOPS":>12} {"MiB/s":>10} {"scaling":>8}')
+
+    base = None
+    for shards in range(1, args.max_shards + 1):
+        iops = run(args.file, shards, args.block_size, args.depth, args.duration, args.direct, args.numa)
+        base = base or iops
+        print(f'{shards:>6} {iops:>12.0f} {iops * args.block_size / (1 << 20):>10.1f} {iops / base:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
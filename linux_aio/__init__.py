@@ -3,4 +3,32 @@
 # noinspection PyUnresolvedReferences
 from .aio_context import AIOContext
 # noinspection PyUnresolvedReferences
-from .block import FDsyncBlock, FsyncBlock, PollBlock, ReadBlock, ReadVBlock, WriteBlock, WriteVBlock
+from .aio_event import AIOEventBuffer
+# noinspection PyUnresolvedReferences
+from .arena import BufferArena
+# noinspection PyUnresolvedReferences
+from .async_context import AsyncAIOContext
+# noinspection PyUnresolvedReferences
+from .batch import BlockBatch
+# noinspection PyUnresolvedReferences
+from .block import BlockPool, FDsyncBlock, FsyncBlock, PollBlock, ReadBlock, ReadVBlock, WriteBlock, WriteVBlock
+# noinspection PyUnresolvedReferences
+from .cache import BlockCache
+# noinspection PyUnresolvedReferences
+from .coalesce import Coalescer
+# noinspection PyUnresolvedReferences
+from .engine import ShardedEngine
+# noinspection PyUnresolvedReferences
+from .future_context import FutureAIOContext
+# noinspection PyUnresolvedReferences
+from .hooks import RecordingHook, TraceHook, TraceRecord
+# noinspection PyUnresolvedReferences
+from .nowait import NowaitSubmitter
+# noinspection PyUnresolvedReferences
+from .registry import FileRegistry
+# noinspection PyUnresolvedReferences
+from .selector import AIOSelector
+# noinspection PyUnresolvedReferences
+from .stats import AIOStats, LogHistogram, StatsSnapshot
+# noinspection PyUnresolvedReferences
+from .stream import StreamReader
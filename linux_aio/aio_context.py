@@ -2,33 +2,158 @@
 
 from __future__ import annotations
 
-from ctypes import c_long, c_uint, pointer
+import errno
+import threading
+import time
+from collections import deque
+from ctypes import Array, Structure, addressof, c_long, c_uint, c_void_p, memmove, pointer, py_object, sizeof
+from heapq import heapify, heappop, heappush
 
+from itertools import count, islice
 from linux_aio_bind import (
-    IOEvent, Timespec, aio_context_t, create_c_array, io_cancel, io_destroy, io_getevents, io_setup, io_submit, iocb_p
+    IOCB, IOCBCMD, IOEvent, Timespec, aio_context_t, create_c_array, io_cancel, io_destroy, io_getevents, io_setup,
+    io_submit
 )
 from types import TracebackType
-from typing import Optional, Tuple, Type
+from typing import (
+    Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Set, TYPE_CHECKING, Tuple, Type
+)
 
-from .aio_event import AIOEvent
+from .aio_event import AIOEvent, AIOEventBuffer
 from .block import AIOBlock
+from .hooks import TraceHook, TraceRecord, _dispatch
+from .registry import FileHandle, FileRegistry
+from .stats import AIOStats
+
+if TYPE_CHECKING:
+    from .batch import BlockBatch
+
+_AIO_RING_MAGIC = 0xa10a10a1
+_IO_EVENT_SIZE = sizeof(IOEvent)
+
+
+class _AIORing(Structure):
+    """
+    Header of the completion ring that the kernel maps at the address of `aio_context_t` (`struct aio_ring`).
+    `io_event` entries follow right after the header.
+
+    .. versionadded:: 0.5.0
+    """
+    _fields_ = (
+        ('id', c_uint),
+        ('nr', c_uint),
+        ('head', c_uint),
+        ('tail', c_uint),
+        ('magic', c_uint),
+        ('compat_features', c_uint),
+        ('incompat_features', c_uint),
+        ('header_length', c_uint),
+    )
 
 
 class AIOContext:
     """
     .. versionadded:: 0.2.0
+    .. versionchanged:: 0.5.0
+        Completions that are already in the ring are reaped from userspace without `io_getevents`.
+        Blocks can be queued with :meth:`enqueue` and submitted with :meth:`flush`.
+        Completion callbacks of blocks are dispatched by :meth:`run_completions`.
+        Completions are mapped back to blocks with a callback, or to every block with `indexed`,
+        through a table of in-flight blocks.
+        Blocks with a :attr:`~linux_aio.block.AIOBlock.timeout_ns` are canceled when their deadline passes.
+        In-flight operations and bytes are counted, and :meth:`flush` admits blocks only within the budgets.
+        Blocks can be submitted from several threads while one thread reaps completions.
+        Latencies and throughput are recorded in :attr:`stats` if the context is created with `stats`.
+        Requests are reported to the :class:`~linux_aio.hooks.TraceHook` installed by :meth:`set_hook`.
+        File handles of blocks are resolved on every submission if the context is created with a `registry`.
     """
-    __slots__ = ('_ctx', '_max_jobs')
+    __slots__ = ('_ctx', '_max_jobs', '_ring', '_iocb_ptrs', '_queue', '_completions', '_indexed', '_slots',
+                 '_free_slots',
+                 '_deadlines', '_deadline_ids', '_deadline_counter', '_stale_deadlines', '_expired',
+                 '_in_flight_ops', '_in_flight_bytes', '_max_in_flight_bytes', '_nbytes', '_lock', '_capacity',
+                 '_waiters',
+                 '_stats', '_hook', '_hook_countdown', '_traced', '_registry')
 
     _ctx: aio_context_t
     _max_jobs: int
+    _ring: Optional[_AIORing]
+    _iocb_ptrs: Array
+    _queue: Deque[AIOBlock]
+    _completions: Optional[AIOEventBuffer]
+    _indexed: bool
+    _slots: List[Optional[AIOBlock]]  # in-flight blocks tagged with slots, indexed by `aio_data`
+    _free_slots: List[int]
+    _deadlines: List[Tuple[int, int, AIOBlock]]  # heap of (deadline, id, block)
+    _deadline_ids: Dict[AIOBlock, int]  # the id of the current deadline of each in-flight block
+    _deadline_counter: Iterator[int]
+    _stale_deadlines: int  # entries in `_deadlines` that are not the current deadline of their blocks
+    _expired: Set[AIOBlock]  # in-flight blocks whose deadline has passed
+    _in_flight_ops: int
+    _in_flight_bytes: int
+    _max_in_flight_bytes: Optional[int]
+    _nbytes: Optional[Dict[int, int]]  # bytes of each in-flight IOCB by its address, if bytes are budgeted
+    _lock: threading.RLock  # guards submissions, the accounting of reaped completions and the slots
+    _capacity: threading.Condition
+    _waiters: int
+    _stats: Optional[AIOStats]
+    _hook: Optional[TraceHook]
+    _hook_countdown: int  # requests to submit until the next one is traced
+    _traced: Dict[int, TraceRecord]  # traced in-flight IOCBs by their addresses
+    _registry: Optional[FileRegistry]
 
-    def __init__(self, max_jobs: int) -> None:
+    def __init__(self,
+                 max_jobs: int,
+                 indexed: bool = False,
+                 max_in_flight_bytes: int = None,
+                 stats: bool = False,
+                 registry: FileRegistry = None) -> None:
+        """
+        :param max_in_flight_bytes: the budget of bytes of in-flight reads and writes, on top of `max_jobs` operations.
+        :param indexed: tag each submitted block with a slot index into a table of in-flight blocks,
+            instead of a pointer to the block. Completions are mapped back to blocks by indexing the table,
+            blocks do not need a reference to themselves, and :attr:`in_flight` is available.
+            :class:`~linux_aio.BlockBatch` es are still tagged with a pointer and are not tracked.
+            Blocks with a :attr:`~linux_aio.block.AIOBlock.callback` are tagged with a slot either way.
+        :param stats: record latencies and counters into :attr:`stats`. Costs a clock read per submission and reap.
+        :param registry: the :class:`~linux_aio.FileRegistry` of the files of submitted blocks.
+            The file descriptor of a block whose file is a :class:`~linux_aio.registry.FileHandle` is refreshed
+            from the handle before each submission, reopening the file if it is evicted.
+            The registry is not closed with the context.
+        """
         self._ctx = aio_context_t()
         self._max_jobs = max_jobs
+        self._ring = None
+        self._queue = deque()
+        self._completions = None
+        self._indexed = indexed
+        self._slots = list()
+        self._free_slots = list()
+        self._deadlines = list()
+        self._deadline_ids = dict()
+        self._deadline_counter = count()
+        self._stale_deadlines = 0
+        self._expired = set()
+        self._in_flight_ops = 0
+        self._in_flight_bytes = 0
+        self._max_in_flight_bytes = max_in_flight_bytes
+        self._nbytes = None if max_in_flight_bytes is None else dict()
+        self._lock = threading.RLock()
+        self._capacity = threading.Condition(self._lock)
+        self._waiters = 0
+        self._stats = AIOStats() if stats else None
+        self._hook = None
+        self._hook_countdown = 1
+        self._traced = dict()
+        self._registry = registry
 
         io_setup(c_uint(max_jobs), pointer(self._ctx))
 
+        self._iocb_ptrs = (c_void_p * max_jobs)()
+
+        ring = _AIORing.from_address(self._ctx.value)
+        if ring.magic == _AIO_RING_MAGIC and ring.incompat_features == 0:
+            self._ring = ring
+
     def __del__(self) -> None:
         self.close()
 
@@ -36,48 +161,789 @@ class AIOContext:
     def closed(self) -> bool:
         return self._ctx.value is 0
 
+    @property
+    def max_jobs(self) -> int:
+        """
+        .. versionadded:: 0.5.0
+        """
+        return self._max_jobs
+
+    @property
+    def stats(self) -> Optional[AIOStats]:
+        """
+        `None` unless the context is created with `stats`.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._stats
+
+    @property
+    def registry(self) -> Optional[FileRegistry]:
+        """
+        .. versionadded:: 0.5.0
+        """
+        return self._registry
+
+    @property
+    def hook(self) -> Optional[TraceHook]:
+        """
+        .. versionadded:: 0.5.0
+        """
+        return self._hook
+
+    def set_hook(self, hook: Optional[TraceHook]) -> None:
+        """
+        Installs `hook` in place of the current one, or uninstalls it with `None`.
+        Requests traced by the previous hook are not reported anymore.
+
+        .. versionadded:: 0.5.0
+        """
+        self._hook = hook
+        self._hook_countdown = 1
+        self._traced.clear()
+
+    # noinspection PyProtectedMember
+    def _trace_submit(self, hook: TraceHook, requests: Iterable[Tuple[Any, IOCB]]) -> None:
+        """reports every `sample_every`-th of submitted `(block, IOCB)` s to `hook`"""
+        countdown = self._hook_countdown
+        now = None
+
+        for block, iocb in requests:
+            countdown -= 1
+            if countdown:
+                continue
+            countdown = hook._sample_every
+
+            if now is None:
+                now = time.monotonic_ns()
+
+            cmd = iocb.aio_lio_opcode
+            if cmd == IOCBCMD.PREADV or cmd == IOCBCMD.PWRITEV:
+                length = sum(io_vector.iov_len for io_vector in block._io_vectors)
+            else:
+                length = iocb.aio_nbytes
+
+            record = TraceRecord(block, iocb.aio_fildes, IOCBCMD(cmd), iocb.aio_offset, length, now)
+            self._traced[addressof(iocb)] = record
+            _dispatch(hook.on_submit, record)
+
+        self._hook_countdown = countdown
+
+    # noinspection PyProtectedMember
+    def _trace_cancel(self, block: AIOBlock) -> None:
+        record = self._traced.get(addressof(block._iocb))
+        if record is not None:
+            record.cancel_ns = time.monotonic_ns()
+            _dispatch(self._hook.on_cancel, record)
+
+    def _trace_complete(self, event_buf, count: int) -> None:
+        traced = self._traced
+        words = memoryview(event_buf).cast('B').cast('q')
+        now = None
+
+        for offset in range(0, count << 2, 4):
+            record = traced.pop(words[offset + 1], None)
+            if record is None:
+                continue
+
+            if now is None:
+                now = time.monotonic_ns()
+            record.complete_ns = now
+            record.res = words[offset + 2]
+            record.res2 = words[offset + 3]
+            _dispatch(self._hook.on_complete, record)
+
+    @property
+    def in_flight_ops(self) -> int:
+        """
+        The number of submitted operations whose completions are not reaped yet.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._in_flight_ops
+
+    @property
+    def in_flight_bytes(self) -> int:
+        """
+        Bytes of in-flight reads and writes. Counted only if `max_in_flight_bytes` is set, and 0 otherwise.
+        Requests of :class:`~linux_aio.BlockBatch` es are not counted.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._in_flight_bytes
+
+    @property
+    def max_in_flight_bytes(self) -> Optional[int]:
+        """
+        .. versionadded:: 0.5.0
+        """
+        return self._max_in_flight_bytes
+
+    def has_capacity(self, ops: int = 1, nbytes: int = 0) -> bool:
+        """
+        Whether `ops` more operations of `nbytes` in total fit in the budgets.
+        A request larger than the bytes budget fits when nothing else is in flight.
+
+        .. versionadded:: 0.5.0
+        """
+        if self._in_flight_ops + ops > self._max_jobs:
+            return False
+
+        max_bytes = self._max_in_flight_bytes
+        return max_bytes is None or self._in_flight_bytes == 0 or self._in_flight_bytes + nbytes <= max_bytes
+
+    def wait_for_capacity(self, ops: int = 1, nbytes: int = 0, timeout: float = None) -> bool:
+        """
+        Blocks until :meth:`has_capacity` and returns `True`, or returns `False` after `timeout` seconds.
+        Capacity is freed when completions are reaped, so another thread has to reap them meanwhile.
+        The capacity may be taken by another submitting thread before this one submits.
+
+        .. versionadded:: 0.5.0
+        """
+        if self.has_capacity(ops, nbytes):
+            return True
+
+        with self._capacity:
+            self._waiters += 1
+            try:
+                return self._capacity.wait_for(lambda: self.has_capacity(ops, nbytes), timeout)
+            finally:
+                self._waiters -= 1
+
+    # noinspection PyProtectedMember
+    @classmethod
+    def _block_nbytes(cls, block: AIOBlock) -> int:
+        iocb = block._iocb
+        cmd = iocb.aio_lio_opcode
+
+        if cmd == IOCBCMD.PREAD or cmd == IOCBCMD.PWRITE:
+            return iocb.aio_nbytes
+        elif cmd == IOCBCMD.PREADV or cmd == IOCBCMD.PWRITEV:
+            return sum(io_vector.iov_len for io_vector in block._io_vectors)
+        else:
+            return 0
+
+    def _on_reaped(self, event_buf, count: int) -> None:
+        """takes `count` completions at the start of `event_buf` off the in-flight counters"""
+        self._in_flight_ops -= count
+
+        nbytes = self._nbytes
+        stats = self._stats
+        if nbytes or stats is not None:
+            raw = memoryview(event_buf).cast('B')
+            words = raw.cast('Q')
+            if nbytes:
+                for offset in range(1, count << 2, 4):
+                    self._in_flight_bytes -= nbytes.pop(words[offset], 0)
+            if stats is not None:
+                # noinspection PyProtectedMember
+                stats._on_complete(words, raw.cast('q'), count, self._in_flight_ops)
+
+        if self._waiters:
+            with self._capacity:
+                self._capacity.notify_all()
+
+        if self._traced:
+            self._trace_complete(event_buf, count)
+
+    @property
+    def indexed(self) -> bool:
+        """
+        .. versionadded:: 0.5.0
+        """
+        return self._indexed
+
+    @property
+    def in_flight(self) -> Optional[Tuple[AIOBlock, ...]]:
+        """
+        Blocks that are submitted and whose completions are not reaped yet. `None` unless the context is `indexed`.
+
+        .. versionadded:: 0.5.0
+        """
+        if not self._indexed:
+            return None
+        return tuple(block for block in self._slots if block is not None)
+
     def close(self) -> None:
         """will block on the completion of all operations that could not be canceled"""
-        if not self.closed:
-            io_destroy(self._ctx)
-            self._ctx = aio_context_t()
+        with self._lock:
+            if not self.closed:
+                self._ring = None
+                io_destroy(self._ctx)
+                self._ctx = aio_context_t()
+
+                self._slots.clear()
+                self._free_slots.clear()
+                self._deadlines.clear()
+                self._deadline_ids.clear()
+                self._stale_deadlines = 0
+                self._expired.clear()
+                self._in_flight_ops = 0
+                self._in_flight_bytes = 0
+                if self._nbytes is not None:
+                    self._nbytes.clear()
+                if self._stats is not None:
+                    # noinspection PyProtectedMember
+                    self._stats._submitted_ns.clear()
+                self._traced.clear()
+
+    @property
+    def expired(self) -> Tuple[AIOBlock, ...]:
+        """
+        Blocks whose deadline has passed and whose completions are not reaped yet.
+        They are canceled, but the kernel may not be able to cancel them (e.g. reads and writes of regular files).
+
+        .. versionadded:: 0.5.0
+        """
+        return tuple(self._expired)
+
+    def _settle(self, block: AIOBlock) -> bool:
+        """forgets the deadline of the reaped `block` and returns whether it is timed out"""
+        self._forget_deadline(block)
+        if self._expired and block in self._expired:
+            self._expired.discard(block)
+            return True
+        return False
+
+    def _forget_deadline(self, block: AIOBlock) -> None:
+        """drops the current deadline of `block`, if any"""
+        if self._deadline_ids and self._deadline_ids.pop(block, None) is not None:
+            self._stale_deadlines += 1
+            self._prune_deadlines()
+
+    def _prune_deadlines(self) -> None:
+        """
+        pops stale entries off the top of the deadline heap, so that waits are cut only at live deadlines
+        and the heap empties once no in-flight block has one, and rebuilds the heap when most of it is stale
+        """
+        deadlines = self._deadlines
+        deadline_ids = self._deadline_ids
+
+        while deadlines and deadline_ids.get(deadlines[0][2]) != deadlines[0][1]:
+            heappop(deadlines)
+            self._stale_deadlines -= 1
+
+        if self._stale_deadlines > len(deadlines) >> 1:
+            deadlines[:] = [entry for entry in deadlines if deadline_ids.get(entry[2]) == entry[1]]
+            heapify(deadlines)
+            self._stale_deadlines = 0
+
+    # noinspection PyProtectedMember
+    def _expire(self, now: int) -> None:
+        """cancels in-flight blocks whose deadlines are earlier than `now`"""
+        with self._lock:
+            deadlines = self._deadlines
+            deadline_ids = self._deadline_ids
+
+            while deadlines and deadlines[0][0] <= now:
+                _, deadline_id, block = heappop(deadlines)
+                if deadline_ids.get(block) != deadline_id:
+                    # completed, or submitted again after the deadline was set
+                    self._stale_deadlines -= 1
+                    continue
+
+                del deadline_ids[block]
+                self._expired.add(block)
+                if self._traced:
+                    self._trace_cancel(block)
+
+                try:
+                    io_cancel(self._ctx, pointer(block._iocb), pointer(IOEvent()))
+                except OSError as err:
+                    # EINPROGRESS: the canceled completion will be reaped from the ring (Linux 4.19 or later)
+                    # EINVAL: the operation can not be canceled or is already completed
+                    if err.errno not in (errno.EINPROGRESS, errno.EINVAL, errno.EAGAIN):
+                        raise
+
+            self._prune_deadlines()
+
+    def _release_slot(self, data: int) -> AIOBlock:
+        """returns the block of `aio_data` of a completion, freeing its slot if it is tagged with one"""
+        slots = self._slots
+
+        if data >= len(slots):
+            return py_object.from_address(data).value
+
+        block = slots[data]
+        slots[data] = None
+        self._free_slots.append(data)
+        return block
 
     # noinspection PyProtectedMember
     def cancel(self, block: AIOBlock) -> AIOEvent:
         if block._deleted:
             raise ValueError(f'{block} can not be used because it has already been transformed into another AIOBlock.')
 
-        result = IOEvent()
+        with self._lock:
+            result = (IOEvent * 1)()
 
-        io_cancel(self._ctx, pointer(block._iocb), pointer(result))
+            if self._traced:
+                self._trace_cancel(block)
 
-        return AIOEvent(result)
+            io_cancel(self._ctx, pointer(block._iocb), result)
+
+            self._on_reaped(result, 1)
+            block = self._release_slot(result[0].data)
+            return AIOEvent(result[0], block, self._settle(block))
 
-    # noinspection PyProtectedMember
     def submit(self, *blocks: AIOBlock) -> int:
+        """
+        Submits `blocks` with one `io_submit` and returns the number of submitted ones.
+
+        .. versionchanged:: 0.5.0
+            Submitted blocks are counted in :attr:`in_flight_ops` and :attr:`in_flight_bytes`,
+            but they are not checked against the budgets, which only :meth:`flush` enforces.
+            Check :meth:`has_capacity` or :meth:`wait_for_capacity` first to stay within them.
+        """
+        return self._submit_blocks(blocks)
+
+    # noinspection PyProtectedMember
+    def _submit_blocks(self, blocks: Sequence[AIOBlock]) -> int:
+        """submits `blocks` with one `io_submit`, freeing slots of blocks that were not accepted"""
+        with self._lock:
+            length = len(blocks)
+            submitted = 0
+            stats = self._stats
+
+            try:
+                try:
+                    submitted = io_submit(self._ctx, c_long(length), self._fill_iocb_ptrs(blocks, length))
+                except BlockingIOError:
+                    if stats is not None:
+                        stats.eagain += 1
+                    raise
+
+                self._in_flight_ops += submitted
+                if stats is not None:
+                    iocbs = ((addressof(block._iocb), block._iocb.aio_lio_opcode) for block in blocks[:submitted])
+                    stats._on_submit(iocbs, length, submitted, self._in_flight_ops)
+
+                hook = self._hook
+                if hook is not None:
+                    self._trace_submit(hook, ((block, block._iocb) for block in blocks[:submitted]))
+                nbytes = self._nbytes
+                if nbytes is not None:
+                    for block in blocks[:submitted]:
+                        block_nbytes = self._block_nbytes(block)
+                        nbytes[addressof(block._iocb)] = block_nbytes
+                        self._in_flight_bytes += block_nbytes
+            finally:
+                if submitted < length:
+                    for block in blocks[submitted:]:
+                        self._forget_deadline(block)
+                        data = block._iocb.aio_data
+                        if data < len(self._slots) and self._slots[data] is block:
+                            self._release_slot(data)
+
+            return submitted
+
+    # noinspection PyProtectedMember
+    def _fill_iocb_ptrs(self, blocks: Iterable[AIOBlock], length: int) -> Array:
+        """
+        writes addresses of IOCBs of `blocks` into the cached pointer array, growing it if needed,
+        and tags each IOCB with the block
+        """
+        iocb_ptrs = self._iocb_ptrs
+        if len(iocb_ptrs) < length:
+            iocb_ptrs = self._iocb_ptrs = (c_void_p * max(length, len(iocb_ptrs) << 1))()
+
+        indexed = self._indexed
+        slots = self._slots
+        free_slots = self._free_slots
+        deadline_ids = self._deadline_ids
+        resolve = self._registry is not None
+        now = None
+
+        for idx, block in enumerate(blocks):
+            if block._deleted:
+                raise ValueError(
+                        f'{block} can not be used because it has already been transformed into another AIOBlock.')
+
+            iocb = block._iocb
+
+            if resolve and type(block._file_obj) is FileHandle:
+                iocb.aio_fildes = block._file_obj.fileno()
+
+            timeout_ns = block._timeout_ns
+            if timeout_ns:
+                if now is None:
+                    now = time.monotonic_ns()
+                if block in deadline_ids:
+                    self._stale_deadlines += 1
+                deadline_id = deadline_ids[block] = next(self._deadline_counter)
+                heappush(self._deadlines, (now + timeout_ns, deadline_id, block))
+            elif deadline_ids:
+                self._forget_deadline(block)
+
+            if not indexed and block._callback is None:
+                py_obj = block._py_obj
+                if py_obj is None:
+                    py_obj = block._py_obj = py_object(block)
+                iocb.aio_data = addressof(py_obj)
+            else:
+                if free_slots:
+                    data = free_slots.pop()
+                    slots[data] = block
+                else:
+                    data = len(slots)
+                    slots.append(block)
+                iocb.aio_data = data
+
+            iocb_ptrs[idx] = addressof(iocb)
+
+        return iocb_ptrs
+
+    # noinspection PyProtectedMember
+    def submit_batch(self, batch: BlockBatch, start: int = 0, stop: int = None) -> int:
+        """
+        Submits requests `start` to `stop` of `batch` with one `io_submit` and returns the number of submitted ones.
+
+        .. versionadded:: 0.5.0
+        """
+        if stop is None:
+            stop = len(batch)
+        if not 0 <= start <= stop <= len(batch):
+            raise IndexError(f'Invalid range of the batch of {len(batch)}: [{start}, {stop})')
+
+        with self._lock:
+            stats = self._stats
+
+            try:
+                submitted = io_submit(
+                        self._ctx,
+                        c_long(stop - start),
+                        c_void_p(addressof(batch._iocb_ptrs) + start * sizeof(c_void_p))
+                )
+            except BlockingIOError:
+                if stats is not None:
+                    stats.eagain += 1
+                raise
+
+            self._in_flight_ops += submitted
+            if stats is not None:
+                cmd = batch.cmd
+                first = batch._base + start * sizeof(IOCB)
+                iocbs = ((address, cmd) for address in range(first, first + submitted * sizeof(IOCB), sizeof(IOCB)))
+                stats._on_submit(iocbs, stop - start, submitted, self._in_flight_ops)
+
+            hook = self._hook
+            if hook is not None:
+                iocbs = batch._iocbs
+                self._trace_submit(hook, ((batch, iocbs[index]) for index in range(start, start + submitted)))
+
+            return submitted
+
+    # noinspection PyProtectedMember
+    def enqueue(self, *blocks: AIOBlock) -> None:
+        """
+        Stages `blocks` for the next :meth:`flush`.
+
+        .. versionadded:: 0.5.0
+        """
         for block in blocks:
             if block._deleted:
                 raise ValueError(
                         f'{block} can not be used because it has already been transformed into another AIOBlock.')
 
-        return io_submit(
-                self._ctx,
-                c_long(len(blocks)),
-                create_c_array(iocb_p, (pointer(block._iocb) for block in blocks))
-        )
+        with self._lock:
+            self._queue.extend(blocks)
+
+    @property
+    def queued(self) -> int:
+        """
+        The number of blocks staged by :meth:`enqueue` and not submitted yet.
+
+        .. versionadded:: 0.5.0
+        """
+        return len(self._queue)
+
+    def flush(self) -> int:
+        """
+        Submits staged blocks in the largest batches the kernel accepts and returns the number of submitted blocks.
+
+        Only blocks within the budgets of in-flight operations and bytes are submitted, in order.
+        Blocks that were not accepted by a partial submission are resubmitted right away.
+        When the ring is full, the remaining blocks stay queued until a later call after some completions are reaped.
+        If the kernel rejects a block with any other error, the block is removed from the queue and the error is raised
+        with the number of blocks submitted before it as `submitted`, which are in flight.
+
+        .. versionadded:: 0.5.0
+        """
+        with self._lock:
+            queue = self._queue
+            total = 0
+
+            while queue:
+                length = min(len(queue), self._max_jobs - self._in_flight_ops)
+
+                if self._max_in_flight_bytes is not None:
+                    length = self._admissible(length)
+
+                if length <= 0:
+                    break
+
+                try:
+                    submitted = self._submit_blocks(tuple(islice(queue, length)))
+                except BlockingIOError:
+                    break
+                except OSError as err:
+                    # `io_submit` reports the error of the first block only
+                    queue.popleft()
+                    err.submitted = total
+                    raise
+
+                for _ in range(submitted):
+                    queue.popleft()
+                total += submitted
+
+            return total
+
+    def _admissible(self, length: int) -> int:
+        """the number of queued blocks, up to `length`, that fit in the bytes budget"""
+        budget = self._max_in_flight_bytes - self._in_flight_bytes
+        admitted = 0
+
+        for block in islice(self._queue, length):
+            budget -= self._block_nbytes(block)
+            if budget < 0 and (admitted > 0 or self._in_flight_bytes > 0):
+                break
+            admitted += 1
+
+        return admitted
 
     def get_events(self, min_jobs: int, max_jobs: int, timeout_ns: int = 0) -> Tuple[AIOEvent, ...]:
         event_buf = create_c_array(IOEvent, (), max_jobs)
 
-        completed_jobs = io_getevents(
+        completed_jobs = self._reap_into(event_buf, min_jobs, max_jobs, timeout_ns)
+
+        release_slot = self._release_slot
+
+        with self._lock:
+            if not self._deadline_ids and not self._expired:
+                return tuple(AIOEvent(event, release_slot(event.data)) for event in event_buf[:completed_jobs])
+
+            events = list()
+            for event in event_buf[:completed_jobs]:
+                block = release_slot(event.data)
+                events.append(AIOEvent(event, block, self._settle(block)))
+
+        return tuple(events)
+
+    # noinspection PyProtectedMember
+    def reap(self, event_buffer: AIOEventBuffer, min_jobs: int = 0, timeout_ns: int = 0) -> int:
+        """
+        Fills `event_buffer` with up to its capacity of completions and returns the count.
+
+        Unlike :meth:`get_events`, nothing is allocated per completion.
+        Completions are read through :class:`AIOEventBuffer` until the next reap into the same buffer.
+
+        .. versionadded:: 0.5.0
+        """
+        completed_jobs = self._reap_into(event_buffer._events, min_jobs, len(event_buffer._events), timeout_ns)
+        event_buffer._len = completed_jobs
+
+        data = event_buffer._data
+        release_slot = self._release_slot
+
+        with self._lock:
+            if self._slots:
+                event_buffer._blocks = [release_slot(data[offset]) for offset in range(0, completed_jobs << 2, 4)]
+            else:
+                event_buffer._blocks = None
+
+            if self._deadline_ids or self._expired:
+                blocks = event_buffer._blocks
+                if blocks is None:
+                    blocks = [py_object.from_address(data[offset]).value
+                              for offset in range(0, completed_jobs << 2, 4)]
+                event_buffer._timed_out = frozenset(index for index, block in enumerate(blocks)
+                                                    if self._settle(block))
+            elif event_buffer._timed_out:
+                event_buffer._timed_out = frozenset()
+
+        return completed_jobs
+
+    # noinspection PyProtectedMember
+    def run_completions(self,
+                        min_jobs: int = 1,
+                        max_jobs: int = None,
+                        timeout_ns: int = 0,
+                        default: Callable[[Any, int, int], Any] = None,
+                        on_timeout: Callable[[Any, int, int], Any] = None) -> int:
+        """
+        Reaps up to `max_jobs` (`max_jobs` of the context by default) completions
+        and calls the :attr:`~linux_aio.block.AIOBlock.callback` of each block as `callback(block, res, res2)`.
+        Returns the number of reaped completions.
+
+        Completions of blocks without a callback are passed to `default`, or dropped if it is not given.
+        Completions of timed out blocks are passed to `on_timeout` instead if it is given.
+        Either way, `res` is the one of the kernel, which is the actual result when the operation could not be canceled.
+        If a callback raises, the rest of the completions are still dispatched and the first exception is raised.
+
+        Blocks that have a callback when they are submitted are tagged with a slot of the table of in-flight blocks
+        even if the context is not `indexed`, so they are dispatched without resolving a pointer to the block.
+
+        .. versionadded:: 0.5.0
+        """
+        if max_jobs is None:
+            max_jobs = self._max_jobs
+
+        event_buffer = self._completions
+        if event_buffer is None or event_buffer.capacity < max_jobs:
+            event_buffer = self._completions = AIOEventBuffer(max_jobs)
+
+        completed_jobs = self._reap_into(event_buffer._events, min_jobs, max_jobs, timeout_ns)
+
+        data = event_buffer._data
+        results = event_buffer._results
+        slots = self._slots
+        free_slots = self._free_slots
+        from_address = py_object.from_address
+        timed_out = None
+
+        # resolved under the lock and called back outside of it, so that callbacks do not hold up submitting threads
+        with self._lock:
+            blocks = list()
+            for offset in range(0, completed_jobs << 2, 4):
+                tag = data[offset]
+                if tag < len(slots):
+                    blocks.append(slots[tag])
+                    slots[tag] = None
+                    free_slots.append(tag)
+                else:
+                    blocks.append(from_address(tag).value)
+
+            if self._deadline_ids or self._expired:
+                timed_out = [self._settle(block) for block in blocks]
+
+        error = None
+
+        for index, block in enumerate(blocks):
+            if timed_out is not None and timed_out[index] and on_timeout is not None:
+                callback = on_timeout
+            else:
+                try:
+                    callback = block._callback
+                except AttributeError:
+                    # e.g. BlockBatch
+                    callback = None
+                if callback is None:
+                    callback = default
+                    if callback is None:
+                        continue
+
+            offset = index << 2
+            try:
+                callback(block, results[offset + 2], results[offset + 3])
+            except Exception as err:
+                if error is None:
+                    error = err
+
+        if error is not None:
+            raise error
+
+        return completed_jobs
+
+    def _reap_into(self, event_buf, min_jobs: int, max_jobs: int, timeout_ns: int) -> int:
+        """
+        Fills `event_buf` with up to `max_jobs` completions and returns the count.
+        Reaped completions are taken off the in-flight counters.
+        """
+        if self._deadlines:
+            reaped = self._reap_deadlines(event_buf, min_jobs, max_jobs, timeout_ns)
+        else:
+            reaped = self._reap_at(addressof(event_buf), min_jobs, max_jobs, timeout_ns)
+
+        if reaped:
+            with self._lock:
+                self._on_reaped(event_buf, reaped)
+
+        return reaped
+
+    def _reap_deadlines(self, event_buf, min_jobs: int, max_jobs: int, timeout_ns: int) -> int:
+        """
+        Same as :meth:`_reap_at` except that waits are cut at the nearest deadline to cancel expired blocks,
+        and then resumed for the rest of `timeout_ns`.
+        """
+        buf_addr = addressof(event_buf)
+
+        end = time.monotonic_ns() + timeout_ns if timeout_ns > 0 else None
+        reaped = 0
+
+        while True:
+            now = time.monotonic_ns()
+            self._expire(now)
+
+            wait_until = end
+            if self._deadlines and (wait_until is None or self._deadlines[0][0] < wait_until):
+                wait_until = self._deadlines[0][0]
+
+            if wait_until is None:
+                return reaped + self._reap_at(buf_addr + reaped * _IO_EVENT_SIZE,
+                                              max(min_jobs - reaped, 0), max_jobs - reaped, 0)
+
+            remaining = wait_until - now
+            if remaining <= 0:
+                # `timeout_ns` is over
+                return reaped + self._reap_at(buf_addr + reaped * _IO_EVENT_SIZE, 0, max_jobs - reaped, 0)
+
+            reaped += self._reap_at(buf_addr + reaped * _IO_EVENT_SIZE,
+                                    max(min_jobs - reaped, 0), max_jobs - reaped, remaining)
+
+            if reaped >= min_jobs or reaped == max_jobs or (end is not None and time.monotonic_ns() >= end):
+                return reaped
+
+    def _reap_at(self, buf_addr: int, min_jobs: int, max_jobs: int, timeout_ns: int) -> int:
+        """
+        Fills `io_event` s at `buf_addr` with up to `max_jobs` completions and returns the count.
+
+        If at least `min_jobs` completions are already in the ring, they are copied out of the mapped ring directly.
+        `io_getevents` is called only when the caller has to wait for more completions.
+        Like `io_getevents`, this must not be called from several threads at the same time.
+        """
+        ring = self._ring
+
+        if ring is not None:
+            head = ring.head
+            tail = ring.tail
+            nr = ring.nr
+
+            if head <= tail:
+                available = tail - head
+            else:
+                available = nr - head + tail
+
+            if available >= min_jobs and head < nr:
+                count = min(available, max_jobs)
+                if count == 0:
+                    return 0
+
+                ring_events = addressof(ring) + ring.header_length
+                first = min(count, nr - head)
+
+                memmove(buf_addr, ring_events + head * _IO_EVENT_SIZE, first * _IO_EVENT_SIZE)
+                if first < count:
+                    memmove(buf_addr + first * _IO_EVENT_SIZE, ring_events, (count - first) * _IO_EVENT_SIZE)
+
+                ring.head = (head + count) % nr
+                if self._stats is not None:
+                    self._stats.ring_reaps += 1
+                return count
+
+        count = io_getevents(
                 self._ctx,
                 c_long(min_jobs),
                 c_long(max_jobs),
-                event_buf,
+                c_void_p(buf_addr),
                 pointer(Timespec(*divmod(timeout_ns, 1_000_000_000))) if timeout_ns > 0 else None
         )
 
-        return tuple(AIOEvent(event) for event in event_buf[:completed_jobs])
+        stats = self._stats
+        if stats is not None:
+            stats.getevents_calls += 1
+            stats.getevents_sizes.record(count)
+
+        return count
 
     def __enter__(self) -> AIOContext:
         return self
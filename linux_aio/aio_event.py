@@ -1,9 +1,11 @@
 # coding: UTF-8
 
+from __future__ import annotations
+
 from ctypes import py_object
 
-from linux_aio_bind import IOEvent
-from typing import Tuple, Union
+from linux_aio_bind import IOEvent, create_c_array
+from typing import FrozenSet, Iterator, List, Optional, Tuple, Union
 
 from .block import AIOBlock, NonVectorBlock, ReadBlock, ReadVBlock, VectorBlock, WriteBlock, WriteVBlock
 
@@ -12,14 +14,22 @@ class AIOEvent:
     """
     .. versionadded:: 0.2.0
     """
-    __slots__ = ('_event', '_aio_block')
+    __slots__ = ('_event', '_aio_block', '_timed_out')
 
     _event: IOEvent
     _aio_block: AIOBlock
+    _timed_out: bool
 
-    def __init__(self, event: IOEvent) -> None:
+    def __init__(self, event: IOEvent, aio_block: AIOBlock = None, timed_out: bool = False) -> None:
+        """
+        .. versionchanged:: 0.5.0
+            `aio_block` can be given by the caller that already knows the block of `event`.
+        """
         self._event = event
-        self._aio_block = py_object.from_address(self._event.data).value
+        if aio_block is None:
+            aio_block = py_object.from_address(event.data).value
+        self._aio_block = aio_block
+        self._timed_out = timed_out
 
     @property
     def aio_block(self) -> AIOBlock:
@@ -41,8 +51,10 @@ class AIOEvent:
         elif isinstance(buffer, Tuple):
             # TODO: implement me
             raise NotImplementedError('Stripping of buffer vector is not implemented yet.')
-        else:
+        elif buffer is None:
             return None
+        else:
+            return memoryview(buffer).tobytes().rstrip(b'\0')
 
     @property
     def response(self) -> int:
@@ -51,3 +63,116 @@ class AIOEvent:
     @property
     def response2(self) -> int:
         return self._event.res2
+
+    @property
+    def timed_out(self) -> bool:
+        """
+        Whether the deadline of the block passed before this completion was reaped.
+        If the kernel canceled the operation, :attr:`response` does not carry the result of the operation.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._timed_out
+
+
+class AIOEventBuffer:
+    """
+    Caller-owned storage that :meth:`~linux_aio.AIOContext.reap` fills with completions.
+
+    The buffer can be reused for every reap, and fields of each completion are read straight out of it,
+    so reaping does not allocate an :class:`AIOEvent` per completion.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_events', '_data', '_results', '_len', '_view', '_blocks', '_timed_out')
+
+    _events: IOEvent
+    _data: memoryview
+    _results: memoryview
+    _len: int
+    _view: AIOEventView
+    _blocks: Optional[List[AIOBlock]]  # resolved by an `indexed` context
+    _timed_out: FrozenSet[int]  # indices of timed out completions
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError(f'capacity must be greater than 0. current: {capacity}')
+
+        self._events = create_c_array(IOEvent, (), capacity)
+        raw = memoryview(self._events).cast('B')
+        self._data = raw.cast('Q')
+        self._results = raw.cast('q')
+        self._len = 0
+        self._view = AIOEventView(self)
+        self._blocks = None
+        self._timed_out = frozenset()
+
+    @property
+    def capacity(self) -> int:
+        return len(self._events)
+
+    def __len__(self) -> int:
+        """the number of completions filled by the last reap"""
+        return self._len
+
+    def aio_block(self, index: int) -> AIOBlock:
+        blocks = self._blocks
+        if blocks is not None:
+            return blocks[index]
+        return py_object.from_address(self._data[index << 2]).value
+
+    def response(self, index: int) -> int:
+        return self._results[(index << 2) + 2]
+
+    def response2(self, index: int) -> int:
+        return self._results[(index << 2) + 3]
+
+    def timed_out(self, index: int) -> bool:
+        return index in self._timed_out
+
+    def __iter__(self) -> Iterator[AIOEventView]:
+        """
+        Yields the same :class:`AIOEventView` for every completion, positioned at the current one.
+        Do not keep it beyond the iteration step.
+        """
+        view = self._view
+
+        for index in range(self._len):
+            view._index = index
+            yield view
+
+
+class AIOEventView:
+    """
+    A reusable cursor over one completion in :class:`AIOEventBuffer`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_buffer', '_index')
+
+    _buffer: AIOEventBuffer
+    _index: int
+
+    def __init__(self, buffer: AIOEventBuffer) -> None:
+        self._buffer = buffer
+        self._index = 0
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+    @property
+    def aio_block(self) -> AIOBlock:
+        return self._buffer.aio_block(self._index)
+
+    @property
+    def response(self) -> int:
+        return self._buffer._results[(self._index << 2) + 2]
+
+    @property
+    def response2(self) -> int:
+        return self._buffer._results[(self._index << 2) + 3]
+
+    @property
+    def timed_out(self) -> bool:
+        return self._index in self._buffer._timed_out
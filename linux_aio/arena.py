@@ -0,0 +1,198 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import mmap
+from ctypes import CDLL, addressof, c_char, c_int, c_size_t, c_void_p, get_errno
+from ctypes.util import find_library
+
+import os
+from types import TracebackType
+from typing import Dict, Iterable, List, Mapping, Optional, TYPE_CHECKING, Tuple, Type, Union
+
+if TYPE_CHECKING:
+    from .aio_event import AIOEvent, AIOEventView
+
+_MAP_HUGETLB = getattr(mmap, 'MAP_HUGETLB', 0x40000)
+_HUGE_PAGE_SIZE = 2 << 20
+
+_libc = CDLL(find_library('c'), use_errno=True)
+_libc.mlock.argtypes = (c_void_p, c_size_t)
+_libc.mlock.restype = c_int
+
+
+def _round_up(value: int, unit: int) -> int:
+    return (value + unit - 1) // unit * unit
+
+
+class _Slab:
+    """
+    An mmap-ed region split into slots of the same size.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('slot_size', 'region', 'view', 'free')
+
+    slot_size: int
+    region: mmap.mmap
+    view: memoryview
+    free: List[int]
+
+    def __init__(self, slot_size: int, count: int, huge_pages: bool, lock: bool) -> None:
+        self.slot_size = slot_size
+        self.region = self._map(slot_size * count, huge_pages)
+        self.view = memoryview(self.region)
+        self.free = list(range(count - 1, -1, -1))
+
+        if lock:
+            head = c_char.from_buffer(self.region)
+            ret = _libc.mlock(addressof(head), len(self.region))
+            del head
+
+            if ret != 0:
+                err = get_errno()
+                self.close()
+                raise OSError(err, os.strerror(err), 'Failed to lock the arena in memory. Check RLIMIT_MEMLOCK.')
+
+    @classmethod
+    def _map(cls, size: int, huge_pages: bool) -> mmap.mmap:
+        if huge_pages:
+            try:
+                return mmap.mmap(-1, _round_up(size, _HUGE_PAGE_SIZE),
+                                 flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS | _MAP_HUGETLB)
+            except OSError:
+                # no huge pages are reserved. fall back to transparent huge pages.
+                pass
+
+        region = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS)
+        if huge_pages and hasattr(mmap, 'MADV_HUGEPAGE'):
+            region.madvise(mmap.MADV_HUGEPAGE)
+
+        return region
+
+    def close(self) -> None:
+        self.view.release()
+        try:
+            self.region.close()
+        except BufferError:
+            # some buffers are still referenced. the region is unmapped when they are garbage collected.
+            pass
+
+
+class BufferArena:
+    """
+    Hands out aligned buffers carved from large anonymous mappings, for `O_DIRECT` I/O.
+
+    `slabs` maps a buffer size to the number of buffers of that size.
+    Each size class is backed by its own mapping and every buffer starts at a multiple of `alignment`.
+    Buffers are writable :class:`memoryview` s which every :class:`~linux_aio.block.RWBlock` accepts.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_alignment', '_slabs', '_outstanding')
+
+    _alignment: int
+    _slabs: Tuple[_Slab, ...]
+    _outstanding: Dict[int, Tuple[_Slab, int, memoryview]]
+
+    def __init__(self,
+                 slabs: Mapping[int, int],
+                 alignment: int = mmap.PAGESIZE,
+                 huge_pages: bool = False,
+                 lock: bool = False) -> None:
+        """
+        :param huge_pages: back the arena with huge pages. Uses transparent huge pages if none are reserved.
+        :param lock: `mlock(2)` the arena so that it is never swapped out.
+        """
+        if alignment <= 0 or alignment & (alignment - 1) != 0 or alignment > mmap.PAGESIZE:
+            raise ValueError(f'`alignment` must be a power of 2 not greater than the page size. current: {alignment}')
+
+        self._alignment = alignment
+        self._outstanding = dict()
+        self._slabs = tuple()
+
+        slab_list = list()
+        try:
+            for size, count in sorted(slabs.items()):
+                if size <= 0 or count <= 0:
+                    raise ValueError(f'Both the size and the count of a slab must be positive. current: {size, count}')
+                slab_list.append(_Slab(_round_up(size, alignment), count, huge_pages, lock))
+        except BaseException:
+            for slab in slab_list:
+                slab.close()
+            raise
+
+        self._slabs = tuple(slab_list)
+
+    @property
+    def alignment(self) -> int:
+        return self._alignment
+
+    @property
+    def slot_sizes(self) -> Tuple[int, ...]:
+        return tuple(slab.slot_size for slab in self._slabs)
+
+    @property
+    def available(self) -> Dict[int, int]:
+        """the number of free buffers of each size class"""
+        return {slab.slot_size: len(slab.free) for slab in self._slabs}
+
+    def __len__(self) -> int:
+        """the number of buffers that are handed out"""
+        return len(self._outstanding)
+
+    def acquire(self, size: int) -> memoryview:
+        """
+        Returns a free buffer of `size` bytes from the smallest size class that fits.
+        A larger class is used if the fitting one is exhausted.
+
+        :raises MemoryError: if no size class has a free buffer of `size` bytes.
+        """
+        for slab in self._slabs:
+            if slab.slot_size >= size and slab.free:
+                slot = slab.free.pop()
+                start = slot * slab.slot_size
+                buffer = slab.view[start:start + size]
+                self._outstanding[id(buffer)] = (slab, slot, buffer)
+                return buffer
+
+        raise MemoryError(f'No free buffer of {size} bytes is left in the arena.')
+
+    def owns(self, buffer: memoryview) -> bool:
+        return id(buffer) in self._outstanding
+
+    def release(self, *buffers: memoryview) -> None:
+        """Returns `buffers` to the arena. They must not be used after this call."""
+        for buffer in buffers:
+            try:
+                slab, slot, _ = self._outstanding.pop(id(buffer))
+            except KeyError:
+                raise ValueError(f'{buffer} is not handed out by this arena.')
+
+            slab.free.append(slot)
+
+    def reclaim(self, events: Iterable[Union[AIOEvent, AIOEventView]]) -> None:
+        """Releases buffers of the blocks of reaped `events` that are handed out by this arena"""
+        outstanding = self._outstanding
+
+        for event in events:
+            buffer = getattr(event.aio_block, 'buffer', None)
+
+            if isinstance(buffer, tuple):
+                self.release(*(buf for buf in buffer if id(buf) in outstanding))
+            elif id(buffer) in outstanding:
+                self.release(buffer)
+
+    def close(self) -> None:
+        for slab in self._slabs:
+            slab.close()
+
+        self._slabs = tuple()
+        self._outstanding.clear()
+
+    def __enter__(self) -> BufferArena:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
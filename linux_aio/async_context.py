@@ -0,0 +1,244 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+from ctypes import CDLL, get_errno
+from ctypes.util import find_library
+from types import TracebackType
+
+from linux_aio_bind import IOCBPriorityClass, IOCBRWFlag
+from typing import Any, Deque, Dict, List, Optional, Tuple, Type, Union
+
+from .aio_context import AIOContext
+from .aio_event import AIOEvent
+from .block import AIOBlock, NonVectorBlock, ReadBlock, WriteBlock
+from .registry import FileRegistry
+
+_EFD_CLOEXEC = 0o2000000
+_EFD_NONBLOCK = 0o4000
+
+
+def _open_eventfd() -> int:
+    if hasattr(os, 'eventfd'):
+        return os.eventfd(0, os.EFD_CLOEXEC | os.EFD_NONBLOCK)
+
+    # Python < 3.10 does not expose eventfd(2)
+    libc = CDLL(find_library('c'), use_errno=True)
+    fd = libc.eventfd(0, _EFD_CLOEXEC | _EFD_NONBLOCK)
+    if fd < 0:
+        err = get_errno()
+        raise OSError(err, os.strerror(err))
+
+    return fd
+
+
+class AsyncAIOContext(AIOContext):
+    """
+    :class:`AIOContext` which reports completions to :mod:`asyncio`.
+
+    Every block submitted through :meth:`submit_async` is bound to an eventfd that the event loop watches.
+    Submissions made in the same loop iteration are merged into one `io_submit`,
+    and completions are reaped in batches whenever the eventfd becomes readable.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_loop', '_event_fd', '_futures', '_pending', '_flush_handle', '_capacity_futures')
+
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _event_fd: int
+    _futures: Dict[AIOBlock, asyncio.Future]
+    _pending: List[AIOBlock]
+    _flush_handle: Optional[asyncio.Handle]
+    _capacity_futures: Deque[Tuple[int, int, asyncio.Future]]
+
+    def __init__(self,
+                 max_jobs: int,
+                 loop: asyncio.AbstractEventLoop = None,
+                 indexed: bool = False,
+                 max_in_flight_bytes: int = None,
+                 stats: bool = False,
+                 registry: FileRegistry = None) -> None:
+        self._loop = None
+        self._event_fd = -1
+        self._futures = dict()
+        self._pending = list()
+        self._flush_handle = None
+        self._capacity_futures = deque()
+
+        super().__init__(max_jobs, indexed, max_in_flight_bytes, stats, registry)
+
+        self._event_fd = _open_eventfd()
+
+        if loop is not None:
+            self._bind_loop(loop)
+
+    def _bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        loop.add_reader(self._event_fd, self._on_readable)
+
+    def close(self) -> None:
+        """will block on the completion of all operations that could not be canceled"""
+        if self._loop is not None:
+            if not self._loop.is_closed():
+                self._loop.remove_reader(self._event_fd)
+            if self._flush_handle is not None:
+                self._flush_handle.cancel()
+                self._flush_handle = None
+            self._loop = None
+
+        if self._event_fd >= 0:
+            os.close(self._event_fd)
+            self._event_fd = -1
+
+        super().close()
+
+        for future in self._futures.values():
+            if not future.done():
+                future.cancel()
+        for _, _, future in self._capacity_futures:
+            if not future.done():
+                future.cancel()
+        self._futures.clear()
+        self._pending.clear()
+        self._capacity_futures.clear()
+
+    # noinspection PyProtectedMember
+    def submit_async(self, block: AIOBlock) -> asyncio.Future:
+        """
+        Schedules `block` for submission and returns a future that resolves to its :class:`AIOEvent`.
+
+        The block's `res_fd` is overwritten with the eventfd of this context.
+        """
+        if block._deleted:
+            raise ValueError(f'{block} can not be used because it has already been transformed into another AIOBlock.')
+        if block in self._futures:
+            raise ValueError(f'{block} is already submitted and not completed yet.')
+
+        if self._loop is None:
+            self._bind_loop(asyncio.get_running_loop())
+
+        future = self._loop.create_future()
+        block.res_fd = self._event_fd
+        self._futures[block] = future
+        self._pending.append(block)
+
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_soon(self._flush)
+
+        return future
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+
+        blocks = self._pending
+        while blocks:
+            try:
+                submitted = self.submit(*blocks)
+            except BlockingIOError:
+                # the ring is full. retry after some completions are reaped.
+                break
+            except OSError as err:
+                # `io_submit` reports the error of the first block only
+                future = self._futures.pop(blocks[0])
+                if not future.done():
+                    future.set_exception(err)
+                submitted = 1
+
+            del blocks[:submitted]
+
+    def _on_readable(self) -> None:
+        try:
+            os.read(self._event_fd, 8)
+        except BlockingIOError:
+            return
+
+        futures = self._futures
+        max_jobs = self._max_jobs
+
+        while futures:
+            events = self.get_events(0, max_jobs)
+
+            for event in events:
+                future = futures.pop(event.aio_block, None)
+                if future is not None and not future.done():
+                    future.set_result(event)
+
+            if len(events) < max_jobs:
+                break
+
+        if self._pending and self._flush_handle is None:
+            self._flush()
+
+        self._wake_capacity_waiters()
+
+    def _wake_capacity_waiters(self) -> None:
+        waiters = self._capacity_futures
+
+        while waiters:
+            ops, nbytes, future = waiters[0]
+
+            if future.done():
+                waiters.popleft()
+            elif self.has_capacity(ops + len(self._pending), nbytes):
+                waiters.popleft()
+                future.set_result(None)
+            else:
+                # keeps the order of waiters
+                break
+
+    async def wait_for_capacity_async(self, ops: int = 1, nbytes: int = 0) -> None:
+        """
+        Waits until :meth:`has_capacity`, counting blocks that are scheduled by :meth:`submit_async` as in flight.
+        Waiters are woken up in order as completions are reaped.
+
+        .. versionadded:: 0.5.0
+        """
+        if not self._capacity_futures and self.has_capacity(ops + len(self._pending), nbytes):
+            return
+
+        if self._loop is None:
+            self._bind_loop(asyncio.get_running_loop())
+
+        future = self._loop.create_future()
+        self._capacity_futures.append((ops, nbytes, future))
+        await future
+
+    @classmethod
+    def _check_response(cls, event: AIOEvent) -> AIOEvent:
+        if event.response < 0:
+            raise OSError(-event.response, os.strerror(-event.response))
+        return event
+
+    async def read(self,
+                   file: Any,
+                   buffer: Union[str, NonVectorBlock.BUF_TYPE],
+                   offset: int = 0,
+                   length: int = None,
+                   rw_flags: IOCBRWFlag = 0,
+                   priority_class: IOCBPriorityClass = IOCBPriorityClass.NONE,
+                   priority_value: int = 0) -> AIOEvent:
+        """raises :class:`OSError` if the kernel reports an error for the operation"""
+        block = ReadBlock(file, buffer, offset, length, rw_flags, priority_class, priority_value)
+        return self._check_response(await self.submit_async(block))
+
+    async def write(self,
+                    file: Any,
+                    content: Union[str, NonVectorBlock.BUF_TYPE],
+                    offset: int = 0,
+                    length: int = None,
+                    rw_flags: IOCBRWFlag = 0,
+                    priority_class: IOCBPriorityClass = IOCBPriorityClass.NONE,
+                    priority_value: int = 0) -> AIOEvent:
+        """raises :class:`OSError` if the kernel reports an error for the operation"""
+        block = WriteBlock(file, content, offset, length, rw_flags, priority_class, priority_value)
+        return self._check_response(await self.submit_async(block))
+
+    async def __aenter__(self) -> AsyncAIOContext:
+        return self
+
+    async def __aexit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                        traceback: Optional[TracebackType]) -> None:
+        self.close()
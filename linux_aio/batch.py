@@ -0,0 +1,176 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+from array import array
+from ctypes import Array, addressof, c_int64, c_void_p, py_object, sizeof
+
+from linux_aio_bind import IOCB, IOCBCMD, IOCBRWFlag
+from typing import Any, Iterator, List, Sequence, TYPE_CHECKING, Union
+
+from .block import AIOBlock, RWBlock
+
+if TYPE_CHECKING:
+    from .aio_event import AIOEvent, AIOEventBuffer
+
+_IOCB_SIZE = sizeof(IOCB)
+
+
+class BlockBatch:
+    """
+    `size` read or write requests stored as one contiguous array of IOCBs with a matching pointer array.
+
+    Fields are set for the whole batch at once from sequences, :class:`array.array` s or NumPy arrays,
+    and the batch is submitted with a single `io_submit` by :meth:`~linux_aio.AIOContext.submit_batch`.
+    Completions of the batch are reported as indices into it, see :meth:`completions` and :meth:`index_of`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_iocbs', '_iocb_ptrs', '_words', '_results', '_pins', '_py_obj', '_base')
+
+    _iocbs: Array
+    _iocb_ptrs: Array
+    _words: memoryview
+    _results: memoryview
+    _pins: List[Any]
+    _py_obj: py_object  # `aio_data` of every IOCB of the batch points it
+    _base: int
+
+    def __init__(self, size: int, cmd: IOCBCMD = IOCBCMD.PREAD, file: Union[Any, int] = None) -> None:
+        if size <= 0:
+            raise ValueError(f'size must be greater than 0. current: {size}')
+        if cmd not in (IOCBCMD.PREAD, IOCBCMD.PWRITE):
+            raise ValueError(f'BlockBatch supports only IOCBCMD.PREAD and IOCBCMD.PWRITE. current: {cmd}')
+
+        self._iocbs = (IOCB * size)()
+        self._base = addressof(self._iocbs)
+        self._iocb_ptrs = (c_void_p * size)(*range(self._base, self._base + size * _IOCB_SIZE, _IOCB_SIZE))
+        self._words = memoryview(self._iocbs).cast('B')
+        self._results = memoryview((c_int64 * size)()).cast('B').cast('q')
+        self._pins = [None] * size
+        self._py_obj = py_object(self)
+
+        self._assign(IOCB.aio_data, 'Q', (addressof(self._py_obj),) * size)
+        self._assign(IOCB.aio_lio_opcode, 'H', (cmd,) * size)
+
+        if file is not None:
+            self.set_files(file)
+
+    def __len__(self) -> int:
+        return len(self._iocbs)
+
+    def __hash__(self) -> int:
+        return self._base
+
+    @property
+    def cmd(self) -> IOCBCMD:
+        return IOCBCMD(self._iocbs[0].aio_lio_opcode)
+
+    @property
+    def results(self) -> memoryview:
+        """`res` of the last completion of each request, recorded by :meth:`completions` and :meth:`index_of`"""
+        return self._results
+
+    def _assign(self, field: Any, typecode: str, values: Any) -> None:
+        size = len(self._iocbs)
+        view = self._words.cast(typecode)
+        item_size = view.itemsize
+
+        try:
+            source = memoryview(values)
+        except TypeError:
+            source = None
+
+        if source is not None and source.c_contiguous and source.itemsize == item_size:
+            # e.g. numpy.ndarray or array.array. copied without converting each element
+            source = source.cast('B').cast(typecode)
+        else:
+            if hasattr(values, 'tolist'):
+                values = values.tolist()
+            source = array(typecode, values)
+
+        if len(source) != size:
+            raise ValueError(f'{len(source)} values are given for a batch of {size}.')
+
+        stride = _IOCB_SIZE // item_size
+        start = field.offset // item_size
+        view[start:start + stride * size:stride] = source
+
+    # noinspection PyProtectedMember
+    def set_files(self, files: Union[Any, int, Sequence[Union[Any, int]]]) -> None:
+        """sets the file of every request to `files`, or of each request if `files` is a sequence"""
+        if isinstance(files, int) or hasattr(files, 'fileno'):
+            files = (AIOBlock._get_fd(files),) * len(self._iocbs)
+        elif not isinstance(files, (memoryview, array)) and not hasattr(files, 'tolist'):
+            files = tuple(AIOBlock._get_fd(file) for file in files)
+
+        self._assign(IOCB.aio_fildes, 'I', files)
+
+    def set_offsets(self, offsets: Sequence[int]) -> None:
+        self._assign(IOCB.aio_offset, 'q', offsets)
+
+    def set_lengths(self, lengths: Sequence[int]) -> None:
+        self._assign(IOCB.aio_nbytes, 'Q', lengths)
+
+    def set_rw_flags(self, rw_flags: IOCBRWFlag) -> None:
+        self._assign(IOCB.aio_rw_flags, 'I', (rw_flags,) * len(self._iocbs))
+
+    # noinspection PyProtectedMember
+    def set_buffers(self, buffers: Sequence[Any]) -> None:
+        """sets a separate buffer of each request. Lengths are set to the sizes of the buffers."""
+        size = len(self._iocbs)
+        if len(buffers) != size:
+            raise ValueError(f'{len(buffers)} buffers are given for a batch of {size}.')
+
+        pins = [RWBlock._pin_buffer(buffer) for buffer in buffers]
+
+        self._assign(IOCB.aio_buf, 'Q', tuple(address for address, _ in pins))
+        self._assign(IOCB.aio_nbytes, 'Q', tuple(RWBlock._buf_len(buffer) for buffer in buffers))
+        self._pins = [pin for _, pin in pins]
+
+    # noinspection PyProtectedMember
+    def set_buffer_slices(self, buffer: Any, chunk_size: int) -> None:
+        """
+        Splits one `buffer` into consecutive chunks of `chunk_size` bytes, one for each request.
+        Only one pin is taken for the whole buffer.
+        """
+        size = len(self._iocbs)
+        if RWBlock._buf_len(buffer) < chunk_size * size:
+            raise ValueError(f'The buffer is smaller than {size} chunks of {chunk_size} bytes.')
+
+        address, pin = RWBlock._pin_buffer(buffer)
+
+        self._assign(IOCB.aio_buf, 'Q', range(address, address + chunk_size * size, chunk_size))
+        self._assign(IOCB.aio_nbytes, 'Q', (chunk_size,) * size)
+        self._pins = [pin]
+
+    def _index_of_iocb(self, iocb_address: int) -> int:
+        index, remainder = divmod(iocb_address - self._base, _IOCB_SIZE)
+        if remainder != 0 or not 0 <= index < len(self._iocbs):
+            raise ValueError(f'The completion does not belong to {self}.')
+        return index
+
+    # noinspection PyProtectedMember
+    def index_of(self, event: AIOEvent) -> int:
+        """Returns the index of the request of `event` and records its `res` to :attr:`results`"""
+        index = self._index_of_iocb(event._event.obj)
+        self._results[index] = event.response
+        return index
+
+    # noinspection PyProtectedMember
+    def completions(self, event_buffer: AIOEventBuffer) -> Iterator[int]:
+        """
+        Yields the index of each request of this batch that completed in `event_buffer`
+        and records its `res` to :attr:`results`. Completions of other blocks are skipped.
+        """
+        data = event_buffer._data
+        results = event_buffer._results
+        own_data = addressof(self._py_obj)
+        base = self._base
+        batch_results = self._results
+
+        for offset in range(0, len(event_buffer) << 2, 4):
+            if data[offset] == own_data:
+                index = (data[offset + 1] - base) // _IOCB_SIZE
+                batch_results[index] = results[offset + 2]
+                yield index
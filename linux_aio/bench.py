@@ -0,0 +1,582 @@
+# coding: UTF-8
+
+"""
+Measures IOPS, bandwidth and latency of a file or a block device, in the spirit of fio.
+
+Usage: `python -m linux_aio.bench [-h] [--rw PATTERN[,...]] [--bs SIZE[,...]] [--iodepth N[,...]]
+[--direct {off,on,both}] [--rw-flags FLAGS[,...]] [--engines ENGINE[,...]] [--rwmixread PERCENT]
+[--size SIZE] [--runtime SEC] [--seed N] [--output FILE] [--force] TARGET`
+
+Every combination of the given patterns, block sizes, queue depths, `O_DIRECT` modes and RWF flags is run
+for `--runtime` seconds with each engine, and the results are printed as JSON:
+
+- `aio`: :class:`~linux_aio.AIOContext` keeping `iodepth` requests in flight
+- `sync`: `preadv(2)` / `pwritev(2)` one at a time (`iodepth` is ignored)
+- `threads`: `iodepth` threads issuing `preadv(2)` / `pwritev(2)`
+- `posix`: POSIX AIO of glibc (`aio_read(3)`), where available. RWF flags are not supported.
+
+`TARGET` is created and filled with random contents up to `--size` if it is a smaller regular file.
+Write patterns overwrite the target, so they refuse to run on block devices without `--force`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import errno
+import json
+import os
+import platform
+import random
+import stat
+import sys
+import threading
+import time
+from collections import deque
+from ctypes import CDLL, POINTER, Structure, addressof, c_byte, c_char, c_int, c_int64, c_size_t, c_ssize_t, c_void_p
+from ctypes.util import find_library
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from linux_aio_bind import IOCBRWFlag
+
+from .aio_context import AIOContext
+from .arena import BufferArena
+from .block import ReadBlock, WriteBlock
+from .copy import parse_size
+from .stats import LogHistogram
+
+PATTERNS = ('read', 'write', 'randread', 'randwrite', 'rw', 'randrw')
+ENGINES = ('aio', 'sync', 'threads', 'posix')
+
+# RWF_APPEND is left out since it ignores offsets
+_RW_FLAGS = {'none': 0, 'hipri': IOCBRWFlag.HIPRI, 'dsync': IOCBRWFlag.DSYNC, 'sync': IOCBRWFlag.SYNC,
+             'nowait': IOCBRWFlag.NOWAIT}
+
+
+class Job:
+    """
+    A workload of the benchmark matrix.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('pattern', 'block_size', 'depth', 'direct', 'rw_flags', 'mix_read')
+
+    pattern: str
+    block_size: int
+    depth: int
+    direct: bool
+    rw_flags: int
+    mix_read: float
+
+    def __init__(self,
+                 pattern: str,
+                 block_size: int,
+                 depth: int,
+                 direct: bool = False,
+                 rw_flags: int = 0,
+                 mix_read: float = 0.5) -> None:
+        if pattern not in PATTERNS:
+            raise ValueError(f'pattern must be one of {PATTERNS}. current: {pattern}')
+        if block_size <= 0 or depth <= 0 or not 0 <= mix_read <= 1:
+            raise ValueError(f'block_size and depth must be positive and mix_read must be between 0 and 1. '
+                             f'current: {block_size, depth, mix_read}')
+
+        self.pattern = pattern
+        self.block_size = block_size
+        self.depth = depth
+        self.direct = direct
+        self.rw_flags = rw_flags
+        self.mix_read = mix_read
+
+    @property
+    def writes(self) -> bool:
+        return self.pattern.endswith('write') or self.pattern.endswith('rw')
+
+    def describe(self) -> Dict[str, Any]:
+        flags = [name for name, flag in _RW_FLAGS.items() if flag and self.rw_flags & flag]
+        return {'rw': self.pattern, 'bs': self.block_size, 'iodepth': self.depth, 'direct': self.direct,
+                'rw_flags': '+'.join(flags) or 'none'}
+
+
+class _Workload:
+    """yields `(is_read, offset)` of each request of a job"""
+    __slots__ = ('_random', '_read', '_write', '_mix_read', '_blocks', '_block_size', '_next')
+
+    _random: random.Random
+    _read: bool
+    _write: bool
+    _mix_read: float
+    _blocks: int
+    _block_size: int
+    _next: int
+
+    def __init__(self, job: Job, size: int, seed: int, start: int = 0) -> None:
+        self._random = random.Random(seed)
+        self._read = job.pattern.endswith('read') or job.pattern.endswith('rw')
+        self._write = job.writes
+        self._mix_read = job.mix_read
+        self._blocks = max(size // job.block_size, 1)
+        self._block_size = job.block_size
+        self._next = -1 if job.pattern.startswith('rand') else start % self._blocks
+
+    def next(self) -> Tuple[bool, int]:
+        if self._read and self._write:
+            is_read = self._random.random() < self._mix_read
+        else:
+            is_read = self._read
+
+        if self._next < 0:
+            return is_read, self._random.randrange(self._blocks) * self._block_size
+
+        offset = self._next * self._block_size
+        self._next = (self._next + 1) % self._blocks
+        return is_read, offset
+
+
+class _Result:
+    __slots__ = ('latency', 'ops', 'bytes', 'errors')
+
+    latency: LogHistogram
+    ops: int
+    bytes: int
+    errors: int
+
+    def __init__(self) -> None:
+        self.latency = LogHistogram()
+        self.ops = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def record(self, latency_ns: int, res: int) -> None:
+        self.latency.record(latency_ns)
+        self.ops += 1
+        self.bytes += res
+
+    def merge(self, other: _Result) -> None:
+        self.latency.merge(other.latency)
+        self.ops += other.ops
+        self.bytes += other.bytes
+        self.errors += other.errors
+
+
+def _check(res: int, result: _Result) -> bool:
+    """whether `res` is a successful result. `EAGAIN` of `RWF_NOWAIT` is counted, other errors are raised."""
+    if res >= 0:
+        return True
+    if res == -errno.EAGAIN:
+        result.errors += 1
+        return False
+    raise OSError(-res, os.strerror(-res))
+
+
+def _run_aio(fd: int, job: Job, size: int, runtime_ns: int, buffers: Sequence[memoryview], seed: int) -> _Result:
+    workload = _Workload(job, size, seed)
+    result = _Result()
+    pairs = {}
+    submitted_ns: Dict[Any, int] = dict()
+    queued: Deque[Any] = deque()  # enqueued blocks in the order that flush submits them
+
+    for buffer in buffers:
+        read = ReadBlock(fd, buffer, rw_flags=job.rw_flags)
+        write = WriteBlock(fd, buffer, rw_flags=job.rw_flags)
+        pairs[read] = pairs[write] = (read, write)
+
+    def issue(read: ReadBlock, write: WriteBlock) -> None:
+        is_read, offset = workload.next()
+        block = read if is_read else write
+        block.offset = offset
+        ctx.enqueue(block)
+        queued.append(block)
+
+    def flush() -> int:
+        """stamps blocks when they are submitted, so that the time in the queue is not counted as latency"""
+        submitted = ctx.flush()
+        now = time.monotonic_ns()
+        for _ in range(submitted):
+            submitted_ns[queued.popleft()] = now
+        return submitted
+
+    with AIOContext(job.depth) as ctx:
+        end = time.monotonic_ns() + runtime_ns
+
+        for read, write in set(pairs.values()):
+            issue(read, write)
+        flush()
+
+        while submitted_ns:
+            for event in ctx.get_events(1, job.depth):
+                now = time.monotonic_ns()
+                block = event.aio_block
+                started = submitted_ns.pop(block)
+
+                if _check(event.response, result):
+                    result.record(now - started, event.response)
+                if now < end:
+                    issue(*pairs[block])
+
+            if flush() == 0 and ctx.in_flight_ops == 0 and ctx.queued:
+                raise BlockingIOError(errno.EAGAIN, 'The kernel does not accept any request.')
+
+    return result
+
+
+def _sync_loop(fd: int, job: Job, size: int, end_ns: int, buffer: memoryview, workload: _Workload) -> _Result:
+    result = _Result()
+    buffers = (buffer,)
+    rw_flags = job.rw_flags
+
+    while True:
+        is_read, offset = workload.next()
+        started = time.monotonic_ns()
+        if started >= end_ns:
+            return result
+
+        try:
+            if is_read:
+                res = os.preadv(fd, buffers, offset, rw_flags)
+            else:
+                res = os.pwritev(fd, buffers, offset, rw_flags)
+        except BlockingIOError:
+            res = -errno.EAGAIN
+
+        if _check(res, result):
+            result.record(time.monotonic_ns() - started, res)
+
+
+def _run_sync(fd: int, job: Job, size: int, runtime_ns: int, buffers: Sequence[memoryview], seed: int) -> _Result:
+    return _sync_loop(fd, job, size, time.monotonic_ns() + runtime_ns, buffers[0], _Workload(job, size, seed))
+
+
+def _run_threads(fd: int, job: Job, size: int, runtime_ns: int, buffers: Sequence[memoryview], seed: int) -> _Result:
+    end = time.monotonic_ns() + runtime_ns
+    results: List[Optional[_Result]] = [None] * len(buffers)
+    errors: List[BaseException] = list()
+
+    def work(index: int) -> None:
+        # sequential patterns split the file into one stream per thread
+        workload = _Workload(job, size, seed + index, index * (size // job.block_size) // len(buffers))
+        try:
+            results[index] = _sync_loop(fd, job, size, end, buffers[index], workload)
+        except BaseException as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(len(buffers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    total = _Result()
+    for result in results:
+        total.merge(result)
+    return total
+
+
+class _SigEvent(Structure):
+    _fields_ = (
+        ('sigev_value', c_void_p),
+        ('sigev_signo', c_int),
+        ('sigev_notify', c_int),
+        ('_pad', c_byte * 48),
+    )
+
+
+class _AIOCB(Structure):
+    """`struct aiocb` of glibc on 64-bit Linux"""
+    _fields_ = (
+        ('aio_fildes', c_int),
+        ('aio_lio_opcode', c_int),
+        ('aio_reqprio', c_int),
+        ('aio_buf', c_void_p),
+        ('aio_nbytes', c_size_t),
+        ('aio_sigevent', _SigEvent),
+        ('_next_prio', c_void_p),
+        ('_abs_prio', c_int),
+        ('_policy', c_int),
+        ('_error_code', c_int),
+        ('_return_value', c_ssize_t),
+        ('aio_offset', c_int64),
+        ('_reserved', c_char * 32),
+    )
+
+
+_SIGEV_NONE = 1
+
+
+def _load_posix_aio() -> Optional[CDLL]:
+    """glibc with POSIX AIO, or `None` if the layout of :class:`_AIOCB` can not be trusted"""
+    if platform.libc_ver()[0] != 'glibc' or ctypes.sizeof(c_void_p) != 8 or ctypes.sizeof(_AIOCB) != 168:
+        return None
+
+    for name in ('c', 'rt'):
+        path = find_library(name)
+        if path is None:
+            continue
+        lib = CDLL(path, use_errno=True)
+        if hasattr(lib, 'aio_read') and hasattr(lib, 'aio_suspend'):
+            for func in (lib.aio_read, lib.aio_write, lib.aio_error):
+                func.argtypes = (POINTER(_AIOCB),)
+                func.restype = c_int
+            lib.aio_return.argtypes = (POINTER(_AIOCB),)
+            lib.aio_return.restype = c_ssize_t
+            lib.aio_suspend.argtypes = (c_void_p, c_int, c_void_p)
+            lib.aio_suspend.restype = c_int
+            return lib
+
+    return None
+
+
+def _run_posix(fd: int, job: Job, size: int, runtime_ns: int, buffers: Sequence[memoryview], seed: int) -> _Result:
+    lib = _load_posix_aio()
+    if lib is None:
+        raise NotImplementedError('POSIX AIO of glibc on 64-bit Linux is not available.')
+    if job.rw_flags:
+        raise NotImplementedError('POSIX AIO does not support RWF flags.')
+
+    workload = _Workload(job, size, seed)
+    result = _Result()
+    depth = len(buffers)
+    cbs = (_AIOCB * depth)()
+    cb_ptrs = (c_void_p * depth)()
+    # keep the exported buffers alive while the addresses are used
+    heads = [c_char.from_buffer(buffer) for buffer in buffers]
+    submitted_ns = [0] * depth
+
+    def issue(index: int) -> None:
+        is_read, offset = workload.next()
+        cb = cbs[index]
+        cb.aio_fildes = fd
+        cb.aio_buf = addressof(heads[index])
+        cb.aio_nbytes = job.block_size
+        cb.aio_offset = offset
+        cb.aio_sigevent.sigev_notify = _SIGEV_NONE
+        submitted_ns[index] = time.monotonic_ns()
+        if (lib.aio_read if is_read else lib.aio_write)(cb) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        cb_ptrs[index] = addressof(cb)
+
+    try:
+        end = time.monotonic_ns() + runtime_ns
+        for index in range(depth):
+            issue(index)
+
+        while any(cb_ptrs):
+            lib.aio_suspend(cb_ptrs, depth, None)
+            now = time.monotonic_ns()
+
+            for index in range(depth):
+                if not cb_ptrs[index]:
+                    continue
+                err = lib.aio_error(cbs[index])
+                if err == errno.EINPROGRESS:
+                    continue
+
+                cb_ptrs[index] = None
+                res = lib.aio_return(cbs[index])
+                if err != 0:
+                    # the error of a request is reported by aio_error, not errno
+                    res = -err
+                if _check(res, result):
+                    result.record(now - submitted_ns[index], res)
+                if now < end:
+                    issue(index)
+    finally:
+        # requests must not outlive the buffers
+        for index in range(depth):
+            if cb_ptrs[index]:
+                while lib.aio_error(cbs[index]) == errno.EINPROGRESS:
+                    lib.aio_suspend(c_void_p(addressof(cb_ptrs) + index * ctypes.sizeof(c_void_p)), 1, None)
+        del heads
+
+    return result
+
+
+_RUNNERS: Dict[str, Callable[[int, Job, int, int, Sequence[memoryview], int], _Result]] = {
+    'aio': _run_aio,
+    'sync': _run_sync,
+    'threads': _run_threads,
+    'posix': _run_posix,
+}
+
+
+def prepare(path: str, size: int) -> int:
+    """
+    Fills `path` with random contents up to `size` bytes if it is a missing or smaller regular file,
+    so that reads hit allocated blocks. Returns the size of the region to benchmark.
+    """
+    if os.path.exists(path) and stat.S_ISBLK(os.stat(path).st_mode):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return min(size, os.lseek(fd, 0, os.SEEK_END))
+        finally:
+            os.close(fd)
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o644)
+    try:
+        written = os.fstat(fd).st_size
+        chunk = os.urandom(1 << 20)
+        while written < size:
+            written += os.pwrite(fd, chunk[:size - written], written)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    return size
+
+
+def run_job(path: str, engine: str, job: Job, size: int, runtime: float, seed: int = 0) -> Dict[str, Any]:
+    """
+    Runs `job` with `engine` on the first `size` bytes of `path` for `runtime` seconds.
+    Returns the result as a JSON-compatible dict, with an `error` instead of measurements if it fails.
+
+    .. versionadded:: 0.5.0
+    """
+    report: Dict[str, Any] = dict(engine=engine, **job.describe())
+    if engine == 'sync':
+        report['iodepth'] = 1
+
+    flags = (os.O_RDWR if job.writes else os.O_RDONLY) | os.O_CLOEXEC | (os.O_DIRECT if job.direct else 0)
+    count = 1 if engine == 'sync' else job.depth
+    arena = None
+
+    try:
+        fd = os.open(path, flags)
+        try:
+            arena = BufferArena({job.block_size: count})
+            buffers = [arena.acquire(job.block_size) for _ in range(count)]
+            for buffer in buffers:
+                buffer[:] = os.urandom(job.block_size)
+
+            started = time.monotonic_ns()
+            result = _RUNNERS[engine](fd, job, size, int(runtime * 1e9), buffers, seed)
+            elapsed = (time.monotonic_ns() - started) / 1e9
+        finally:
+            os.close(fd)
+    except (OSError, NotImplementedError, ValueError, MemoryError) as err:
+        report['error'] = str(err)
+        return report
+    finally:
+        buffers = None
+        if arena is not None:
+            arena.close()
+
+    latency = result.latency
+    report.update(
+            ios=result.ops,
+            bytes=result.bytes,
+            eagain=result.errors,
+            runtime_s=elapsed,
+            iops=result.ops / elapsed if elapsed > 0 else 0.0,
+            bw_bytes=result.bytes / elapsed if elapsed > 0 else 0.0,
+            lat_ns=dict(mean=latency.mean, min=latency.min, p50=latency.percentile(50), p99=latency.percentile(99),
+                        p999=latency.percentile(99.9), max=latency.max),
+    )
+    return report
+
+
+def _parse_list(parse: Callable[[str], Any]) -> Callable[[str], List[Any]]:
+    def parse_list(value: str) -> List[Any]:
+        return [parse(item) for item in value.split(',') if item]
+
+    return parse_list
+
+
+def _parse_choice(choices: Iterable[str]) -> Callable[[str], str]:
+    choices = tuple(choices)
+
+    def parse_choice(value: str) -> str:
+        if value not in choices:
+            raise argparse.ArgumentTypeError(f'{value} is not one of {", ".join(choices)}')
+        return value
+
+    return parse_choice
+
+
+def _parse_rw_flags(value: str) -> int:
+    flags = 0
+    for name in value.lower().split('+'):
+        if name not in _RW_FLAGS:
+            raise argparse.ArgumentTypeError(f'{name} is not one of {", ".join(_RW_FLAGS)}')
+        flags |= _RW_FLAGS[name]
+    return flags
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m linux_aio.bench',
+                                     description='Benchmarks a file or a block device with Linux AIO and baselines.')
+    parser.add_argument('target')
+    parser.add_argument('--rw', type=_parse_list(_parse_choice(PATTERNS)), default=['randread'],
+                        help=f'access patterns, any of {", ".join(PATTERNS)} (default: randread)')
+    parser.add_argument('--bs', type=_parse_list(parse_size), default=[4096], help='block sizes (default: 4k)')
+    parser.add_argument('--iodepth', type=_parse_list(int), default=[1, 32], help='queue depths (default: 1,32)')
+    parser.add_argument('--direct', choices=('off', 'on', 'both'), default='off', help='O_DIRECT (default: off)')
+    parser.add_argument('--rw-flags', type=_parse_list(_parse_rw_flags), default=[0],
+                        help=f'"+"-joined RWF flags of each run, of {", ".join(_RW_FLAGS)} (default: none)')
+    parser.add_argument('--engines', type=_parse_list(_parse_choice(ENGINES)), default=list(ENGINES),
+                        help=f'any of {", ".join(ENGINES)} (default: all)')
+    parser.add_argument('--rwmixread', type=float, default=50, help='percentage of reads of rw patterns (default: 50)')
+    parser.add_argument('--size', type=parse_size, default=256 << 20, help='size of the region (default: 256M)')
+    parser.add_argument('--runtime', type=float, default=2.0, help='seconds of each run (default: 2)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write the JSON report to (default: stdout)')
+    parser.add_argument('--force', action='store_true', help='allow write patterns on block devices')
+    args = parser.parse_args(argv)
+
+    is_device = os.path.exists(args.target) and stat.S_ISBLK(os.stat(args.target).st_mode)
+    if is_device and not args.force and any(pattern.endswith('write') or pattern.endswith('rw')
+                                            for pattern in args.rw):
+        print(f'{parser.prog}: write patterns destroy data on {args.target}. pass --force to run them.',
+              file=sys.stderr)
+        return 1
+
+    try:
+        size = prepare(args.target, args.size)
+    except OSError as err:
+        print(f'{parser.prog}: {err}', file=sys.stderr)
+        return 1
+
+    direct_modes = {'off': (False,), 'on': (True,), 'both': (False, True)}[args.direct]
+    results = list()
+    done = set()
+
+    for engine in args.engines:
+        for pattern in args.rw:
+            for block_size in args.bs:
+                for depth in args.iodepth:
+                    for direct in direct_modes:
+                        for rw_flags in args.rw_flags:
+                            if engine == 'sync':
+                                # the depth of sync runs is always 1
+                                key = (engine, pattern, block_size, direct, rw_flags)
+                                if key in done:
+                                    continue
+                                done.add(key)
+
+                            job = Job(pattern, block_size, depth, direct, rw_flags, args.rwmixread / 100)
+                            results.append(run_job(args.target, engine, job, size, args.runtime, args.seed))
+
+    report = {
+        'target': args.target,
+        'size': size,
+        'runtime': args.runtime,
+        'kernel': platform.release(),
+        'python': platform.python_version(),
+        'results': results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as fp:
+            fp.write(text + '\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
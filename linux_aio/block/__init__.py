@@ -3,5 +3,6 @@
 from .base import AIOBlock
 from .non_rw import FDsyncBlock, FsyncBlock, NonRWBlock, PollBlock
 from .non_vector import NonVectorBlock, ReadBlock, WriteBlock
+from .pool import BlockPool
 from .rw import RWBlock
 from .vector import ReadVBlock, VectorBlock, WriteVBlock
@@ -6,27 +6,31 @@ from ctypes import addressof, py_object
 
 from abc import ABCMeta
 from linux_aio_bind import IOCB, IOCBCMD, IOCBFlag, IOPRIO_CLASS_SHIFT, gen_io_priority
-from typing import TYPE_CHECKING, Union, overload
+from typing import Any, Callable, Optional, TYPE_CHECKING, Union, overload
 
 if TYPE_CHECKING:
-    from typing import Any, Optional
     from linux_aio_bind import IOCBPriorityClass, IOCBRWFlag
     from .non_rw import FDsyncBlock, FsyncBlock, PollBlock
     from .non_vector import ReadBlock, WriteBlock
     from .vector import ReadVBlock, WriteVBlock
 
+CompletionCallback = Callable[['AIOBlock', int, int], Any]
+
 
 class AIOBlock(metaclass=ABCMeta):
     """
     .. versionadded:: 0.2.0
     .. versionchanged:: 0.3.0
     """
-    __slots__ = ('_iocb', '_py_obj', '_file_obj', '_deleted')
+    __slots__ = ('_iocb', '_py_obj', '_file_obj', '_deleted', '_callback', '_user_data', '_timeout_ns')
 
     _iocb: IOCB
-    _py_obj: py_object  # to avoid garbage collection
+    _py_obj: Optional[py_object]  # `aio_data` points it unless submitted to an `indexed` context
     _file_obj: Union[Any, int]
     _deleted: bool
+    _callback: Optional[CompletionCallback]
+    _user_data: Any
+    _timeout_ns: int
 
     def __init__(self, file: Union[Any, int], cmd: IOCBCMD, rw_flags: IOCBRWFlag, priority_class: IOCBPriorityClass,
                  priority_value: int, buffer: int, length: int, offset: int, res_fd: int) -> None:
@@ -43,9 +47,11 @@ class AIOBlock(metaclass=ABCMeta):
 
         self._file_obj = file
         self._deleted = False
-        self._py_obj = py_object(self)
+        self._callback = None
+        self._user_data = None
+        self._timeout_ns = 0
+        self._py_obj = None
         self._iocb = IOCB(
-                aio_data=addressof(self._py_obj),
                 aio_rw_flags=rw_flags,
                 aio_lio_opcode=cmd,
                 aio_reqprio=priority,
@@ -104,17 +110,23 @@ class AIOBlock(metaclass=ABCMeta):
         if new_cmd is self.cmd:
             return self
 
+        keep_buf = False
+
         if new_cmd is IOCBCMD.PWRITE:
             from .non_vector import WriteBlock
             block = WriteBlock.__new__(WriteBlock)
             if self.cmd is not IOCBCMD.PREAD:
                 self._reset_buf()
+            else:
+                keep_buf = True
 
         elif new_cmd is IOCBCMD.PREAD:
             from .non_vector import ReadBlock
             block = ReadBlock.__new__(ReadBlock)
             if self.cmd is not IOCBCMD.PWRITE:
                 self._reset_buf()
+            else:
+                keep_buf = True
 
         elif new_cmd is IOCBCMD.FSYNC:
             from .non_rw import FsyncBlock
@@ -136,21 +148,33 @@ class AIOBlock(metaclass=ABCMeta):
             block = WriteVBlock.__new__(WriteVBlock)
             if self.cmd is not IOCBCMD.PREADV:
                 self._reset_buf()
+            else:
+                keep_buf = True
 
         elif new_cmd is IOCBCMD.PREADV:
             from .vector import ReadVBlock
             block = ReadVBlock.__new__(ReadVBlock)
             if self.cmd is not IOCBCMD.PWRITEV:
                 self._reset_buf()
+            else:
+                keep_buf = True
         else:
             raise ValueError(f'Unknown command :{new_cmd}')
 
-        block._py_obj = py_object(block)
+        block._py_obj = None
         block._iocb = self._iocb
         block._iocb.aio_lio_opcode = new_cmd
-        block._iocb.aio_data = addressof(block._py_obj)
         block._file_obj = self._file_obj
         block._deleted = False
+        block._callback = self._callback
+        block._user_data = self._user_data
+        block._timeout_ns = self._timeout_ns
+
+        if keep_buf:
+            # the buffer and its pins are still referenced by the IOCB
+            for slot in ('_buffer', '_pins', '_io_vectors'):
+                if hasattr(self, slot):
+                    setattr(block, slot, getattr(self, slot))
 
         self._deleted = True
 
@@ -225,3 +249,52 @@ class AIOBlock(metaclass=ABCMeta):
     def set_priority(self, io_class: IOCBPriorityClass, priority: int) -> None:
         self.flag |= IOCBFlag.IOPRIO
         self._iocb.aio_reqprio = gen_io_priority(io_class, priority)
+
+    @property
+    def callback(self) -> Optional[CompletionCallback]:
+        """
+        Called as `callback(block, res, res2)` by :meth:`~linux_aio.AIOContext.run_completions`.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._callback
+
+    @callback.setter
+    def callback(self, callback: Optional[CompletionCallback]) -> None:
+        self._callback = callback
+
+    @property
+    def user_data(self) -> Any:
+        """
+        An opaque tag of the caller. It is never read by this library.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._user_data
+
+    @user_data.setter
+    def user_data(self, user_data: Any) -> None:
+        self._user_data = user_data
+
+    @property
+    def timeout_ns(self) -> int:
+        """
+        If positive, :class:`~linux_aio.AIOContext` cancels this block when it is not reaped within `timeout_ns`
+        from its submission, and reports its completion as timed out.
+
+        .. versionadded:: 0.5.0
+        """
+        return self._timeout_ns
+
+    @timeout_ns.setter
+    def timeout_ns(self, timeout_ns: int) -> None:
+        if timeout_ns < 0:
+            raise ValueError(f'timeout_ns must not be negative. current: {timeout_ns}')
+        self._timeout_ns = timeout_ns
+
+    def set_callback(self, callback: Optional[CompletionCallback], user_data: Any = None) -> None:
+        """
+        .. versionadded:: 0.5.0
+        """
+        self._callback = callback
+        self._user_data = user_data
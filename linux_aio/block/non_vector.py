@@ -1,7 +1,10 @@
 # coding: UTF-8
 
+from array import array
+
 from linux_aio_bind import IOCBCMD, IOCBPriorityClass, IOCBRWFlag
-from typing import Any, Union
+from mmap import mmap
+from typing import Any, Optional, Union
 
 from .rw import RWBlock
 
@@ -11,21 +14,25 @@ class NonVectorBlock(RWBlock):
     .. versionadded:: 0.3.0
     """
 
-    BUF_TYPE = Union[bytearray, bytes]
+    BUF_TYPE = Union[bytearray, bytes, memoryview, mmap, array]
 
     def __init__(self,
                  file: Any,
                  cmd: IOCBCMD,
                  buffer: BUF_TYPE,
-                 length: int,
+                 length: Optional[int],
                  offset: int,
                  rw_flags: IOCBRWFlag,
                  priority_class: IOCBPriorityClass,
                  priority_value: int,
                  res_fd: int) -> None:
+        address, self._pins = self._pin_buffer(buffer)
         self._buffer = buffer
 
-        super().__init__(file, cmd, self._inner_buf_addr(self._buffer), length, offset,
+        if length is None:
+            length = self._buf_len(buffer)
+
+        super().__init__(file, cmd, address, length, offset,
                          rw_flags, priority_class, priority_value, res_fd)
 
     @property
@@ -34,9 +41,30 @@ class NonVectorBlock(RWBlock):
 
     @buffer.setter
     def buffer(self, buffer: BUF_TYPE) -> None:
+        address, self._pins = self._pin_buffer(buffer)
+        self._buffer = buffer
+        self._iocb.aio_buf = address
+        self._iocb.aio_nbytes = self._buf_len(buffer)
+
+    def _rebind(self, file: Any, buffer: BUF_TYPE, offset: int, length: Optional[int], rw_flags: IOCBRWFlag) -> None:
+        """resets every field of the IOCB in place, as if this block was newly constructed with the arguments"""
+        iocb = self._iocb
+        iocb.aio_fildes = file if type(file) is int else self._get_fd(file)
+        address, pins = self._pin_buffer(buffer)
+        iocb.aio_buf = address
+        iocb.aio_nbytes = self._buf_len(buffer) if length is None else length
+        iocb.aio_offset = offset
+        iocb.aio_rw_flags = rw_flags
+        iocb.aio_reqprio = 0
+        iocb.aio_flags = 0
+        iocb.aio_resfd = 0
+
+        self._file_obj = file
         self._buffer = buffer
-        self._iocb.aio_buf = self._inner_buf_addr(buffer)
-        self._iocb.aio_nbytes = len(buffer)
+        self._pins = pins
+        self._callback = None
+        self._user_data = None
+        self._timeout_ns = 0
 
     @property
     def length(self) -> int:
@@ -63,11 +91,6 @@ class ReadBlock(NonVectorBlock):
                  res_fd: int = 0) -> None:
         if isinstance(buffer, str):
             buffer = buffer.encode()
-        else:
-            buffer = buffer
-
-        if length is None:
-            length = len(buffer)
 
         super().__init__(file, IOCBCMD.PREAD, buffer, length, offset, rw_flags, priority_class, priority_value, res_fd)
 
@@ -88,11 +111,6 @@ class WriteBlock(NonVectorBlock):
                  res_fd: int = 0) -> None:
         if isinstance(content, str):
             content = content.encode()
-        else:
-            content = content
-
-        if length is None:
-            length = len(content)
 
         super().__init__(file, IOCBCMD.PWRITE, content, length, offset, rw_flags,
                          priority_class, priority_value, res_fd)
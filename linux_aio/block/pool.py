@@ -0,0 +1,92 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+from linux_aio_bind import IOCBRWFlag
+from typing import Any, Iterable, List, Optional, TYPE_CHECKING, Type, Union
+
+from .non_vector import NonVectorBlock
+
+if TYPE_CHECKING:
+    from ..aio_event import AIOEvent, AIOEventView
+
+
+class BlockPool:
+    """
+    Free list of :class:`ReadBlock` or :class:`WriteBlock`.
+
+    Blocks are constructed once and rebound to a new file, buffer and offset on every :meth:`acquire`,
+    which skips the allocations and argument handling of the constructor.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_block_type', '_free', '_max_free')
+
+    _block_type: Type[NonVectorBlock]
+    _free: List[NonVectorBlock]
+    _max_free: Optional[int]
+
+    def __init__(self, block_type: Type[NonVectorBlock], preallocate: int = 0, max_free: int = None) -> None:
+        if not issubclass(block_type, NonVectorBlock):
+            raise TypeError(f'`block_type` must be ReadBlock or WriteBlock. current: {block_type}')
+
+        self._block_type = block_type
+        self._max_free = max_free
+        self._free = [self._create() for _ in range(preallocate)]
+
+    def _create(self) -> NonVectorBlock:
+        return self._block_type(0, bytes())
+
+    @property
+    def block_type(self) -> Type[NonVectorBlock]:
+        return self._block_type
+
+    def __len__(self) -> int:
+        """the number of free blocks"""
+        return len(self._free)
+
+    # noinspection PyProtectedMember
+    def acquire(self,
+                file: Union[Any, int],
+                buffer: NonVectorBlock.BUF_TYPE,
+                offset: int = 0,
+                length: int = None,
+                rw_flags: IOCBRWFlag = 0) -> NonVectorBlock:
+        """
+        Returns a free block bound to the arguments.
+        The priority and `res_fd` are reset, so set them on the returned block if needed.
+        """
+        free = self._free
+        block = free.pop() if free else self._create()
+        block._rebind(file, buffer, offset, length, rw_flags)
+        return block
+
+    # noinspection PyProtectedMember
+    def release(self, *blocks: NonVectorBlock) -> None:
+        """Returns completed `blocks` to the pool. They must not be used after this call."""
+        block_type = self._block_type
+        free = self._free
+        max_free = self._max_free
+
+        for block in blocks:
+            if type(block) is not block_type:
+                raise TypeError(f'{block} does not belong to a pool of {block_type}.')
+            if block._deleted:
+                raise ValueError(
+                        f'{block} can not be used because it has already been transformed into another AIOBlock.')
+
+            if max_free is None or len(free) < max_free:
+                # drop references to user objects while the block is idle
+                block._file_obj = 0
+                block._buffer = bytes()
+                block._pins = None
+                free.append(block)
+
+    def reclaim(self, events: Iterable[Union[AIOEvent, AIOEventView]]) -> None:
+        """Releases blocks of reaped `events` that belong to this pool. Blocks of other types are skipped."""
+        block_type = self._block_type
+
+        for event in events:
+            block = event.aio_block
+            if type(block) is block_type and not block._deleted:
+                self.release(block)
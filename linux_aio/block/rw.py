@@ -2,7 +2,8 @@
 
 from __future__ import annotations
 
-from ctypes import c_char, c_char_p, c_void_p, cast
+import ctypes
+from ctypes import Structure, addressof, byref, c_char, c_char_p, c_int, c_ssize_t, c_void_p, py_object
 
 from abc import abstractmethod
 from linux_aio_bind import IOCBCMD, IOCBPriorityClass, IOCBRWFlag
@@ -10,17 +11,69 @@ from typing import Any, ClassVar, Tuple, Type, TypeVar, Union
 
 from .base import AIOBlock
 
-_NAT_BUF_TYPE = TypeVar('_NAT_BUF_TYPE', bytearray, bytes)
+_NAT_BUF_TYPE = TypeVar('_NAT_BUF_TYPE', bytearray, bytes, memoryview)
+
+_PY_BUF_SIMPLE = 0
+_pythonapi = getattr(ctypes, 'pythonapi', None)
+
+
+class _PyBuffer(Structure):
+    """
+    `Py_buffer` of the Python C API
+
+    .. versionadded:: 0.5.0
+    """
+    _fields_ = (
+        ('buf', c_void_p),
+        ('obj', c_void_p),
+        ('len', c_ssize_t),
+        ('itemsize', c_ssize_t),
+        ('readonly', c_int),
+        ('ndim', c_int),
+        ('format', c_char_p),
+        ('shape', c_void_p),
+        ('strides', c_void_p),
+        ('suboffsets', c_void_p),
+        ('internal', c_void_p),
+    )
+
+
+class _ReadOnlyBufferPin:
+    """
+    Holds a buffer export of a read-only object, which ctypes can not do by itself.
+    The exporter keeps the memory alive and in place until the pin is garbage collected.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_view',)
+
+    _view: _PyBuffer
+
+    def __init__(self, buffer: Any) -> None:
+        view = _PyBuffer()
+        _pythonapi.PyObject_GetBuffer(py_object(buffer), byref(view), _PY_BUF_SIMPLE)
+        self._view = view
+
+    @property
+    def address(self) -> int:
+        return self._view.buf
+
+    def __del__(self) -> None:
+        _pythonapi.PyBuffer_Release(byref(self._view))
 
 
 class RWBlock(AIOBlock):
     """
     .. versionadded:: 0.3.0
+    .. versionchanged:: 0.5.0
+        Accepts any object that supports the buffer protocol.
+        The buffer is pinned until it is replaced, so it can not be resized while the kernel accesses it.
     """
-    __slots__ = ('_buffer',)
+    __slots__ = ('_buffer', '_pins')
 
     BUF_TYPE: ClassVar[Type[Union[_NAT_BUF_TYPE, Tuple[_NAT_BUF_TYPE, ...]]]]
     _buffer: RWBlock.BUF_TYPE
+    _pins: Any  # to keep buffers exported while they are used by the kernel
 
     def __init__(self,
                  file: Any,
@@ -37,22 +90,59 @@ class RWBlock(AIOBlock):
                          buffer, length, offset, res_fd)
 
     @classmethod
-    def _inner_buf_pointer(cls, buffer: Union[bytes, bytearray]) -> c_void_p:
+    def _pin_buffer(cls, buffer: Any) -> Tuple[int, Any]:
+        """
+        Returns the address of the contents of `buffer` and an object that pins it.
+        The buffer can not be resized or released while the pin is alive.
+        """
         if isinstance(buffer, bytes):
-            ori_pointer = c_char_p(buffer)
+            pin = c_char_p(buffer)
+            return c_void_p.from_buffer(pin).value, pin
 
         elif isinstance(buffer, bytearray):
             arr_t = c_char * len(buffer)
-            ori_pointer = arr_t.from_buffer(buffer)
+            pin = arr_t.from_buffer(buffer)
+            return addressof(pin), pin
 
-        else:
+        try:
+            view = memoryview(buffer)
+        except TypeError:
             raise NotImplementedError(f'Unknown buffer type: {type(buffer)}')
 
-        return cast(ori_pointer, c_void_p)
+        if not view.c_contiguous:
+            raise ValueError(f'The buffer must be C-contiguous: {buffer}')
+
+        if not view.readonly:
+            # e.g. memoryview, mmap.mmap, array.array or numpy.ndarray
+            arr_t = c_char * view.nbytes
+            pin = arr_t.from_buffer(view)
+            return addressof(pin), pin
+
+        elif _pythonapi is not None:
+            pin = _ReadOnlyBufferPin(view)
+            return pin.address, pin
+
+        else:
+            pin = c_char_p(view.tobytes())
+            return c_void_p.from_buffer(pin).value, pin
+
+    @classmethod
+    def _inner_buf_pointer(cls, buffer: Any) -> c_void_p:
+        """the buffer is not pinned. use :meth:`_pin_buffer` if the buffer is going to be used by the kernel"""
+        return c_void_p(cls._pin_buffer(buffer)[0])
 
     @classmethod
-    def _inner_buf_addr(cls, buffer: Union[bytes, bytearray]) -> int:
-        return cls._inner_buf_pointer(buffer).value
+    def _inner_buf_addr(cls, buffer: Any) -> int:
+        """the buffer is not pinned. use :meth:`_pin_buffer` if the buffer is going to be used by the kernel"""
+        return cls._pin_buffer(buffer)[0]
+
+    @classmethod
+    def _buf_len(cls, buffer: Any) -> int:
+        """the size of `buffer` in bytes"""
+        if isinstance(buffer, (bytes, bytearray)):
+            return len(buffer)
+        else:
+            return memoryview(buffer).nbytes
 
     @property
     @abstractmethod
@@ -1,8 +1,10 @@
 # coding: UTF-8
 
+from array import array
 from ctypes import addressof
 
 from linux_aio_bind import IOCBCMD, IOCBPriorityClass, IOCBRWFlag, IOVec, create_c_array
+from mmap import mmap
 from typing import Any, Iterable, Tuple, Union
 
 from .rw import RWBlock, _NAT_BUF_TYPE
@@ -14,7 +16,7 @@ class VectorBlock(RWBlock):
     """
     __slots__ = ('_io_vectors',)
 
-    BUF_TYPE = Tuple[Union[bytearray, bytes], ...]
+    BUF_TYPE = Tuple[Union[bytearray, bytes, memoryview, mmap, array], ...]
     _io_vectors: Any
 
     def __init__(self,
@@ -27,18 +29,22 @@ class VectorBlock(RWBlock):
                  priority_value: int,
                  res_fd: int) -> None:
         self._buffer = tuple(buffer)
-        self._io_vectors = self._create_io_vectors(self._buffer)
+        self._io_vectors, self._pins = self._create_io_vectors(self._buffer)
 
         super().__init__(file, cmd, addressof(self._io_vectors), len(self._buffer), offset,
                          rw_flags, priority_class, priority_value, res_fd)
 
     @classmethod
-    def _create_io_vectors(cls, buffers: BUF_TYPE) -> Any:
-        return create_c_array(
+    def _create_io_vectors(cls, buffers: BUF_TYPE) -> Tuple[Any, Tuple[Any, ...]]:
+        pinned = tuple(cls._pin_buffer(buf) for buf in buffers)
+
+        io_vectors = create_c_array(
                 IOVec,
-                (IOVec(cls._inner_buf_pointer(buf), len(buf)) for buf in buffers)
+                (IOVec(address, cls._buf_len(buf)) for (address, _), buf in zip(pinned, buffers))
         )
 
+        return io_vectors, tuple(pin for _, pin in pinned)
+
     @property
     def buffer(self) -> BUF_TYPE:
         return self._buffer
@@ -46,7 +52,7 @@ class VectorBlock(RWBlock):
     @buffer.setter
     def buffer(self, buffer: Iterable[_NAT_BUF_TYPE]) -> None:
         self._buffer = tuple(buffer)
-        self._io_vectors = self._create_io_vectors(self._buffer)
+        self._io_vectors, self._pins = self._create_io_vectors(self._buffer)
         self._iocb.aio_buf = addressof(self._io_vectors)
         self._iocb.aio_nbytes = len(self._buffer)
 
@@ -0,0 +1,364 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from ctypes import addressof
+from types import TracebackType
+
+from linux_aio_bind import IOEvent
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+from .aio_context import AIOContext
+from .aio_event import AIOEvent
+from .arena import BufferArena
+from .block import AIOBlock, ReadBlock, WriteBlock, WriteVBlock
+from .registry import FileHandle
+
+# (st_dev, st_ino) of a file
+_FileKey = Tuple[int, int]
+# (st_dev, st_ino, aligned offset) of a cached block
+_BlockKey = Tuple[int, int, int]
+
+
+class BlockCache:
+    """
+    Caches the contents of :class:`ReadBlock` s submitted through it, in units of `block_size` bytes,
+    for files opened with `O_DIRECT` that can not rely on the page cache.
+
+    Blocks are keyed by `(st_dev, st_ino, offset)`, so every file descriptor of the same file shares the cache.
+    A read whose whole range is cached completes in :meth:`submit` without a syscall,
+    and its event is returned by the next :meth:`get_events` before anything is reaped from the context.
+    Otherwise the read is submitted as it is, and the aligned blocks it covers are cached when it completes.
+    Blocks at the end of a file that are not full are never cached, so reads past the end always miss.
+
+    At most `capacity` bytes are cached in buffers of a :class:`BufferArena`.
+    Blocks are evicted by 2Q, so a single scan over a large file does not flush blocks that are read repeatedly:
+    a block enters a FIFO on its first read, and only moves to the LRU of hot blocks
+    if it is read again soon after it is evicted from the FIFO.
+
+    :class:`WriteBlock` s and :class:`WriteVBlock` s submitted through the cache invalidate the blocks they overlap,
+    and no block of a file is cached from reads that may race with writes to it.
+    Writes and truncation that bypass the cache are not seen, so every write to cached files has to be submitted
+    through it, and the cache has to be :meth:`clear` ed after any other change.
+
+    Files are identified with `fstat` on each submission, except for :class:`~linux_aio.registry.FileHandle` s
+    that already know their identity. Use them for hits without any syscall.
+
+    Completions have to be reaped through :meth:`get_events`. Completion callbacks of blocks are not called.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_ctx', '_block_size', '_arena', '_free', '_in', '_out', '_main', '_max_in', '_max_out', '_slots',
+                 '_ready', '_reads', '_writes', '_epochs', '_writing', '_hits', '_misses', '_evictions',
+                 '_invalidations')
+
+    _ctx: AIOContext
+    _block_size: int
+    _arena: BufferArena
+    _free: List[memoryview]
+    _in: OrderedDict  # Dict[_BlockKey, memoryview], FIFO of blocks read once
+    _out: OrderedDict  # Dict[_BlockKey, None], FIFO of keys evicted from `_in`
+    _main: OrderedDict  # Dict[_BlockKey, memoryview], LRU of blocks read again
+    _max_in: int
+    _max_out: int
+    _slots: int
+    _ready: List[AIOEvent]  # events of hits that are not returned yet
+    _reads: Dict[ReadBlock, Tuple[_FileKey, int]]  # in-flight missed reads with the epoch of their file
+    _writes: Dict[AIOBlock, _FileKey]  # in-flight writes
+    _epochs: Dict[_FileKey, int]  # bumped whenever a write to the file is submitted or completed
+    _writing: Dict[_FileKey, int]  # the number of in-flight writes to each file
+    _hits: int
+    _misses: int
+    _evictions: int
+    _invalidations: int
+
+    def __init__(self,
+                 ctx: AIOContext,
+                 capacity: int = 64 << 20,
+                 block_size: int = 4096,
+                 in_ratio: float = 0.25,
+                 out_ratio: float = 0.5) -> None:
+        """
+        :param in_ratio: the share of `capacity` for blocks read once.
+        :param out_ratio: how many evicted keys are remembered, relative to the number of cached blocks.
+        """
+        slots = capacity // block_size
+        if block_size <= 0 or slots <= 0 or not 0 < in_ratio < 1 or out_ratio < 0:
+            raise ValueError(f'capacity must hold at least one block, in_ratio must be between 0 and 1, '
+                             f'and out_ratio must not be negative. '
+                             f'current: {capacity, block_size, in_ratio, out_ratio}')
+
+        self._ctx = ctx
+        self._block_size = block_size
+        self._arena = BufferArena({block_size: slots})
+        self._free = list()
+        self._in = OrderedDict()
+        self._out = OrderedDict()
+        self._main = OrderedDict()
+        self._slots = slots
+        self._max_in = max(int(slots * in_ratio), 1)
+        self._max_out = int(slots * out_ratio)
+        self._ready = list()
+        self._reads = dict()
+        self._writes = dict()
+        self._epochs = dict()
+        self._writing = dict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def ctx(self) -> AIOContext:
+        return self._ctx
+
+    @property
+    def block_size(self) -> int:
+        return self._block_size
+
+    @property
+    def cached_bytes(self) -> int:
+        return (len(self._in) + len(self._main)) * self._block_size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self._hits + self._misses
+        return self._hits / total if total else 0.0
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    @property
+    def invalidations(self) -> int:
+        return self._invalidations
+
+    # noinspection PyProtectedMember
+    @classmethod
+    def _file_key(cls, block: AIOBlock) -> _FileKey:
+        file = block._file_obj
+        if type(file) is FileHandle:
+            block._iocb.aio_fildes = file.fileno()
+            return file._identity
+
+        st = os.fstat(block._iocb.aio_fildes)
+        return st.st_dev, st.st_ino
+
+    def _lookup(self, key: _BlockKey) -> Optional[memoryview]:
+        buffer = self._main.get(key)
+        if buffer is not None:
+            self._main.move_to_end(key)
+            return buffer
+        return self._in.get(key)
+
+    # noinspection PyProtectedMember
+    def _try_hit(self, block: ReadBlock, file_key: _FileKey) -> bool:
+        """completes `block` from the cache if every block of its range is cached"""
+        block_size = self._block_size
+        offset = block.offset
+        end = offset + block.length
+        cached = list()
+
+        for start in range(offset - offset % block_size, end, block_size):
+            buffer = self._lookup((*file_key, start))
+            if buffer is None:
+                return False
+            cached.append((start, buffer))
+
+        target = memoryview(block.buffer).cast('B')
+        for start, buffer in cached:
+            begin = max(offset, start)
+            stop = min(end, start + block_size)
+            target[begin - offset:stop - offset] = buffer[begin - start:stop - start]
+
+        self._ready.append(AIOEvent(IOEvent(0, addressof(block._iocb), end - offset, 0), block))
+        return True
+
+    def _fill(self, block: ReadBlock, file_key: _FileKey, res: int) -> None:
+        """caches the aligned blocks that `block` read completely"""
+        block_size = self._block_size
+        offset = block.offset
+        end = offset + res
+        source = memoryview(block.buffer).cast('B')
+
+        first = -(-offset // block_size) * block_size
+        for start in range(first, end - block_size + 1, block_size):
+            key = (*file_key, start)
+            if key in self._in or key in self._main:
+                continue
+
+            buffer = self._allocate()
+            buffer[:] = source[start - offset:start - offset + block_size]
+            self._insert(key, buffer)
+
+    def _allocate(self) -> memoryview:
+        if self._free:
+            return self._free.pop()
+        if len(self._in) + len(self._main) < self._slots:
+            return self._arena.acquire(self._block_size)
+
+        # 2Q reclaim: the FIFO gives up its oldest block if it holds more than its share
+        if len(self._in) > self._max_in or not self._main:
+            key, buffer = self._in.popitem(last=False)
+            if self._max_out:
+                self._out[key] = None
+                if len(self._out) > self._max_out:
+                    self._out.popitem(last=False)
+        else:
+            key, buffer = self._main.popitem(last=False)
+
+        self._evictions += 1
+        return buffer
+
+    def _insert(self, key: _BlockKey, buffer: memoryview) -> None:
+        if key in self._out:
+            del self._out[key]
+            self._main[key] = buffer
+        else:
+            self._in[key] = buffer
+
+    def _invalidate(self, file_key: _FileKey, offset: int, length: int) -> None:
+        block_size = self._block_size
+        for start in range(offset - offset % block_size, offset + length, block_size):
+            key = (*file_key, start)
+            buffer = self._in.pop(key, None)
+            if buffer is None:
+                buffer = self._main.pop(key, None)
+            if buffer is not None:
+                self._free.append(buffer)
+                self._invalidations += 1
+
+    # noinspection PyProtectedMember
+    def _write_range(self, block: AIOBlock) -> Tuple[int, int]:
+        if isinstance(block, WriteVBlock):
+            return block.offset, sum(io_vector.iov_len for io_vector in block._io_vectors)
+        return block.offset, block.length
+
+    def submit(self, *blocks: AIOBlock) -> int:
+        """
+        Completes cached reads right away and submits the rest of `blocks` to the context.
+        Returns the number of blocks that are completed or submitted, which are always a prefix of `blocks`.
+        """
+        forward: List[AIOBlock] = list()
+        misses: Dict[ReadBlock, _FileKey] = dict()
+        writes: Dict[AIOBlock, _FileKey] = dict()
+        accepted = 0
+
+        def flush() -> bool:
+            """submits `forward` and returns whether all of them are accepted"""
+            nonlocal accepted
+            if not forward:
+                return True
+
+            submitted = self._ctx.submit(*forward)
+            for block in forward[:submitted]:
+                self._track(block, misses, writes)
+            accepted += submitted
+            complete = submitted == len(forward)
+            forward.clear()
+            misses.clear()
+            writes.clear()
+            return complete
+
+        for block in blocks:
+            if type(block) is ReadBlock:
+                file_key = self._file_key(block)
+                if not self._writing.get(file_key) and self._try_hit(block, file_key):
+                    # hits must not overtake the blocks before them
+                    if not flush():
+                        self._ready.pop()
+                        return accepted
+                    self._hits += 1
+                    accepted += 1
+                    continue
+
+                self._misses += 1
+                misses[block] = file_key
+
+            elif isinstance(block, (WriteBlock, WriteVBlock)):
+                file_key = self._file_key(block)
+                writes[block] = file_key
+                self._invalidate(file_key, *self._write_range(block))
+
+            forward.append(block)
+
+        flush()
+        return accepted
+
+    def _track(self, block: AIOBlock, misses: Dict[ReadBlock, _FileKey], writes: Dict[AIOBlock, _FileKey]) -> None:
+        """remembers the submitted `block` if it is a missed read or a write"""
+        file_key = misses.get(block)
+        if file_key is not None:
+            self._reads[block] = (file_key, self._epochs.get(file_key, 0))
+            return
+
+        file_key = writes.get(block)
+        if file_key is not None:
+            self._writes[block] = file_key
+            self._epochs[file_key] = self._epochs.get(file_key, 0) + 1
+            self._writing[file_key] = self._writing.get(file_key, 0) + 1
+
+    def _complete(self, events: Iterable[AIOEvent]) -> None:
+        for event in events:
+            block = event.aio_block
+
+            read = self._reads.pop(block, None)
+            if read is not None:
+                file_key, epoch = read
+                res = event.response
+                if res > 0 and not self._writing.get(file_key) and self._epochs.get(file_key, 0) == epoch:
+                    self._fill(block, file_key, res)
+                continue
+
+            file_key = self._writes.pop(block, None)
+            if file_key is not None:
+                self._epochs[file_key] += 1
+                self._writing[file_key] -= 1
+                if not self._writing[file_key]:
+                    del self._writing[file_key]
+                self._invalidate(file_key, *self._write_range(block))
+
+    def get_events(self, min_jobs: int, max_jobs: int, timeout_ns: int = 0) -> Tuple[AIOEvent, ...]:
+        """
+        Same as :meth:`AIOContext.get_events`, except that completions of cache hits are returned first.
+        The context is not reaped if there are at least `min_jobs` of them.
+        """
+        ready = self._ready[:max_jobs]
+        del self._ready[:max_jobs]
+
+        if len(ready) >= min_jobs or len(ready) == max_jobs:
+            return tuple(ready)
+
+        events = self._ctx.get_events(min_jobs - len(ready), max_jobs - len(ready), timeout_ns)
+        self._complete(events)
+        return tuple(ready) + events
+
+    def clear(self) -> None:
+        """drops every cached block"""
+        self._free.extend(self._in.values())
+        self._free.extend(self._main.values())
+        self._in.clear()
+        self._main.clear()
+        self._out.clear()
+
+    def close(self) -> None:
+        self.clear()
+        self._free = list()
+        self._arena.close()
+
+    def __enter__(self) -> BlockCache:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
@@ -0,0 +1,191 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import os
+from ctypes import addressof
+
+from linux_aio_bind import IOCBCMD, IOEvent
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .aio_context import AIOContext
+from .aio_event import AIOEvent
+from .block import AIOBlock, NonVectorBlock, ReadBlock, ReadVBlock, VectorBlock, WriteBlock, WriteVBlock
+
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (ValueError, OSError):
+    _IOV_MAX = 1024
+
+# the original blocks of a merged block, with the start of each one relative to the merged block
+_Members = Tuple[Tuple[NonVectorBlock, int], ...]
+
+
+class Coalescer:
+    """
+    Merges runs of adjacent :class:`ReadBlock` s or :class:`WriteBlock` s into one
+    :class:`ReadVBlock` or :class:`WriteVBlock` before they are submitted to `ctx`.
+
+    A run is made of blocks that are consecutive in the arguments of :meth:`submit`,
+    target the same file with the same flags, priority and `res_fd`, and each starts where the previous one ends.
+    Reads may also be merged across gaps of up to `max_gap` bytes, which are read into scratch buffers and dropped.
+    A merged block has at most `max_iov` buffers (`IOV_MAX` by default) and spans at most `max_bytes` bytes.
+
+    Completions have to be reaped through :meth:`get_events` (or passed to :meth:`fan_out`),
+    which reports an event for each original block with its share of the merged result.
+
+    Scratch buffers are not aligned, so keep `max_gap` at 0 for files opened with `O_DIRECT`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_ctx', '_max_bytes', '_max_gap', '_max_iov', '_merged')
+
+    _ctx: AIOContext
+    _max_bytes: int
+    _max_gap: int
+    _max_iov: int
+    _merged: Dict[VectorBlock, _Members]
+
+    def __init__(self, ctx: AIOContext, max_bytes: int = 1 << 20, max_gap: int = 0, max_iov: int = _IOV_MAX) -> None:
+        if max_bytes <= 0 or max_gap < 0 or not 0 < max_iov <= _IOV_MAX:
+            raise ValueError(f'max_bytes and max_iov must be positive, max_iov must not exceed {_IOV_MAX} '
+                             f'and max_gap must not be negative. current: {max_bytes, max_gap, max_iov}')
+
+        self._ctx = ctx
+        self._max_bytes = max_bytes
+        self._max_gap = max_gap
+        self._max_iov = max_iov
+        self._merged = dict()
+
+    @property
+    def ctx(self) -> AIOContext:
+        return self._ctx
+
+    @property
+    def in_flight(self) -> int:
+        """the number of merged blocks whose completions are not reaped yet"""
+        return len(self._merged)
+
+    # noinspection PyProtectedMember
+    def _can_follow(self, prev: AIOBlock, block: AIOBlock, run_start: int, run_iov: int) -> bool:
+        if type(block) is not type(prev) or not isinstance(block, (ReadBlock, WriteBlock)):
+            return False
+
+        iocb, prev_iocb = block._iocb, prev._iocb
+        if (iocb.aio_fildes != prev_iocb.aio_fildes or iocb.aio_rw_flags != prev_iocb.aio_rw_flags
+                or iocb.aio_reqprio != prev_iocb.aio_reqprio or iocb.aio_flags != prev_iocb.aio_flags
+                or iocb.aio_resfd != prev_iocb.aio_resfd):
+            return False
+
+        gap = iocb.aio_offset - (prev_iocb.aio_offset + prev_iocb.aio_nbytes)
+        if gap < 0 or (gap > 0 and (iocb.aio_lio_opcode != IOCBCMD.PREAD or gap > self._max_gap)):
+            return False
+
+        return (run_iov + (gap > 0) < self._max_iov
+                and iocb.aio_offset + iocb.aio_nbytes - run_start <= self._max_bytes)
+
+    # noinspection PyProtectedMember
+    def _runs(self, blocks: Sequence[AIOBlock]) -> Iterable[List[AIOBlock]]:
+        run: List[AIOBlock] = list()
+        run_start = run_iov = 0
+
+        for block in blocks:
+            if run and self._can_follow(run[-1], block, run_start, run_iov):
+                prev_iocb = run[-1]._iocb
+                gap = block._iocb.aio_offset - (prev_iocb.aio_offset + prev_iocb.aio_nbytes)
+                run.append(block)
+                run_iov += 1 + (gap > 0)
+                continue
+
+            if run:
+                yield run
+
+            run = [block]
+            run_start = block._iocb.aio_offset
+            run_iov = 1
+
+        if run:
+            yield run
+
+    # noinspection PyProtectedMember
+    def _merge(self, run: List[NonVectorBlock]) -> VectorBlock:
+        head = run[0]
+        buffers = list()
+        members = list()
+        end = head.offset
+
+        for block in run:
+            if block.offset > end:
+                buffers.append(bytearray(block.offset - end))
+
+            members.append((block, block.offset - head.offset))
+            buffers.append(memoryview(block.buffer).cast('B')[:block.length])
+            end = block.offset + block.length
+
+        iocb = head._iocb
+        if iocb.aio_lio_opcode == IOCBCMD.PREAD:
+            merged = ReadVBlock(iocb.aio_fildes, buffers, head.offset, iocb.aio_rw_flags)
+        else:
+            merged = WriteVBlock(iocb.aio_fildes, buffers, head.offset, iocb.aio_rw_flags)
+
+        merged._iocb.aio_reqprio = iocb.aio_reqprio
+        merged._iocb.aio_flags = iocb.aio_flags
+        merged._iocb.aio_resfd = iocb.aio_resfd
+
+        self._merged[merged] = tuple(members)
+        return merged
+
+    def submit(self, *blocks: AIOBlock) -> int:
+        """
+        Merges runs in `blocks` and submits the result to the context.
+        Returns the number of original blocks that are submitted, which are always a prefix of `blocks`.
+        """
+        runs = tuple(self._runs(blocks))
+        submitting = tuple(run[0] if len(run) == 1 else self._merge(run) for run in runs)
+
+        submitted = 0
+        try:
+            submitted = self._ctx.submit(*submitting)
+        finally:
+            # merged blocks that the kernel did not accept will never complete
+            for block in submitting[submitted:]:
+                self._merged.pop(block, None)
+
+        return sum(len(run) for run in runs[:submitted])
+
+    # noinspection PyProtectedMember
+    def fan_out(self, events: Iterable[AIOEvent]) -> Tuple[AIOEvent, ...]:
+        """
+        Replaces the event of each merged block in `events` with an event for each of its original blocks.
+        An original block gets the bytes of the merged result that fall in its range,
+        or the error of the merged block.
+        """
+        merged = self._merged
+        result = list()
+
+        for event in events:
+            members = merged.pop(event.aio_block, None)
+
+            if members is None:
+                result.append(event)
+                continue
+
+            res = event.response
+            res2 = event.response2
+
+            for block, start in members:
+                if res >= 0:
+                    block_res = min(max(res - start, 0), block.length)
+                else:
+                    block_res = res
+
+                result.append(AIOEvent(IOEvent(0, addressof(block._iocb), block_res, res2), block))
+
+        return tuple(result)
+
+    def get_events(self, min_jobs: int, max_jobs: int, timeout_ns: int = 0) -> Tuple[AIOEvent, ...]:
+        """
+        Same as :meth:`AIOContext.get_events` except that completions of merged blocks are fanned out,
+        so more than `max_jobs` events can be returned.
+        """
+        return self.fan_out(self._ctx.get_events(min_jobs, max_jobs, timeout_ns))
@@ -0,0 +1,259 @@
+# coding: UTF-8
+
+"""
+Copies a file through a pipeline of AIO reads and writes.
+
+Usage: `python -m linux_aio.copy [-h] [--chunk-size SIZE] [--depth N] [--direct] [--no-sparse] SRC DST`
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import mmap
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .aio_context import AIOContext
+from .arena import BufferArena
+from .block import FDsyncBlock, ReadBlock, WriteBlock
+
+_SIZE_UNITS = {'': 1, 'k': 1 << 10, 'm': 1 << 20, 'g': 1 << 30}
+
+
+def parse_size(size: str) -> int:
+    """parses sizes like `4096`, `64k` or `1M`"""
+    size = size.strip().lower().rstrip('ib')
+    unit = size[-1:] if size[-1:] in _SIZE_UNITS else ''
+    return int(size[:len(size) - len(unit)]) * _SIZE_UNITS[unit]
+
+
+def _data_extents(fd: int, size: int) -> Iterator[Tuple[int, int]]:
+    """yields (offset, end) of each data region of a sparse file"""
+    offset = 0
+
+    while offset < size:
+        try:
+            data = os.lseek(fd, offset, os.SEEK_DATA)
+        except OSError as err:
+            if err.errno == errno.ENXIO:
+                # only a hole is left
+                return
+            raise
+
+        hole = os.lseek(fd, data, os.SEEK_HOLE)
+        yield data, min(hole, size)
+        offset = hole
+
+
+def _chunks(fd: int, size: int, chunk_size: int, alignment: int, sparse: bool) -> Iterator[Tuple[int, int]]:
+    extents = None
+
+    if sparse and hasattr(os, 'SEEK_DATA'):
+        try:
+            extents = tuple(_data_extents(fd, size))
+        except OSError as err:
+            if err.errno != errno.EINVAL:
+                raise
+            # the file system does not support SEEK_DATA
+
+    if extents is None:
+        extents = ((0, size),)
+
+    for start, end in extents:
+        start -= start % alignment
+
+        for offset in range(start, end, chunk_size):
+            length = min(chunk_size, end - offset)
+            yield offset, (length + alignment - 1) // alignment * alignment
+
+
+class _Slot:
+    __slots__ = ('read', 'write', 'buffer', 'offset', 'length', 'filled')
+
+    read: ReadBlock
+    write: WriteBlock
+    buffer: memoryview
+    offset: int  # of the chunk in both files
+    length: int  # of the chunk, including the alignment padding
+    filled: int  # bytes of the chunk that are read so far
+
+    def __init__(self, fd_in: int, fd_out: int, buffer: memoryview) -> None:
+        self.buffer = buffer
+        self.read = ReadBlock(fd_in, buffer)
+        self.write = WriteBlock(fd_out, buffer)
+        self.offset = self.length = self.filled = 0
+
+
+def copy_fd(fd_in: int,
+            fd_out: int,
+            chunk_size: int = 1 << 20,
+            depth: int = 16,
+            direct: bool = False,
+            sparse: bool = True) -> int:
+    """
+    Copies the contents of `fd_in` to `fd_out` and returns the number of bytes read from data regions.
+
+    Up to `depth` chunks of `chunk_size` bytes are read and written concurrently.
+    `direct` must be set if either file is opened with `O_DIRECT`, so that buffers, offsets and lengths are aligned.
+    If `sparse` is set, holes found by `SEEK_DATA`/`SEEK_HOLE` are skipped and stay holes in `fd_out`.
+    The copy is finished with `fdatasync` of `fd_out` through :class:`~linux_aio.FDsyncBlock`.
+
+    .. versionadded:: 0.5.0
+    """
+    alignment = mmap.PAGESIZE if direct else 1
+    if chunk_size <= 0 or depth <= 0 or chunk_size % alignment != 0:
+        raise ValueError(f'chunk_size must be a positive multiple of {alignment} and depth must be positive. '
+                         f'current: {chunk_size, depth}')
+
+    size = os.fstat(fd_in).st_size
+    chunks = _chunks(fd_in, size, chunk_size, alignment, sparse)
+    copied = 0
+
+    arena: Optional[BufferArena] = None
+    if direct:
+        arena = BufferArena({chunk_size: depth})
+        buffers = tuple(arena.acquire(chunk_size) for _ in range(depth))
+    else:
+        buffers = tuple(memoryview(bytearray(chunk_size)) for _ in range(depth))
+
+    slots = tuple(_Slot(fd_in, fd_out, buffer) for buffer in buffers)
+    owners: Dict[object, _Slot] = dict()
+    for slot in slots:
+        owners[slot.read] = owners[slot.write] = slot
+
+    free: List[_Slot] = list(slots)
+    in_flight = 0
+
+    try:
+        with AIOContext(depth) as ctx:
+            while True:
+                while free:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+
+                    slot = free.pop()
+                    slot.offset, slot.length = chunk
+                    slot.filled = 0
+                    slot.read.buffer = slot.buffer
+                    slot.read.offset, slot.read.length = chunk
+                    ctx.enqueue(slot.read)
+
+                in_flight += ctx.flush()
+                if in_flight == 0 and ctx.queued == 0:
+                    break
+
+                for event in ctx.get_events(1, depth):
+                    in_flight -= 1
+                    block = event.aio_block
+                    slot = owners[block]
+                    res = event.response
+
+                    if res < 0:
+                        raise OSError(-res, os.strerror(-res))
+
+                    if block is slot.read:
+                        if res > 0:
+                            copied += res
+                            slot.filled += res
+
+                            if slot.filled < min(slot.length, size - slot.offset):
+                                # resubmit the rest of a short read that is not at the end of the file
+                                slot.read.buffer = slot.buffer[slot.filled:slot.length]
+                                slot.read.offset = slot.offset + slot.filled
+                                ctx.enqueue(slot.read)
+                                continue
+
+                        elif slot.filled == 0:
+                            # the file is truncated while copying
+                            free.append(slot)
+                            continue
+
+                        slot.write.buffer = slot.buffer
+                        slot.write.offset = slot.offset
+                        slot.write.length = (slot.filled + alignment - 1) // alignment * alignment
+                        ctx.enqueue(slot.write)
+
+                    elif res < slot.write.length:
+                        # resubmit the rest of a short write
+                        written = slot.write.offset - slot.offset + res
+                        remaining = slot.write.length - res
+                        slot.write.buffer = slot.buffer[written:written + remaining]
+                        slot.write.offset += res
+                        ctx.enqueue(slot.write)
+
+                    else:
+                        free.append(slot)
+
+            # drop the padding of the last chunk and keep trailing holes
+            os.ftruncate(fd_out, size)
+
+            try:
+                # kept alive until it is reaped, since the context refers to it only by its address
+                sync = FDsyncBlock(fd_out)
+                ctx.submit(sync)
+                res = ctx.get_events(1, 1)[0].response
+                if res < 0:
+                    raise OSError(-res, os.strerror(-res))
+            except OSError as err:
+                if err.errno != errno.EINVAL:
+                    raise
+                # FDSYNC requires Linux 4.18 or later
+                os.fdatasync(fd_out)
+
+    finally:
+        if arena is not None:
+            del slots, owners, free
+            arena.close()
+
+    return copied
+
+
+def copy_file(src: str,
+              dst: str,
+              chunk_size: int = 1 << 20,
+              depth: int = 16,
+              direct: bool = False,
+              sparse: bool = True) -> int:
+    """
+    Copies the file `src` to `dst` with :func:`copy_fd` and returns the number of bytes read from data regions.
+    `dst` is created with the permission bits of `src` or truncated if it exists.
+
+    .. versionadded:: 0.5.0
+    """
+    flags = os.O_CLOEXEC | (os.O_DIRECT if direct else 0)
+
+    fd_in = os.open(src, os.O_RDONLY | flags)
+    try:
+        fd_out = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | flags, os.fstat(fd_in).st_mode & 0o7777)
+        try:
+            return copy_fd(fd_in, fd_out, chunk_size, depth, direct, sparse)
+        finally:
+            os.close(fd_out)
+    finally:
+        os.close(fd_in)
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m linux_aio.copy', description='Copies a file with Linux AIO.')
+    parser.add_argument('src')
+    parser.add_argument('dst')
+    parser.add_argument('--chunk-size', type=parse_size, default=1 << 20, help='size of each I/O (default: 1M)')
+    parser.add_argument('--depth', type=int, default=16, help='number of chunks in flight (default: 16)')
+    parser.add_argument('--direct', action='store_true', help='bypass the page cache with O_DIRECT')
+    parser.add_argument('--no-sparse', dest='sparse', action='store_false', help='copy holes as zeros')
+    args = parser.parse_args(argv)
+
+    try:
+        copy_file(args.src, args.dst, args.chunk_size, args.depth, args.direct, args.sparse)
+    except OSError as err:
+        print(f'{parser.prog}: {err}', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
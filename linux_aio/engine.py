@@ -0,0 +1,162 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import glob
+import os
+import re
+from concurrent.futures import Future
+from types import TracebackType
+
+from linux_aio_bind import IOCBRWFlag
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from .block import AIOBlock, NonVectorBlock, ReadBlock, WriteBlock
+from .future_context import FutureAIOContext, _Request
+
+
+def route_by_fd(block: AIOBlock) -> int:
+    """keeps all requests to the same file on the same shard, so they are submitted in order"""
+    return block.fileno
+
+
+def _parse_cpu_list(cpu_list: str) -> FrozenSet[int]:
+    """parses the format of `/sys/devices/system/node/node*/cpulist`, e.g. `0-3,8-11`"""
+    cpus = set()
+
+    for part in cpu_list.strip().split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.update(range(int(first), int(last or first) + 1))
+
+    return frozenset(cpus)
+
+
+def numa_nodes() -> Tuple[FrozenSet[int], ...]:
+    """CPUs of each NUMA node. A single node of every available CPU if the system does not report nodes."""
+    nodes = list()
+
+    for path in glob.glob('/sys/devices/system/node/node*/cpulist'):
+        node = int(re.search(r'node(\d+)/cpulist$', path).group(1))
+        with open(path) as fp:
+            cpus = _parse_cpu_list(fp.read())
+        if cpus:
+            nodes.append((node, cpus))
+
+    if not nodes:
+        return (frozenset(os.sched_getaffinity(0)),)
+
+    return tuple(cpus for _, cpus in sorted(nodes))
+
+
+class ShardedEngine:
+    """
+    Spreads requests over `shards` :class:`FutureAIOContext` s of `max_jobs`, each with its own reaper thread.
+
+    A request is routed to the shard `router(block) % shards`, by file descriptor by default.
+    Each reaper thread submits the requests routed to it in batches and reaps its own completions,
+    which runs in parallel with other shards since the GIL is released while the kernel is waited on.
+    Results are delivered through :class:`concurrent.futures.Future` s resolving to :class:`AIOEvent` s.
+
+    Workers can be pinned to CPUs with `cpu_affinity` (a set of CPUs for each shard, reused cyclically),
+    or spread over NUMA nodes with `numa`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_shards', '_router')
+
+    _shards: Tuple[FutureAIOContext, ...]
+    _router: Callable[[AIOBlock], int]
+
+    def __init__(self,
+                 shards: int = None,
+                 max_jobs: int = 128,
+                 router: Callable[[AIOBlock], int] = route_by_fd,
+                 cpu_affinity: Sequence[Iterable[int]] = None,
+                 numa: bool = False) -> None:
+        if shards is None:
+            shards = len(os.sched_getaffinity(0))
+        if shards <= 0 or max_jobs <= 0:
+            raise ValueError(f'Both shards and max_jobs must be positive. current: {shards, max_jobs}')
+        if cpu_affinity is not None and numa:
+            raise ValueError('Only one of cpu_affinity and numa can be given.')
+
+        if numa:
+            cpu_affinity = numa_nodes()
+
+        self._router = router
+        self._shards = tuple()
+
+        shard_list = list()
+        try:
+            for index in range(shards):
+                cpus = None if not cpu_affinity else cpu_affinity[index % len(cpu_affinity)]
+                shard_list.append(FutureAIOContext(max_jobs, cpus, f'linux_aio-shard-{index}'))
+        except BaseException:
+            for shard in shard_list:
+                shard.close()
+            raise
+
+        self._shards = tuple(shard_list)
+
+    @property
+    def shards(self) -> int:
+        return len(self._shards)
+
+    # noinspection PyProtectedMember
+    def _post(self, blocks: Iterable[AIOBlock], check: bool) -> List[Future]:
+        shards = self._shards
+        router = self._router
+        routed: Dict[FutureAIOContext, List[_Request]] = dict()
+        futures = list()
+
+        for block in blocks:
+            future = Future()
+            futures.append(future)
+            shard = shards[router(block) % len(shards)]
+            routed.setdefault(shard, list()).append((block, future, check))
+
+        for shard, requests in routed.items():
+            shard._post(requests)
+
+        return futures
+
+    def submit(self, block: AIOBlock) -> Future:
+        """Returns a future that resolves to the :class:`AIOEvent` of `block`"""
+        return self._post((block,), False)[0]
+
+    def submit_many(self, blocks: Iterable[AIOBlock]) -> List[Future]:
+        """Same as :meth:`submit` for each block, but wakes each shard only once"""
+        return self._post(blocks, False)
+
+    def read(self,
+             file: Any,
+             buffer: Union[str, NonVectorBlock.BUF_TYPE],
+             offset: int = 0,
+             length: int = None,
+             rw_flags: IOCBRWFlag = 0) -> Future:
+        """the future raises :class:`OSError` if the kernel reports an error for the operation"""
+        return self._post((ReadBlock(file, buffer, offset, length, rw_flags),), True)[0]
+
+    def write(self,
+              file: Any,
+              content: Union[str, NonVectorBlock.BUF_TYPE],
+              offset: int = 0,
+              length: int = None,
+              rw_flags: IOCBRWFlag = 0) -> Future:
+        """the future raises :class:`OSError` if the kernel reports an error for the operation"""
+        return self._post((WriteBlock(file, content, offset, length, rw_flags),), True)[0]
+
+    def close(self) -> None:
+        """waits for every submitted request to complete"""
+        for shard in self._shards:
+            shard.close()
+        self._shards = tuple()
+
+    def __enter__(self) -> ShardedEngine:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
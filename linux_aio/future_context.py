@@ -0,0 +1,232 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import os
+import select
+import threading
+from concurrent.futures import Future
+from types import TracebackType
+
+from linux_aio_bind import IOCBRWFlag
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Type, Union
+
+from .aio_context import AIOContext
+from .async_context import _open_eventfd
+from .block import AIOBlock, NonVectorBlock, PollBlock, ReadBlock, WriteBlock
+
+# how often the reaper looks for new requests if the kernel can not wake it up with a `PollBlock`
+_WAKE_INTERVAL_NS = 1_000_000
+
+# (block, future, whether a negative `res` fails the future)
+_Request = Tuple[AIOBlock, Future, bool]
+
+
+class FutureAIOContext:
+    """
+    An :class:`AIOContext` of `max_jobs` driven by a reaper thread, for code that does not run an event loop.
+
+    :meth:`submit` returns a :class:`concurrent.futures.Future` that resolves to the :class:`AIOEvent` of the block.
+    The reaper thread submits requests in batches, sits in a blocking `io_getevents` that releases the GIL,
+    and completes the futures of each batch of completions.
+    A :class:`PollBlock` on an eventfd wakes it up when new requests arrive,
+    or it looks for them every millisecond on kernels without `IOCB_CMD_POLL`.
+
+    The reaper thread can be pinned to `cpus`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_ctx', '_max_jobs', '_cpus', '_thread', '_lock', '_pending', '_closing',
+                 '_wake_fd', '_wake_block')
+
+    _ctx: AIOContext
+    _max_jobs: int
+    _cpus: Optional[FrozenSet[int]]
+    _thread: threading.Thread
+    _lock: threading.Lock
+    _pending: List[_Request]
+    _closing: bool
+    _wake_fd: int
+    _wake_block: PollBlock
+
+    def __init__(self, max_jobs: int, cpus: Iterable[int] = None, name: str = 'linux_aio-reaper') -> None:
+        if max_jobs <= 0:
+            raise ValueError(f'max_jobs must be positive. current: {max_jobs}')
+
+        self._max_jobs = max_jobs
+        self._cpus = None if cpus is None else frozenset(cpus)
+        self._lock = threading.Lock()
+        self._pending = list()
+        self._closing = False
+
+        # one more job for the wake-up poll
+        self._ctx = AIOContext(max_jobs + 1, indexed=True)
+        self._wake_fd = _open_eventfd()
+        self._wake_block = PollBlock(self._wake_fd, select.POLLIN)
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def max_jobs(self) -> int:
+        return self._max_jobs
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    # noinspection PyProtectedMember
+    def _post(self, requests: Sequence[_Request]) -> None:
+        for block, _, _ in requests:
+            if block._deleted:
+                raise ValueError(
+                        f'{block} can not be used because it has already been transformed into another AIOBlock.')
+
+        with self._lock:
+            if self._closing:
+                raise RuntimeError(f'{self} is closed.')
+            self._pending.extend(requests)
+
+        self._wake()
+
+    def submit(self, block: AIOBlock) -> Future:
+        """
+        Returns a future that resolves to the :class:`AIOEvent` of `block`.
+        The future raises :class:`OSError` if the kernel rejects the submission of `block`.
+        """
+        future = Future()
+        self._post(((block, future, False),))
+        return future
+
+    def submit_many(self, blocks: Iterable[AIOBlock]) -> List[Future]:
+        """Same as :meth:`submit` for each block, but wakes the reaper thread only once"""
+        requests = tuple((block, Future(), False) for block in blocks)
+        self._post(requests)
+        return [future for _, future, _ in requests]
+
+    def read(self,
+             file: Any,
+             buffer: Union[str, NonVectorBlock.BUF_TYPE],
+             offset: int = 0,
+             length: int = None,
+             rw_flags: IOCBRWFlag = 0) -> Future:
+        """the future raises :class:`OSError` if the kernel reports an error for the operation"""
+        future = Future()
+        self._post(((ReadBlock(file, buffer, offset, length, rw_flags), future, True),))
+        return future
+
+    def write(self,
+              file: Any,
+              content: Union[str, NonVectorBlock.BUF_TYPE],
+              offset: int = 0,
+              length: int = None,
+              rw_flags: IOCBRWFlag = 0) -> Future:
+        """the future raises :class:`OSError` if the kernel reports an error for the operation"""
+        future = Future()
+        self._post(((WriteBlock(file, content, offset, length, rw_flags), future, True),))
+        return future
+
+    def _wake(self) -> None:
+        os.write(self._wake_fd, (1).to_bytes(8, 'little'))
+
+    def close(self) -> None:
+        """waits for every submitted request to complete"""
+        with self._lock:
+            self._closing = True
+
+        if self._thread.is_alive():
+            self._wake()
+            self._thread.join()
+
+    def _run(self) -> None:
+        ctx = self._ctx
+        wake_block = self._wake_block
+        futures: Dict[AIOBlock, Tuple[Future, bool]] = dict()
+        backlog: List[_Request] = list()
+
+        if self._cpus is not None:
+            os.sched_setaffinity(0, self._cpus)
+
+        try:
+            ctx.submit(wake_block)
+            timeout_ns = 0
+        except OSError:
+            # IOCB_CMD_POLL requires Linux 4.19 or later
+            timeout_ns = _WAKE_INTERVAL_NS
+
+        try:
+            while True:
+                with self._lock:
+                    requests, self._pending = self._pending, list()
+                    closing = self._closing
+
+                backlog.extend(request for request in requests if request[1].set_running_or_notify_cancel())
+                self._submit(backlog, futures)
+
+                if closing and not futures and not backlog:
+                    break
+
+                for event in ctx.get_events(1, self._max_jobs + 1, timeout_ns):
+                    block = event.aio_block
+
+                    if block is wake_block:
+                        try:
+                            os.read(self._wake_fd, 8)
+                        except BlockingIOError:
+                            pass
+                        ctx.submit(wake_block)
+                        continue
+
+                    future, check = futures.pop(block)
+                    res = event.response
+                    if check and res < 0:
+                        future.set_exception(OSError(-res, os.strerror(-res)))
+                    else:
+                        future.set_result(event)
+
+        finally:
+            with self._lock:
+                self._closing = True
+                backlog.extend(self._pending)
+                self._pending.clear()
+
+            # waits for in-flight requests, including the wake-up poll
+            ctx.close()
+            os.close(self._wake_fd)
+
+            for future, _ in futures.values():
+                future.set_exception(RuntimeError('The reaper thread is stopped before the completion is reaped.'))
+            for _, future, _ in backlog:
+                if future.running() or future.set_running_or_notify_cancel():
+                    future.set_exception(RuntimeError('The reaper thread is stopped before the request is submitted.'))
+
+    def _submit(self, backlog: List[_Request], futures: Dict[AIOBlock, Tuple[Future, bool]]) -> None:
+        ctx = self._ctx
+
+        while backlog:
+            length = min(len(backlog), self._max_jobs - len(futures))
+            if length <= 0:
+                return
+
+            blocks = tuple(block for block, _, _ in backlog[:length])
+
+            try:
+                submitted = ctx.submit(*blocks)
+            except BlockingIOError:
+                return
+            except OSError as err:
+                # `io_submit` reports the error of the first block only
+                _, future, _ = backlog.pop(0)
+                future.set_exception(err)
+                continue
+
+            for block, future, check in backlog[:submitted]:
+                futures[block] = (future, check)
+            del backlog[:submitted]
+
+    def __enter__(self) -> FutureAIOContext:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
@@ -0,0 +1,114 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import warnings
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+from linux_aio_bind import IOCBCMD
+
+
+class TraceRecord:
+    """
+    Metadata of a traced request, passed to every method of a :class:`TraceHook`.
+
+    `block` is the :class:`~linux_aio.block.AIOBlock`, or the :class:`~linux_aio.BlockBatch` of a batched request.
+    Timestamps are from :func:`time.monotonic_ns`, and `complete_ns`, `res` and `res2` are set when it is reaped.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('block', 'fd', 'cmd', 'offset', 'length', 'submit_ns', 'cancel_ns', 'complete_ns', 'res', 'res2')
+
+    block: Any
+    fd: int
+    cmd: IOCBCMD
+    offset: int
+    length: int
+    submit_ns: int
+    cancel_ns: Optional[int]
+    complete_ns: Optional[int]
+    res: Optional[int]
+    res2: Optional[int]
+
+    def __init__(self, block: Any, fd: int, cmd: IOCBCMD, offset: int, length: int, submit_ns: int) -> None:
+        self.block = block
+        self.fd = fd
+        self.cmd = cmd
+        self.offset = offset
+        self.length = length
+        self.submit_ns = submit_ns
+        self.cancel_ns = None
+        self.complete_ns = None
+        self.res = None
+        self.res2 = None
+
+    @property
+    def latency_ns(self) -> Optional[int]:
+        return None if self.complete_ns is None else self.complete_ns - self.submit_ns
+
+    def __repr__(self) -> str:
+        return (f'{type(self).__name__}(fd={self.fd}, cmd={self.cmd.name}, offset={self.offset}, '
+                f'length={self.length}, latency_ns={self.latency_ns}, res={self.res})')
+
+
+def _dispatch(method: Callable[[TraceRecord], Any], record: TraceRecord) -> None:
+    try:
+        method(record)
+    except Exception as err:
+        warnings.warn(f'{method!r} raised {err!r}', RuntimeWarning)
+
+
+class TraceHook:
+    """
+    Base class of hooks installed by :meth:`~linux_aio.AIOContext.set_hook`. Every method does nothing by default.
+
+    One in `sample_every` submitted requests is traced, and only traced requests are reported to
+    :meth:`on_cancel` and :meth:`on_complete`. Requests that are not traced cost a counter decrement.
+    Exceptions raised by a hook are reported as :class:`RuntimeWarning` s, so tracing never breaks the I/O path.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_sample_every',)
+
+    _sample_every: int
+
+    def __init__(self, sample_every: int = 1) -> None:
+        if sample_every <= 0:
+            raise ValueError(f'sample_every must be positive. current: {sample_every}')
+        self._sample_every = sample_every
+
+    @property
+    def sample_every(self) -> int:
+        return self._sample_every
+
+    def on_submit(self, record: TraceRecord) -> None:
+        """called after `io_submit` accepts the request"""
+
+    def on_cancel(self, record: TraceRecord) -> None:
+        """called before the request is canceled, by :meth:`~linux_aio.AIOContext.cancel` or on its deadline"""
+
+    def on_complete(self, record: TraceRecord) -> None:
+        """called when the completion of the request is reaped"""
+
+
+class RecordingHook(TraceHook):
+    """
+    Keeps the last `max_records` (every one if `None`) completed :class:`TraceRecord` s in :attr:`records`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_records',)
+
+    _records: Deque[TraceRecord]
+
+    def __init__(self, sample_every: int = 1, max_records: int = None) -> None:
+        super().__init__(sample_every)
+        self._records = deque(maxlen=max_records)
+
+    @property
+    def records(self) -> Deque[TraceRecord]:
+        return self._records
+
+    def on_complete(self, record: TraceRecord) -> None:
+        self._records.append(record)
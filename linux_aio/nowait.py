@@ -0,0 +1,296 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import errno
+import os
+import select
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import addressof
+from types import TracebackType
+
+from linux_aio_bind import IOCBRWFlag, IOEvent
+from typing import Dict, List, Optional, Tuple, Type
+
+from .aio_context import AIOContext
+from .aio_event import AIOEvent
+from .async_context import _open_eventfd
+from .block import AIOBlock, PollBlock, RWBlock, ReadBlock, ReadVBlock, VectorBlock
+
+FALLBACK_AIO = 'aio'
+FALLBACK_THREADS = 'threads'
+
+_WOULD_BLOCK = (-errno.EAGAIN, -errno.EOPNOTSUPP)
+
+
+class NowaitSubmitter:
+    """
+    Submits reads and writes to `ctx` with `RWF_NOWAIT` first, so that `io_submit` never blocks on them,
+    and reissues the ones that would block.
+
+    A request that the kernel refuses with `EAGAIN` (or `EOPNOTSUPP` from files that do not support `RWF_NOWAIT`),
+    at submission or as its result, is reissued without `RWF_NOWAIT` according to `fallback`:
+
+    - `'threads'`: `preadv(2)` / `pwritev(2)` on a pool of `workers` threads. A :class:`PollBlock` on an eventfd
+      is kept in flight in `ctx` until their results are reaped, so the context has to have room for it,
+      and the results are reaped along with the completions of the context. Requires Linux 4.19 or later,
+      and falls back to `'aio'` on older kernels.
+    - `'aio'`: submitted to the context again, where `io_submit` may block.
+
+    Either way, the result is reported by :meth:`get_events` like any other completion,
+    and the block gets back the RWF flags that it had before :meth:`submit`.
+    Other blocks are submitted as they are.
+
+    Completions have to be reaped through :meth:`get_events` instead of the context.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_ctx', '_fallback', '_executor', '_lock', '_done', '_ready', '_flags', '_threaded',
+                 '_wake_fd', '_wake_block', '_wake_in_flight', '_fast', '_reissued')
+
+    _ctx: AIOContext
+    _fallback: str
+    _executor: Optional[ThreadPoolExecutor]
+    _lock: threading.Lock
+    _done: List[Tuple[AIOBlock, int]]  # results of threads that are not reaped yet
+    _ready: List[AIOEvent]  # reaped events that are not returned yet
+    _flags: Dict[RWBlock, int]  # the original RWF flags of in-flight blocks
+    _threaded: int  # the number of requests on the thread pool
+    _wake_fd: int
+    _wake_block: Optional[PollBlock]
+    _wake_in_flight: bool
+    _fast: int
+    _reissued: int
+
+    def __init__(self, ctx: AIOContext, fallback: str = FALLBACK_THREADS, workers: int = 4) -> None:
+        if fallback not in (FALLBACK_AIO, FALLBACK_THREADS):
+            raise ValueError(f'fallback must be {FALLBACK_AIO!r} or {FALLBACK_THREADS!r}. current: {fallback}')
+        if workers <= 0:
+            raise ValueError(f'workers must be positive. current: {workers}')
+
+        self._ctx = ctx
+        self._fallback = fallback
+        self._executor = None
+        self._lock = threading.Lock()
+        self._done = list()
+        self._ready = list()
+        self._flags = dict()
+        self._threaded = 0
+        self._wake_fd = -1
+        self._wake_block = None
+        self._wake_in_flight = False
+        self._fast = 0
+        self._reissued = 0
+
+        if fallback == FALLBACK_THREADS:
+            self._executor = ThreadPoolExecutor(workers, thread_name_prefix='linux_aio-nowait')
+            self._wake_fd = _open_eventfd()
+            self._wake_block = PollBlock(self._wake_fd, select.POLLIN)
+
+    @property
+    def ctx(self) -> AIOContext:
+        return self._ctx
+
+    @property
+    def fallback(self) -> str:
+        return self._fallback
+
+    @property
+    def fast(self) -> int:
+        """the number of requests completed with `RWF_NOWAIT`"""
+        return self._fast
+
+    @property
+    def reissued(self) -> int:
+        """the number of requests reissued because they would block"""
+        return self._reissued
+
+    def submit(self, *blocks: AIOBlock) -> int:
+        """
+        Submits `blocks` with `RWF_NOWAIT` added to the reads and writes among them.
+        Requests refused at submission are reissued right away and counted as submitted.
+        Returns the number of submitted blocks, which are always a prefix of `blocks`.
+        """
+        ctx = self._ctx
+        flags = self._flags
+
+        for block in blocks:
+            if isinstance(block, RWBlock) and block not in flags:
+                flags[block] = block.rw_flag
+                block.rw_flag |= IOCBRWFlag.NOWAIT
+
+        accepted = 0
+        try:
+            while accepted < len(blocks):
+                try:
+                    accepted += ctx.submit(*blocks[accepted:])
+                except BlockingIOError:
+                    head = blocks[accepted]
+                    # the ring is full unless it is refused for RWF_NOWAIT
+                    if head not in flags or ctx.in_flight_ops >= ctx.max_jobs:
+                        break
+                    self._reissue(head)
+                    accepted += 1
+                except OSError as err:
+                    head = blocks[accepted]
+                    # the file does not support RWF_NOWAIT (e.g. tmpfs on older kernels)
+                    if err.errno != errno.EOPNOTSUPP or head not in flags:
+                        raise
+                    self._reissue(head)
+                    accepted += 1
+        finally:
+            for block in blocks[accepted:]:
+                original = flags.pop(block, None)
+                if original is not None:
+                    block.rw_flag = original
+
+        return accepted
+
+    def _reissue(self, block: RWBlock) -> None:
+        """submits `block` again without `RWF_NOWAIT`, even if the caller had set it"""
+        block.rw_flag = self._flags[block] & ~IOCBRWFlag.NOWAIT
+        self._reissued += 1
+
+        if self._fallback == FALLBACK_THREADS:
+            # armed first, since it may fall back to AIO on older kernels
+            self._arm_wake()
+
+        if self._fallback == FALLBACK_THREADS:
+            with self._lock:
+                self._threaded += 1
+            self._executor.submit(self._run_sync, block)
+        else:
+            self._ctx.enqueue(block)
+            self._ctx.flush()
+
+    def _arm_wake(self) -> None:
+        if self._wake_in_flight:
+            return
+
+        try:
+            self._ctx.submit(self._wake_block)
+            self._wake_in_flight = True
+        except OSError as err:
+            if err.errno != errno.EINVAL:
+                raise
+            # IOCB_CMD_POLL requires Linux 4.19 or later
+            self._fallback = FALLBACK_AIO
+
+    # noinspection PyProtectedMember
+    def _run_sync(self, block: RWBlock) -> None:
+        if isinstance(block, VectorBlock):
+            buffers = [memoryview(buffer).cast('B') for buffer in block.buffer]
+        else:
+            buffers = [memoryview(block.buffer).cast('B')[:block.length]]
+
+        try:
+            if isinstance(block, (ReadBlock, ReadVBlock)):
+                res = os.preadv(block.fileno, buffers, block.offset, block.rw_flag)
+            else:
+                res = os.pwritev(block.fileno, buffers, block.offset, block.rw_flag)
+        except OSError as err:
+            res = -err.errno
+
+        with self._lock:
+            self._done.append((block, res))
+            self._threaded -= 1
+
+        os.write(self._wake_fd, (1).to_bytes(8, 'little'))
+
+    # noinspection PyProtectedMember
+    def _collect(self) -> None:
+        """moves results of threads into the ready events"""
+        with self._lock:
+            done, self._done = self._done, list()
+
+        for block, res in done:
+            original = self._flags.pop(block, None)
+            if original is not None:
+                block.rw_flag = original
+            self._ready.append(AIOEvent(IOEvent(0, addressof(block._iocb), res, 0), block))
+
+    def _on_event(self, event: AIOEvent) -> None:
+        block = event.aio_block
+
+        if block is self._wake_block:
+            self._wake_in_flight = False
+            try:
+                os.read(self._wake_fd, 8)
+            except BlockingIOError:
+                pass
+            # decided under the lock before collecting: a thread that finishes later writes the eventfd after
+            # the read above, which completes the re-armed poll, and one that finished earlier is collected below
+            with self._lock:
+                rearm = self._threaded > 0
+            self._collect()
+            if rearm:
+                self._arm_wake()
+            return
+
+        original = self._flags.get(block)
+        if original is not None:
+            if event.response in _WOULD_BLOCK and block.rw_flag & IOCBRWFlag.NOWAIT:
+                self._reissue(block)
+                return
+
+            del self._flags[block]
+            if block.rw_flag & IOCBRWFlag.NOWAIT:
+                self._fast += 1
+            block.rw_flag = original
+
+        self._ready.append(event)
+
+    def get_events(self, min_jobs: int, max_jobs: int, timeout_ns: int = 0) -> Tuple[AIOEvent, ...]:
+        """
+        Same as :meth:`AIOContext.get_events`, except that reissued requests are reported when they finish
+        instead of their `EAGAIN` results.
+        """
+        ctx = self._ctx
+        end = time.monotonic_ns() + timeout_ns if timeout_ns > 0 else None
+
+        ctx.flush()
+
+        while True:
+            self._collect()
+            if len(self._ready) >= min_jobs:
+                break
+
+            wait_ns = 0
+            if end is not None:
+                wait_ns = end - time.monotonic_ns()
+                if wait_ns <= 0:
+                    break
+
+            for event in ctx.get_events(1, max(max_jobs - len(self._ready), 1), wait_ns):
+                self._on_event(event)
+            ctx.flush()
+
+        ready = self._ready[:max_jobs]
+        del self._ready[:max_jobs]
+        return tuple(ready)
+
+    def close(self) -> None:
+        """waits for the thread pool, and for the wake-up poll if it is in flight"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        if self._wake_fd >= 0:
+            self._collect()
+            if self._wake_in_flight and not self._ctx.closed:
+                os.write(self._wake_fd, (1).to_bytes(8, 'little'))
+                while self._wake_in_flight:
+                    for event in self._ctx.get_events(1, self._ctx.max_jobs):
+                        self._on_event(event)
+
+            os.close(self._wake_fd)
+            self._wake_fd = -1
+
+    def __enter__(self) -> NowaitSubmitter:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
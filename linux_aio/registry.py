@@ -0,0 +1,241 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from types import TracebackType
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+_PathType = Union[str, bytes, os.PathLike]
+
+
+class FileHandle:
+    """
+    A file registered in a :class:`FileRegistry`, accepted as `file` by every block.
+
+    The file descriptor is resolved once and cached, so :meth:`fileno` does not call into the file object.
+    A handle of a path is opened by the registry on demand and may be closed again when it is the least recently used;
+    it is reopened transparently by the next :meth:`fileno`.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_registry', '_key', '_file', '_flags', '_fd', '_identity', '_closed')
+
+    _registry: FileRegistry
+    _key: Any
+    _file: Union[_PathType, Any, int]
+    _flags: int
+    _fd: int  # -1 if a path is not open at the moment
+    _identity: Optional[Tuple[int, int]]  # (st_dev, st_ino) when the file is opened or registered
+    _closed: bool
+
+    def __init__(self,
+                 registry: FileRegistry,
+                 key: Any,
+                 file: Union[_PathType, Any, int],
+                 flags: int,
+                 fd: int) -> None:
+        self._registry = registry
+        self._key = key
+        self._file = file
+        self._flags = flags
+        self._fd = fd
+        self._identity = None
+        self._closed = False
+
+        if fd >= 0:
+            self._identity = self._stat(fd)
+
+    @classmethod
+    def _stat(cls, fd: int) -> Tuple[int, int]:
+        st = os.fstat(fd)
+        return st.st_dev, st.st_ino
+
+    @property
+    def file(self) -> Union[_PathType, Any, int]:
+        return self._file
+
+    @property
+    def owned(self) -> bool:
+        """whether the registry opens and closes the file, i.e. it is registered by a path"""
+        return self._flags >= 0
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the handle is unregistered, or the registered file object is closed.
+        Reopening a file object does not revive its handle, register it again instead.
+        """
+        if self._closed:
+            return True
+        if self._flags < 0:
+            closed = getattr(self._file, 'closed', False)
+            if closed:
+                self._closed = True
+            return closed
+        return False
+
+    # noinspection PyProtectedMember
+    def fileno(self) -> int:
+        """
+        :raises ValueError: if the handle is :attr:`closed`.
+        """
+        if self._flags < 0:
+            if self._closed or getattr(self._file, 'closed', False):
+                self._closed = True
+                raise ValueError(f'{self._file} is closed.')
+            return self._fd
+
+        if self._fd < 0:
+            if self._closed:
+                raise ValueError(f'{self} is unregistered.')
+            self._registry._open(self)
+        else:
+            self._registry._touch(self)
+
+        return self._fd
+
+    def verify(self) -> bool:
+        """
+        Whether the file descriptor still refers to the file that was registered (or opened by the registry),
+        which fails if it is closed and reused by another file behind the registry's back. Costs an `fstat`.
+        """
+        if self.closed:
+            return False
+        if self._fd < 0:
+            return True
+
+        try:
+            return self._stat(self._fd) == self._identity
+        except OSError:
+            return False
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self._file!r}, fd={self._fd})'
+
+
+class FileRegistry:
+    """
+    Resolves files to file descriptors once and hands out :class:`FileHandle` s for blocks to reference.
+
+    Paths are opened with `flags` by the registry itself, and at most `max_open` of them are kept open at a time.
+    When the limit is reached, the least recently used one is closed, and it is reopened when it is used again.
+    Closing a file descriptor does not affect requests that are already submitted, since the kernel holds the file
+    until they complete.
+
+    File objects and file descriptors are pinned instead: they are neither opened nor closed by the registry.
+    A closed file object is detected by its `closed` attribute whenever its handle is resolved.
+
+    An :class:`~linux_aio.AIOContext` created with the registry resolves handles of blocks again on every submission,
+    so blocks that are reused across evictions never submit a stale file descriptor.
+    `max_open` must not be smaller than the number of distinct paths in a single submission,
+    or files resolved earlier in the submission could be evicted by later ones.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_max_open', '_handles', '_open_handles', '_reopens')
+
+    _max_open: int
+    _handles: Dict[Any, FileHandle]
+    _open_handles: OrderedDict  # open handles of paths, from the least recently used one
+    _reopens: int
+
+    def __init__(self, max_open: int = 1024) -> None:
+        if max_open <= 0:
+            raise ValueError(f'max_open must be positive. current: {max_open}')
+
+        self._max_open = max_open
+        self._handles = dict()
+        self._open_handles = OrderedDict()
+        self._reopens = 0
+
+    @property
+    def max_open(self) -> int:
+        return self._max_open
+
+    @property
+    def open_count(self) -> int:
+        """the number of file descriptors that the registry opened and keeps open"""
+        return len(self._open_handles)
+
+    @property
+    def reopens(self) -> int:
+        """the number of times that files closed by eviction are opened again"""
+        return self._reopens
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def register(self, file: Union[_PathType, Any, int], flags: int = os.O_RDONLY) -> FileHandle:
+        """
+        Returns the handle of `file`, registering it if needed.
+        A path is registered once for each `flags` and opened lazily, with `O_CLOEXEC` added.
+        """
+        if isinstance(file, (str, bytes, os.PathLike)):
+            key = (os.fspath(file), flags)
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = self._handles[key] = FileHandle(self, key, file, flags | os.O_CLOEXEC, -1)
+            return handle
+
+        key = file if isinstance(file, int) else id(file)
+        handle = self._handles.get(key)
+        if handle is None or handle._file is not file or handle.closed:
+            if isinstance(file, int):
+                fd = file
+            else:
+                try:
+                    fd = file.fileno()
+                except AttributeError:
+                    raise AttributeError(f'`file` must be a path, an int or an object with a fileno() method. '
+                                         f'current: {file}')
+            handle = self._handles[key] = FileHandle(self, key, file, -1, fd)
+
+        return handle
+
+    def unregister(self, handle: FileHandle) -> None:
+        """closes `handle`, and its file descriptor if the registry opened it"""
+        if handle._registry is not self:
+            return
+
+        if self._handles.get(handle._key) is handle:
+            del self._handles[handle._key]
+
+        self._close(handle)
+        handle._closed = True
+
+    def _open(self, handle: FileHandle) -> None:
+        while len(self._open_handles) >= self._max_open:
+            evicted, _ = self._open_handles.popitem(last=False)
+            self._close(evicted)
+
+        fd = os.open(handle._file, handle._flags)
+        identity = FileHandle._stat(fd)
+
+        if handle._identity is not None:
+            self._reopens += 1
+        handle._fd = fd
+        handle._identity = identity
+        self._open_handles[handle] = None
+
+    def _touch(self, handle: FileHandle) -> None:
+        self._open_handles.move_to_end(handle)
+
+    def _close(self, handle: FileHandle) -> None:
+        if handle.owned and handle._fd >= 0:
+            self._open_handles.pop(handle, None)
+            fd, handle._fd = handle._fd, -1
+            os.close(fd)
+
+    def close(self) -> None:
+        """unregisters every handle"""
+        for handle in tuple(self._handles.values()):
+            self.unregister(handle)
+
+    def __enter__(self) -> FileRegistry:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
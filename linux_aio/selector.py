@@ -0,0 +1,162 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import math
+import select
+import selectors
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .aio_context import AIOContext
+from .block import PollBlock
+
+_READ_MASK = select.POLLIN | select.POLLPRI
+_WRITE_MASK = select.POLLOUT
+
+
+# noinspection PyProtectedMember
+class AIOSelector(selectors._BaseSelectorImpl):
+    """
+    A :class:`selectors.BaseSelector` on `IOCB_CMD_POLL`, so it works only on Linux 4.19 or later.
+
+    Each registered file has a one-shot :class:`~linux_aio.PollBlock`.
+    Polls of newly registered files and of the ones that were reported ready are (re-)armed together by
+    a single `io_submit` at the beginning of :meth:`select`, which then reaps readiness from the context.
+    At most `max_jobs` files can be armed at a time; the rest wait for the next :meth:`select`.
+    The context is indexed, so a poll that is canceled by :meth:`unregister` stays alive until it is reaped.
+
+    It can be plugged into :class:`asyncio.SelectorEventLoop` in place of the default epoll selector.
+
+    .. versionadded:: 0.5.0
+    """
+
+    _ctx: AIOContext
+    _polls: Dict[int, PollBlock]  # the current poll of each registered file descriptor
+    _pending: List[PollBlock]  # polls to arm at the next select
+
+    def __init__(self, max_jobs: int = 1024) -> None:
+        super().__init__()
+
+        self._ctx = AIOContext(max_jobs, indexed=True)
+        self._polls = dict()
+        self._pending = list()
+
+    @property
+    def ctx(self) -> AIOContext:
+        return self._ctx
+
+    def register(self, fileobj: Any, events: int, data: Any = None) -> selectors.SelectorKey:
+        key = super().register(fileobj, events, data)
+
+        mask = 0
+        if events & selectors.EVENT_READ:
+            mask |= _READ_MASK
+        if events & selectors.EVENT_WRITE:
+            mask |= _WRITE_MASK
+
+        block = self._polls[key.fd] = PollBlock(key.fd, mask)
+        self._pending.append(block)
+        return key
+
+    def unregister(self, fileobj: Any) -> selectors.SelectorKey:
+        key = super().unregister(fileobj)
+        block = self._polls.pop(key.fd)
+
+        try:
+            self._pending.remove(block)
+        except ValueError:
+            # armed: its completion, if it still comes, is dropped as stale.
+            # the slot table of the context holds the block until then
+            try:
+                self._ctx.cancel(block)
+            except OSError:
+                # the poll is canceled asynchronously (EINPROGRESS), or it has already completed
+                pass
+
+        return key
+
+    def _arm(self) -> List[PollBlock]:
+        """submits the pending polls, and returns the ones that the kernel refused"""
+        pending = self._pending
+        ctx = self._ctx
+        armed = 0
+        refused = list()
+
+        while armed < len(pending):
+            try:
+                armed += ctx.submit(*pending[armed:])
+            except BlockingIOError:
+                # the context is full
+                break
+            except OSError:
+                # e.g. EBADF of a file that is closed without being unregistered
+                refused.append(pending.pop(armed))
+
+        del pending[:armed]
+        return refused
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[selectors.SelectorKey, int]]:
+        if timeout is None:
+            min_jobs, timeout_ns = 1, 0
+        elif timeout <= 0:
+            min_jobs, timeout_ns = 0, 0
+        else:
+            min_jobs, timeout_ns = 1, math.ceil(timeout * 1e9)
+
+        ready = list()
+
+        refused = self._arm()
+        if refused:
+            # reported ready for everything registered so that the error surfaces on the next I/O, like POLLNVAL
+            self._pending.extend(refused)
+            for block in refused:
+                key = self._fd_to_key[block.fileno]
+                ready.append((key, key.events))
+            min_jobs, timeout_ns = 0, 0
+
+        end = time.monotonic_ns() + timeout_ns
+        while True:
+            try:
+                events = self._ctx.get_events(min_jobs, self._ctx.max_jobs, timeout_ns)
+                break
+            except InterruptedError:
+                # retried with the rest of the timeout like the selectors of the standard library (PEP 475)
+                if timeout_ns > 0:
+                    timeout_ns = end - time.monotonic_ns()
+                    if timeout_ns <= 0:
+                        events = ()
+                        break
+
+        polls = self._polls
+        for event in events:
+            block = event.aio_block
+            fd = block.fileno
+            if polls.get(fd) is not block:
+                continue
+
+            key = self._fd_to_key[fd]
+            res = event.response
+            if res < 0:
+                # the poll itself failed: reported ready for everything registered so that the error surfaces
+                ready_events = key.events
+            else:
+                ready_events = 0
+                if res & ~_WRITE_MASK:
+                    ready_events |= selectors.EVENT_READ
+                if res & ~_READ_MASK:
+                    ready_events |= selectors.EVENT_WRITE
+                ready_events &= key.events
+
+            self._pending.append(block)
+            if ready_events:
+                ready.append((key, ready_events))
+
+        return ready
+
+    def close(self) -> None:
+        self._ctx.close()
+        self._polls.clear()
+        self._pending.clear()
+        super().close()
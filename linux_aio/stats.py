@@ -0,0 +1,340 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import math
+import time
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from linux_aio_bind import IOCBCMD
+
+_SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+_DATA_CMDS = frozenset((IOCBCMD.PREAD, IOCBCMD.PWRITE, IOCBCMD.PREADV, IOCBCMD.PWRITEV))
+
+
+class LogHistogram:
+    """
+    Histogram of non-negative integers in logarithmic buckets, like HDR histograms.
+
+    Each power of two is split into 8 linear sub-buckets, so a recorded value is reported
+    within 12.5% of its real value, while values up to 2 :sup:`64` need at most 512 buckets.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_counts', '_count', '_sum', '_min', '_max')
+
+    _counts: List[int]
+    _count: int
+    _sum: int
+    _min: int
+    _max: int
+
+    def __init__(self) -> None:
+        self._counts = [0] * (_SUB_BUCKETS << 1)
+        self._count = 0
+        self._sum = 0
+        self._min = 0
+        self._max = 0
+
+    @classmethod
+    def _index_of(cls, value: int) -> int:
+        shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+        if shift <= 0:
+            return value
+        return (shift << _SUB_BUCKET_BITS) + (value >> shift)
+
+    @classmethod
+    def _bounds_of(cls, index: int) -> Tuple[int, int]:
+        """the smallest and the largest value of the bucket `index`"""
+        if index < _SUB_BUCKETS << 1:
+            return index, index
+
+        shift = (index >> _SUB_BUCKET_BITS) - 1
+        mantissa = index - (shift << _SUB_BUCKET_BITS)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+
+        index = self._index_of(value)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend((0,) * (index + 1 - len(counts)))
+        counts[index] += 1
+
+        if self._count == 0 or value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+        self._count += 1
+        self._sum += value
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> int:
+        return self._sum
+
+    @property
+    def min(self) -> int:
+        return self._min
+
+    @property
+    def max(self) -> int:
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """the upper bound of the bucket that holds `percent` % of recorded values, 0 if nothing is recorded"""
+        if not 0 <= percent <= 100:
+            raise ValueError(f'percent must be between 0 and 100. current: {percent}')
+        if self._count == 0:
+            return 0
+
+        rank = max(1, math.ceil(self._count * percent / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(self._bounds_of(index)[1], self._max)
+
+        return self._max
+
+    def buckets(self) -> Iterator[Tuple[int, int]]:
+        """yields `(upper bound, count)` of each non-empty bucket in ascending order"""
+        for index, bucket_count in enumerate(self._counts):
+            if bucket_count:
+                yield self._bounds_of(index)[1], bucket_count
+
+    def merge(self, other: LogHistogram) -> None:
+        """adds every value recorded in `other`"""
+        if other._count == 0:
+            return
+
+        counts = self._counts
+        if len(other._counts) > len(counts):
+            counts.extend((0,) * (len(other._counts) - len(counts)))
+        for index, bucket_count in enumerate(other._counts):
+            counts[index] += bucket_count
+
+        if self._count == 0 or other._min < self._min:
+            self._min = other._min
+        if other._max > self._max:
+            self._max = other._max
+        self._count += other._count
+        self._sum += other._sum
+
+    def copy(self) -> LogHistogram:
+        other = LogHistogram()
+        other._counts = list(self._counts)
+        other._count = self._count
+        other._sum = self._sum
+        other._min = self._min
+        other._max = self._max
+        return other
+
+
+class AIOStats:
+    """
+    Counters and histograms of an :class:`~linux_aio.AIOContext` created with `stats=True`.
+
+    Latencies are measured in nanoseconds from the `io_submit` that accepted a request to the reap of its completion,
+    so they include the time that completions wait in the ring before they are reaped.
+    Requests of canceled blocks are timed until :meth:`~linux_aio.AIOContext.cancel` returns.
+
+    Like the context, it must not be used from several threads at the same time.
+    Take a :meth:`snapshot` to read a consistent copy.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_started_ns', '_latency', '_submitted_ns', 'submit_calls', 'submitted', 'eagain', 'partial_submits',
+                 'getevents_calls', 'ring_reaps', 'completed', 'errors', 'bytes',
+                 'submit_sizes', 'getevents_sizes', 'queue_depth')
+
+    _started_ns: int
+    _latency: Dict[int, LogHistogram]
+    _submitted_ns: Dict[int, Tuple[int, int]]  # (submit time, opcode) of each in-flight IOCB by its address
+    submit_calls: int
+    submitted: int
+    eagain: int
+    partial_submits: int
+    getevents_calls: int
+    ring_reaps: int
+    completed: int
+    errors: int
+    bytes: int
+    submit_sizes: LogHistogram  # requests accepted by each `io_submit`
+    getevents_sizes: LogHistogram  # completions returned by each `io_getevents`
+    queue_depth: LogHistogram  # in-flight operations after each submission and reap
+
+    def __init__(self) -> None:
+        self._started_ns = time.monotonic_ns()
+        self._latency = dict()
+        self._submitted_ns = dict()
+        self.submit_calls = 0
+        self.submitted = 0
+        self.eagain = 0
+        self.partial_submits = 0
+        self.getevents_calls = 0
+        self.ring_reaps = 0
+        self.completed = 0
+        self.errors = 0
+        self.bytes = 0
+        self.submit_sizes = LogHistogram()
+        self.getevents_sizes = LogHistogram()
+        self.queue_depth = LogHistogram()
+
+    def latency(self, cmd: IOCBCMD) -> LogHistogram:
+        """submit-to-completion latencies of `cmd` in nanoseconds"""
+        histogram = self._latency.get(cmd)
+        if histogram is None:
+            histogram = self._latency[cmd] = LogHistogram()
+        return histogram
+
+    def _on_submit(self, iocbs: Iterable[Tuple[int, int]], requested: int, submitted: int, depth: int) -> None:
+        """records an `io_submit` that accepted `submitted` of `requested` IOCBs, given as (address, opcode)"""
+        now = time.monotonic_ns()
+        submitted_ns = self._submitted_ns
+        for address, cmd in iocbs:
+            submitted_ns[address] = (now, cmd)
+
+        self.submit_calls += 1
+        self.submitted += submitted
+        if submitted < requested:
+            self.partial_submits += 1
+        self.submit_sizes.record(submitted)
+        self.queue_depth.record(depth)
+
+    def _on_complete(self, words: memoryview, results: memoryview, count: int, depth: int) -> None:
+        """records `count` reaped `io_event` s, viewed as unsigned (`words`) and signed (`results`) words"""
+        now = time.monotonic_ns()
+        submitted_ns = self._submitted_ns
+        latency = self._latency
+
+        for offset in range(0, count << 2, 4):
+            res = results[offset + 2]
+            if res < 0:
+                self.errors += 1
+
+            entry = submitted_ns.pop(words[offset + 1], None)
+            if entry is None:
+                continue
+
+            submit_ns, cmd = entry
+            histogram = latency.get(cmd)
+            if histogram is None:
+                histogram = self.latency(IOCBCMD(cmd))
+            histogram.record(now - submit_ns)
+
+            if res > 0 and cmd in _DATA_CMDS:
+                self.bytes += res
+
+        self.completed += count
+        self.queue_depth.record(depth)
+
+    def snapshot(self) -> StatsSnapshot:
+        return StatsSnapshot(self)
+
+
+class StatsSnapshot:
+    """
+    A copy of :class:`AIOStats` at a point in time.
+
+    Rates are computed against an earlier snapshot by :meth:`ops_per_sec` and :meth:`bytes_per_sec`,
+    or against the creation of the stats if no snapshot is given.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('taken_ns', 'elapsed_ns', 'counters', 'latency', 'submit_sizes', 'getevents_sizes', 'queue_depth')
+
+    taken_ns: int
+    elapsed_ns: int
+    counters: Mapping[str, int]
+    latency: Mapping[IOCBCMD, LogHistogram]
+    submit_sizes: LogHistogram
+    getevents_sizes: LogHistogram
+    queue_depth: LogHistogram
+
+    _COUNTERS = ('submit_calls', 'submitted', 'eagain', 'partial_submits',
+                 'getevents_calls', 'ring_reaps', 'completed', 'errors', 'bytes')
+
+    # noinspection PyProtectedMember
+    def __init__(self, stats: AIOStats) -> None:
+        self.taken_ns = time.monotonic_ns()
+        self.elapsed_ns = self.taken_ns - stats._started_ns
+        self.counters = {name: getattr(stats, name) for name in self._COUNTERS}
+        self.latency = {IOCBCMD(cmd): histogram.copy() for cmd, histogram in sorted(stats._latency.items())}
+        self.submit_sizes = stats.submit_sizes.copy()
+        self.getevents_sizes = stats.getevents_sizes.copy()
+        self.queue_depth = stats.queue_depth.copy()
+
+    def _rate(self, name: str, since: Optional[StatsSnapshot]) -> float:
+        if since is None:
+            elapsed_ns, delta = self.elapsed_ns, self.counters[name]
+        else:
+            elapsed_ns, delta = self.taken_ns - since.taken_ns, self.counters[name] - since.counters[name]
+        return delta * 1e9 / elapsed_ns if elapsed_ns > 0 else 0.0
+
+    def ops_per_sec(self, since: StatsSnapshot = None) -> float:
+        return self._rate('completed', since)
+
+    def bytes_per_sec(self, since: StatsSnapshot = None) -> float:
+        return self._rate('bytes', since)
+
+    def to_prometheus(self, prefix: str = 'linux_aio', labels: Mapping[str, str] = None) -> str:
+        """
+        Renders the snapshot in the Prometheus text exposition format.
+        Counters end with `_total`, and latencies are histograms in seconds labeled by `op`.
+        """
+        base_labels = dict(labels or {})
+        lines = list()
+
+        for name in self._COUNTERS:
+            metric = f'{prefix}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{_format_labels(base_labels)} {self.counters[name]}')
+
+        metric = f'{prefix}_latency_seconds'
+        lines.append(f'# TYPE {metric} histogram')
+        for cmd, histogram in self.latency.items():
+            op_labels = dict(base_labels, op=cmd.name.lower())
+            lines.extend(_histogram_lines(metric, histogram, op_labels, 1e-9))
+
+        for name in ('submit_sizes', 'getevents_sizes', 'queue_depth'):
+            metric = f'{prefix}_{name}'
+            lines.append(f'# TYPE {metric} histogram')
+            lines.extend(_histogram_lines(metric, getattr(self, name), base_labels, 1))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ''
+
+    def escape(value: str) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _histogram_lines(metric: str, histogram: LogHistogram, labels: Mapping[str, str], scale: float) -> List[str]:
+    lines = list()
+    cumulative = 0
+
+    for upper, bucket_count in histogram.buckets():
+        cumulative += bucket_count
+        lines.append(f'{metric}_bucket{_format_labels(dict(labels, le=repr(upper * scale)))} {cumulative}')
+
+    lines.append(f'{metric}_bucket{_format_labels(dict(labels, le="+Inf"))} {histogram.count}')
+    lines.append(f'{metric}_sum{_format_labels(labels)} {histogram.sum * scale!r}')
+    lines.append(f'{metric}_count{_format_labels(labels)} {histogram.count}')
+    return lines
@@ -0,0 +1,173 @@
+# coding: UTF-8
+
+from __future__ import annotations
+
+import os
+from collections import deque
+from types import TracebackType
+from typing import Any, Deque, Dict, Iterator, List, Optional, Type, Union
+
+from linux_aio_bind import IOCBRWFlag
+
+from .aio_context import AIOContext
+from .arena import BufferArena
+from .block import ReadBlock
+
+
+class StreamReader:
+    """
+    Reads a file sequentially in chunks, keeping `depth` chunk reads in flight ahead of the consumer.
+
+    Iterating the reader yields :class:`memoryview` s of the chunks in file order.
+    Chunk buffers are recycled, so a yielded chunk is valid only until the next one is requested.
+    Copy it (e.g. `bytes(chunk)`) to keep it longer.
+
+    `file` is a path, a file object or a file descriptor.
+    If `direct` is set, a path is opened with `O_DIRECT` and chunks are read into page-aligned buffers.
+    Unless `ctx` is given, the reader owns an :class:`AIOContext` of `depth` jobs.
+    A given `ctx` must not be used by anyone else while the reader is iterated.
+
+    .. versionadded:: 0.5.0
+    """
+    __slots__ = ('_file', '_fd', '_own_fd', '_ctx', '_own_ctx', '_arena', '_blocks',
+                 '_chunk_size', '_offset', '_end', '_rw_flags')
+
+    _file: Union[str, Any, int]
+    _fd: int
+    _own_fd: bool
+    _ctx: AIOContext
+    _own_ctx: bool
+    _arena: Optional[BufferArena]
+    _blocks: List[ReadBlock]
+    _chunk_size: int
+    _offset: int
+    _end: Optional[int]
+    _rw_flags: IOCBRWFlag
+
+    def __init__(self,
+                 file: Union[str, Any, int],
+                 chunk_size: int = 1 << 20,
+                 depth: int = 8,
+                 offset: int = 0,
+                 length: int = None,
+                 direct: bool = False,
+                 rw_flags: IOCBRWFlag = 0,
+                 ctx: AIOContext = None) -> None:
+        if chunk_size <= 0 or depth <= 0:
+            raise ValueError(f'Both chunk_size and depth must be positive. current: {chunk_size, depth}')
+
+        self._file = file
+        self._own_fd = isinstance(file, (str, bytes, os.PathLike))
+        self._ctx = ctx
+        self._own_ctx = ctx is None
+        self._arena = None
+        self._chunk_size = chunk_size
+        self._offset = offset
+        self._end = None if length is None else offset + length
+        self._rw_flags = rw_flags
+
+        if self._own_fd:
+            self._fd = os.open(file, os.O_RDONLY | os.O_CLOEXEC | (os.O_DIRECT if direct else 0))
+        else:
+            self._fd = ReadBlock._get_fd(file)
+
+        try:
+            if self._own_ctx:
+                self._ctx = AIOContext(depth)
+
+            if direct:
+                self._arena = BufferArena({chunk_size: depth})
+                buffers = tuple(self._arena.acquire(chunk_size) for _ in range(depth))
+            else:
+                buffers = tuple(bytearray(chunk_size) for _ in range(depth))
+
+            self._blocks = [ReadBlock(self._fd, buffer, rw_flags=rw_flags) for buffer in buffers]
+
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size
+
+    @property
+    def depth(self) -> int:
+        return len(self._blocks)
+
+    def _issue(self, block: ReadBlock, offset: int, in_flight: Deque[ReadBlock]) -> int:
+        """submits a read of `block` at `offset` and returns the offset of the next chunk"""
+        length = self._chunk_size
+
+        if self._end is not None:
+            if offset >= self._end:
+                return offset
+            length = min(length, self._end - offset)
+
+        block.offset = offset
+        block.length = length
+
+        if self._ctx.submit(block) != 1:
+            raise BlockingIOError(f'{block} is not accepted by the kernel.')
+
+        in_flight.append(block)
+        return offset + length
+
+    def __iter__(self) -> Iterator[memoryview]:
+        ctx = self._ctx
+        in_flight: Deque[ReadBlock] = deque()
+        responses: Dict[ReadBlock, int] = dict()
+        offset = self._offset
+        eof = False
+
+        try:
+            for block in self._blocks:
+                offset = self._issue(block, offset, in_flight)
+
+            while in_flight:
+                head = in_flight[0]
+
+                while head not in responses:
+                    for event in ctx.get_events(1, len(self._blocks)):
+                        responses[event.aio_block] = event.response
+
+                in_flight.popleft()
+                res = responses.pop(head)
+
+                if res < 0:
+                    raise OSError(-res, os.strerror(-res))
+                elif res == 0:
+                    eof = True
+                    continue
+
+                yield memoryview(head.buffer)[:res]
+
+                if res < head.length:
+                    # a short read means the end of the file
+                    eof = True
+                elif not eof:
+                    offset = self._issue(head, offset, in_flight)
+
+        finally:
+            # buffers can not be reused or released while the kernel still writes to them
+            while len(in_flight) > len(responses):
+                for event in ctx.get_events(1, len(self._blocks)):
+                    responses[event.aio_block] = event.response
+
+    def close(self) -> None:
+        if self._own_ctx and self._ctx is not None:
+            self._ctx.close()
+        if self._arena is not None:
+            self._blocks = list()
+            self._arena.close()
+            self._arena = None
+        if self._own_fd and self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> StreamReader:
+        return self
+
+    def __exit__(self, t: Optional[Type[BaseException]], value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
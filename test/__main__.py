@@ -2,17 +2,51 @@
 
 import unittest
 
+# noinspection PyUnresolvedReferences
+from .test_arena import TestBufferArena
+# noinspection PyUnresolvedReferences
+from .test_async_context import TestAsyncContext
+# noinspection PyUnresolvedReferences
+from .test_batch import TestBlockBatch
+# noinspection PyUnresolvedReferences
+from .test_bench import TestBench
 # noinspection PyUnresolvedReferences
 from .test_block import TestAIOBlock
 # noinspection PyUnresolvedReferences
 from .test_block_conversion import TestBlockConversion
 # noinspection PyUnresolvedReferences
+from .test_buffer_protocol import TestBufferProtocol
+# noinspection PyUnresolvedReferences
+from .test_cache import TestBlockCache
+# noinspection PyUnresolvedReferences
+from .test_coalesce import TestCoalescer
+# noinspection PyUnresolvedReferences
 from .test_context import TestContext
 # noinspection PyUnresolvedReferences
+from .test_copy import TestCopy
+# noinspection PyUnresolvedReferences
+from .test_engine import TestShardedEngine
+# noinspection PyUnresolvedReferences
+from .test_future_context import TestFutureAIOContext
+# noinspection PyUnresolvedReferences
+from .test_hooks import TestTraceHook
+# noinspection PyUnresolvedReferences
 from .test_non_rw import TestNonRW
 # noinspection PyUnresolvedReferences
 from .test_non_vector_rw import TestRW
 # noinspection PyUnresolvedReferences
+from .test_nowait import TestNowaitSubmitter
+# noinspection PyUnresolvedReferences
+from .test_pool import TestBlockPool
+# noinspection PyUnresolvedReferences
+from .test_registry import TestFileRegistry
+# noinspection PyUnresolvedReferences
+from .test_selector import TestAIOSelector
+# noinspection PyUnresolvedReferences
+from .test_stats import TestStats
+# noinspection PyUnresolvedReferences
+from .test_stream import TestStreamReader
+# noinspection PyUnresolvedReferences
 from .test_vector_rw import TestVectorRW
 
 if __name__ == '__main__':
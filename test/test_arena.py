@@ -0,0 +1,94 @@
+# coding: UTF-8
+
+import unittest
+
+import mmap
+import os
+from ctypes import addressof, c_char
+
+from linux_aio import AIOContext, BufferArena, ReadBlock, ReadVBlock, WriteBlock
+
+
+class TestBufferArena(unittest.TestCase):
+    _TEST_FILE_NAME = 'test_arena.txt'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        os.remove(cls._TEST_FILE_NAME)
+
+    def test_alignment(self):
+        with BufferArena({512: 4, 4096: 2}, alignment=512) as arena:
+            self.assertTupleEqual((512, 4096), arena.slot_sizes)
+
+            buffers = tuple(arena.acquire(100) for _ in range(4))
+            for buffer in buffers:
+                self.assertEqual(100, len(buffer))
+                self.assertEqual(0, addressof(c_char.from_buffer(buffer)) % 512)
+            self.assertDictEqual({512: 0, 4096: 2}, arena.available)
+
+            # falls back to a larger class
+            self.assertEqual(4096, len(arena.acquire(4096)))
+            self.assertEqual(10, len(arena.acquire(10)))
+            with self.assertRaises(MemoryError):
+                arena.acquire(1)
+
+            self.assertEqual(6, len(arena))
+            arena.release(*buffers)
+            self.assertEqual(2, len(arena))
+            self.assertDictEqual({512: 4, 4096: 0}, arena.available)
+
+            with self.assertRaises(ValueError):
+                arena.release(buffers[0])
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            BufferArena({4096: 1}, alignment=3000)
+        with self.assertRaises(ValueError):
+            BufferArena({4096: 0})
+
+    def test_huge_pages_n_lock(self):
+        try:
+            arena = BufferArena({mmap.PAGESIZE: 1}, huge_pages=True, lock=True)
+        except OSError:
+            self.skipTest('mlock is not permitted')
+
+        with arena:
+            self.assertEqual(mmap.PAGESIZE, len(arena.acquire(mmap.PAGESIZE)))
+
+    def test_direct_io(self):
+        try:
+            fd = os.open(self._TEST_FILE_NAME, os.O_RDWR | os.O_CREAT | os.O_TRUNC | os.O_DIRECT)
+        except OSError:
+            self.skipTest('O_DIRECT is not supported')
+
+        with BufferArena({4096: 4}) as arena, AIOContext(4) as ctx:
+            content = arena.acquire(4096)
+            content[:] = b'a' * 2048 + b'b' * 2048
+
+            # blocks are kept alive until they are reaped
+            block = WriteBlock(fd, content)
+            self.assertEqual(1, ctx.submit(block))
+            event = ctx.get_events(1, 1)[0]
+            self.assertEqual(4096, event.response)
+            arena.reclaim((event,))
+
+            buffer = arena.acquire(4096)
+            block = ReadBlock(fd, buffer)
+            self.assertEqual(1, ctx.submit(block))
+            event = ctx.get_events(1, 1)[0]
+            self.assertEqual(4096, event.response)
+            self.assertEqual(b'a' * 2048 + b'b' * 2048, event.buffer.tobytes())
+
+            vectors = (arena.acquire(2048), arena.acquire(2048))
+            block = ReadVBlock(fd, vectors)
+            self.assertEqual(1, ctx.submit(block))
+            event = ctx.get_events(1, 1)[0]
+            self.assertEqual(4096, event.response)
+            self.assertEqual(b'a' * 2048, vectors[0].tobytes())
+            self.assertEqual(b'b' * 2048, vectors[1].tobytes())
+
+            arena.reclaim((event,))
+            self.assertEqual(1, len(arena))
+
+        os.close(fd)
@@ -0,0 +1,104 @@
+# coding: UTF-8
+
+import asyncio
+import unittest
+
+import os
+
+from linux_aio import AsyncAIOContext, ReadBlock, WriteBlock
+
+
+class TestAsyncContext(unittest.TestCase):
+    _CONTENTS = 'contents\n'
+    _TEST_FILE_NAME = 'test_async.txt'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        os.remove(cls._TEST_FILE_NAME)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'w') as fp:
+            fp.write(self._CONTENTS)
+
+    def test_read(self):
+        async def run():
+            async with AsyncAIOContext(2) as ctx:
+                with open(self._TEST_FILE_NAME) as fp:
+                    event = await ctx.read(fp, bytearray(64))
+
+            self.assertTrue(ctx.closed)
+            return event
+
+        event = asyncio.run(run())
+        self.assertEqual(len(self._CONTENTS), event.response)
+        self.assertEqual(self._CONTENTS.encode(), event.stripped_buffer())
+
+    def test_write(self):
+        async def run():
+            async with AsyncAIOContext(2) as ctx:
+                with open(self._TEST_FILE_NAME, 'w') as fp:
+                    return await ctx.write(fp, 'new contents\n')
+
+        event = asyncio.run(run())
+        self.assertEqual(len('new contents\n'), event.response)
+
+        with open(self._TEST_FILE_NAME) as fp:
+            self.assertEqual('new contents\n', fp.read())
+
+    def test_submit_many(self):
+        async def run():
+            async with AsyncAIOContext(4) as ctx:
+                with open(self._TEST_FILE_NAME) as fp:
+                    blocks = tuple(ReadBlock(fp, bytearray(4), offset=i) for i in range(16))
+                    events = await asyncio.gather(*(ctx.submit_async(block) for block in blocks))
+
+            return blocks, events
+
+        blocks, events = asyncio.run(run())
+        self.assertEqual(16, len(events))
+        for i, (block, event) in enumerate(zip(blocks, events)):
+            self.assertIs(block, event.aio_block)
+            self.assertEqual(self._CONTENTS.encode()[i:i + 4], event.stripped_buffer())
+
+    def test_error_response(self):
+        async def run():
+            async with AsyncAIOContext(2) as ctx:
+                with open(self._TEST_FILE_NAME) as fp:
+                    await ctx.write(fp, 'contents')
+
+        with self.assertRaises(OSError):
+            asyncio.run(run())
+
+    def test_double_submit(self):
+        async def run():
+            async with AsyncAIOContext(2) as ctx:
+                with open(self._TEST_FILE_NAME, 'a') as fp:
+                    block = WriteBlock(fp, 'contents')
+                    future = ctx.submit_async(block)
+                    with self.assertRaises(ValueError):
+                        ctx.submit_async(block)
+                    await future
+
+        asyncio.run(run())
+
+    def test_wait_for_capacity(self):
+        async def run():
+            async with AsyncAIOContext(2) as ctx:
+                with open(self._TEST_FILE_NAME) as fp:
+                    max_depth = 0
+                    futures = list()
+
+                    for i in range(8):
+                        await ctx.wait_for_capacity_async()
+                        futures.append(ctx.submit_async(ReadBlock(fp, bytearray(4), offset=i)))
+                        max_depth = max(max_depth, ctx.in_flight_ops + len(ctx._pending))
+
+                    await asyncio.gather(*futures)
+                    return max_depth, ctx.in_flight_ops
+
+        max_depth, in_flight_ops = asyncio.run(run())
+        self.assertLessEqual(max_depth, 2)
+        self.assertEqual(0, in_flight_ops)
@@ -0,0 +1,149 @@
+# coding: UTF-8
+
+import array
+import unittest
+
+import os
+from linux_aio_bind import IOCBCMD
+
+from linux_aio import AIOContext, AIOEventBuffer, BlockBatch, ReadBlock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestBlockBatch(unittest.TestCase):
+    _CONTENTS = bytes(range(256)) * 4
+    _TEST_FILE_NAME = 'test_batch.txt'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        os.remove(cls._TEST_FILE_NAME)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def _reap_all(self, ctx, batch):
+        event_buffer = AIOEventBuffer(len(batch))
+        indices = list()
+        while len(indices) < len(batch):
+            ctx.reap(event_buffer, 1)
+            indices.extend(batch.completions(event_buffer))
+        return indices
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            BlockBatch(0)
+        with self.assertRaises(ValueError):
+            BlockBatch(4, IOCBCMD.FSYNC)
+
+        batch = BlockBatch(4)
+        with self.assertRaises(ValueError):
+            batch.set_offsets((1, 2, 3))
+        with self.assertRaises(ValueError):
+            batch.set_buffer_slices(bytearray(15), 4)
+
+    def test_read_slices(self):
+        batch = BlockBatch(64, IOCBCMD.PREAD)
+        self.assertEqual(64, len(batch))
+        self.assertIs(IOCBCMD.PREAD, batch.cmd)
+
+        buffer = bytearray(64 * 8)
+
+        with AIOContext(64) as ctx, open(self._TEST_FILE_NAME) as fp:
+            batch.set_files(fp)
+            batch.set_offsets(range(1016, -1, -16)[:64])
+            batch.set_buffer_slices(buffer, 8)
+
+            self.assertEqual(64, ctx.submit_batch(batch))
+            self.assertListEqual(list(range(64)), sorted(self._reap_all(ctx, batch)))
+
+        self.assertListEqual([8] * 64, batch.results.tolist())
+        for i in range(64):
+            offset = 1016 - i * 16
+            self.assertEqual(self._CONTENTS[offset:offset + 8], buffer[i * 8:(i + 1) * 8])
+
+    def test_write_separate_buffers(self):
+        batch = BlockBatch(4, IOCBCMD.PWRITE)
+        contents = tuple(bytes([i]) * (i + 1) for i in range(4))
+
+        with AIOContext(4) as ctx, open(self._TEST_FILE_NAME, 'r+') as fp:
+            batch.set_files(array.array('I', (fp.fileno(),) * 4))
+            batch.set_offsets(array.array('q', (0, 1, 3, 6)))
+            batch.set_buffers(contents)
+
+            self.assertEqual(2, ctx.submit_batch(batch, 0, 2))
+            self.assertEqual(2, ctx.submit_batch(batch, 2))
+            events = ctx.get_events(4, 4)
+
+            self.assertTrue(all(event.aio_block is batch for event in events))
+            self.assertListEqual([0, 1, 2, 3], sorted(batch.index_of(event) for event in events))
+            self.assertListEqual([1, 2, 3, 4], batch.results.tolist())
+
+            with self.assertRaises(IndexError):
+                ctx.submit_batch(batch, 3, 5)
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(b''.join(contents), fp.read(10))
+
+    def test_lengths(self):
+        batch = BlockBatch(2)
+
+        with AIOContext(2) as ctx, open(self._TEST_FILE_NAME) as fp:
+            batch.set_files((fp, fp.fileno()))
+            batch.set_buffers((bytearray(8), bytearray(8)))
+            batch.set_lengths([2, 5])
+
+            self.assertEqual(2, ctx.submit_batch(batch))
+            self._reap_all(ctx, batch)
+
+        self.assertListEqual([2, 5], batch.results.tolist())
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        batch = BlockBatch(256)
+        buffer = numpy.zeros((256, 4), dtype=numpy.uint8)
+
+        with AIOContext(256) as ctx, open(self._TEST_FILE_NAME) as fp:
+            batch.set_files(fp)
+            batch.set_offsets(numpy.arange(256, dtype=numpy.int64) * 4)
+            batch.set_lengths(numpy.full(256, 4, dtype=numpy.uint64))
+            batch.set_buffer_slices(buffer, 4)
+
+            self.assertEqual(256, ctx.submit_batch(batch))
+            self._reap_all(ctx, batch)
+
+        self.assertEqual(self._CONTENTS, buffer.tobytes())
+
+    def test_indexed_context(self):
+        batch = BlockBatch(4, IOCBCMD.PREAD)
+        buffer = bytearray(4 * 8)
+
+        with AIOContext(8, indexed=True) as ctx, open(self._TEST_FILE_NAME) as fp:
+            batch.set_files(fp)
+            batch.set_offsets(range(0, 32, 8))
+            batch.set_buffer_slices(buffer, 8)
+
+            block = ReadBlock(fp, bytearray(8))
+            self.assertEqual(1, ctx.submit(block))
+            self.assertEqual(4, ctx.submit_batch(batch))
+
+            event_buffer = AIOEventBuffer(8)
+            indices = list()
+            blocks = list()
+            while len(indices) + len(blocks) < 5:
+                ctx.reap(event_buffer, 1)
+                indices.extend(batch.completions(event_buffer))
+                blocks.extend(event.aio_block for event in event_buffer if event.aio_block is not batch)
+
+            self.assertListEqual(list(range(4)), sorted(indices))
+            self.assertListEqual([block], blocks)
+            self.assertEqual((), ctx.in_flight)
+
+        self.assertEqual(self._CONTENTS[:32], buffer)
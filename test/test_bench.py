@@ -0,0 +1,78 @@
+# coding: UTF-8
+
+import errno
+import json
+import unittest
+
+import os
+
+# noinspection PyProtectedMember
+from linux_aio.bench import ENGINES, Job, _run_posix, main, prepare, run_job
+
+
+class TestBench(unittest.TestCase):
+    _TEST_FILE_NAME = 'test_bench.dat'
+    _REPORT_FILE_NAME = 'test_bench.json'
+    _SIZE = 1 << 20
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        for path in (self._TEST_FILE_NAME, self._REPORT_FILE_NAME):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_prepare(self):
+        self.assertEqual(self._SIZE, prepare(self._TEST_FILE_NAME, self._SIZE))
+        self.assertEqual(self._SIZE, os.path.getsize(self._TEST_FILE_NAME))
+
+    def test_engines(self):
+        prepare(self._TEST_FILE_NAME, self._SIZE)
+
+        for engine in ENGINES:
+            for pattern in ('randread', 'write', 'randrw'):
+                with self.subTest(engine=engine, pattern=pattern):
+                    report = run_job(self._TEST_FILE_NAME, engine, Job(pattern, 4096, 4), self._SIZE, 0.05)
+
+                    if engine == 'posix' and 'error' in report:
+                        # POSIX AIO of glibc is not available
+                        continue
+
+                    self.assertNotIn('error', report)
+                    self.assertGreater(report['ios'], 0)
+                    self.assertEqual(report['ios'] * 4096, report['bytes'])
+                    self.assertGreater(report['iops'], 0)
+                    self.assertLessEqual(report['lat_ns']['p50'], report['lat_ns']['p999'])
+                    self.assertEqual(1 if engine == 'sync' else 4, report['iodepth'])
+
+    def test_posix_error(self):
+        prepare(self._TEST_FILE_NAME, self._SIZE)
+        fd = os.open(self._TEST_FILE_NAME, os.O_RDONLY)
+
+        try:
+            buffers = [memoryview(bytearray(4096)) for _ in range(2)]
+            # failed requests are reported by aio_error, so they must not be counted as empty writes
+            with self.assertRaises(OSError) as cm:
+                _run_posix(fd, Job('write', 4096, 2), self._SIZE, 10_000_000, buffers, 0)
+            self.assertEqual(errno.EBADF, cm.exception.errno)
+        except NotImplementedError:
+            self.skipTest('POSIX AIO of glibc is not available')
+        finally:
+            os.close(fd)
+
+    def test_main(self):
+        self.assertEqual(0, main((self._TEST_FILE_NAME, '--size', '1M', '--runtime', '0.02', '--bs', '4k,8k',
+                                  '--iodepth', '1,2', '--engines', 'aio,sync', '--rw-flags', 'none,dsync',
+                                  '--output', self._REPORT_FILE_NAME)))
+
+        with open(self._REPORT_FILE_NAME) as fp:
+            report = json.load(fp)
+
+        # sync runs are not repeated for each depth
+        self.assertEqual(2 * 2 * 2 + 2 * 2, len(report['results']))
+        self.assertEqual({'none', 'dsync'}, {result['rw_flags'] for result in report['results']})
+
+    def test_invalid_job(self):
+        with self.assertRaises(ValueError):
+            Job('randtrim', 4096, 1)
+        with self.assertRaises(ValueError):
+            Job('read', 0, 1)
@@ -0,0 +1,135 @@
+# coding: UTF-8
+
+import array
+import gc
+import mmap
+import unittest
+
+import os
+from linux_aio_bind import IOCBCMD
+
+from linux_aio import AIOContext, ReadBlock, ReadVBlock, WriteBlock, WriteVBlock
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestBufferProtocol(unittest.TestCase):
+    _CONTENTS = b'0123456789abcdef'
+    _TEST_FILE_NAME = 'test_buffer.txt'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        os.remove(cls._TEST_FILE_NAME)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def _run(self, ctx, block):
+        self.assertEqual(1, ctx.submit(block))
+        events = ctx.get_events(1, 1)
+        self.assertEqual(1, len(events))
+        return events[0]
+
+    def test_read_into_memoryview_slice(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME) as fp:
+            destination = bytearray(b'-' * 12)
+            block = ReadBlock(fp, memoryview(destination)[4:8], offset=2)
+            self.assertEqual(4, block.length)
+
+            event = self._run(ctx, block)
+            self.assertEqual(4, event.response)
+            self.assertEqual(b'----2345----', destination)
+            self.assertEqual(b'2345', event.stripped_buffer())
+
+    def test_pinned_while_in_use(self):
+        buffer = bytearray(4)
+        block = ReadBlock(0, buffer)
+
+        with self.assertRaises(BufferError):
+            buffer.extend(b'1234')
+
+        block.buffer = bytearray(8)
+        self.assertEqual(8, block.length)
+        buffer.extend(b'1234')
+
+    def test_mmap(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME) as fp, mmap.mmap(-1, 16) as region:
+            event = self._run(ctx, ReadBlock(fp, region))
+            self.assertEqual(16, event.response)
+            self.assertEqual(self._CONTENTS, region[:])
+
+            # the block pins the mapping
+            with self.assertRaises(BufferError):
+                region.close()
+            del event
+            gc.collect()
+
+    def test_array(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME, 'r+') as fp:
+            ints = array.array('i', range(4))
+            block = WriteBlock(fp, ints)
+            self.assertEqual(ints.itemsize * 4, block.length)
+
+            event = self._run(ctx, block)
+            self.assertEqual(ints.itemsize * 4, event.response)
+
+            read_ints = array.array('i', (0,) * 4)
+            event = self._run(ctx, ReadBlock(fp, read_ints))
+            self.assertEqual(ints.itemsize * 4, event.response)
+            self.assertEqual(ints, read_ints)
+
+    def test_read_only_buffer(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME, 'r+') as fp:
+            content = b'__ABCD__'
+            event = self._run(ctx, WriteBlock(fp, memoryview(content)[2:6], offset=4))
+            self.assertEqual(4, event.response)
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(b'0123ABCD89abcdef', fp.read())
+
+    def test_vector_of_buffers(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME, 'r+') as fp:
+            first, second = bytearray(4), array.array('b', (0,) * 4)
+            event = self._run(ctx, ReadVBlock(fp, (memoryview(first), second)))
+            self.assertEqual(8, event.response)
+            self.assertEqual(b'0123', first)
+            self.assertEqual(b'4567', second.tobytes())
+
+            event = self._run(ctx, WriteVBlock(fp, (memoryview(b'xy'), bytearray(b'z')), offset=16))
+            self.assertEqual(3, event.response)
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(self._CONTENTS + b'xyz', fp.read())
+
+    def test_non_contiguous(self):
+        with self.assertRaises(ValueError):
+            ReadBlock(0, memoryview(bytearray(8))[::2])
+
+    def test_unknown_type(self):
+        with self.assertRaises(NotImplementedError):
+            ReadBlock(0, 1234)
+
+    def test_keep_buffer_on_conversion(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME, 'r+') as fp:
+            buffer = bytearray(4)
+            block = ReadBlock(fp, buffer).change_cmd(IOCBCMD.PWRITE)
+            self.assertIs(buffer, block.buffer)
+
+            event = self._run(ctx, block)
+            self.assertEqual(4, event.response)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        with AIOContext(1) as ctx, open(self._TEST_FILE_NAME) as fp:
+            matrix = numpy.zeros((2, 8), dtype=numpy.uint8)
+            event = self._run(ctx, ReadBlock(fp, matrix[1]))
+            self.assertEqual(8, event.response)
+            self.assertEqual(self._CONTENTS[:8], matrix[1].tobytes())
+            self.assertEqual(bytes(8), matrix[0].tobytes())
@@ -0,0 +1,108 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+
+from linux_aio import AIOContext, BlockCache, FileRegistry, ReadBlock, WriteBlock
+
+
+class TestBlockCache(unittest.TestCase):
+    _CONTENTS = os.urandom(4096 * 16 + 100)
+    _TEST_FILE_NAME = 'test_cache.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.remove(self._TEST_FILE_NAME)
+
+    def _read(self, cache: BlockCache, fp, offset: int, length: int) -> bytes:
+        block = ReadBlock(fp, bytearray(length), offset=offset)
+        self.assertEqual(1, cache.submit(block))
+        event = cache.get_events(1, 1)[0]
+        self.assertIs(block, event.aio_block)
+        return bytes(block.buffer[:event.response])
+
+    def test_hit(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx, BlockCache(ctx, 1 << 20) as cache:
+            self.assertEqual(self._CONTENTS[:8192], self._read(cache, fp, 0, 8192))
+            self.assertEqual((0, 1), (cache.hits, cache.misses))
+            self.assertEqual(8192, cache.cached_bytes)
+
+            # completes without the context
+            self.assertEqual(self._CONTENTS[100:8000], self._read(cache, fp, 100, 7900))
+            self.assertEqual(0, ctx.in_flight_ops)
+            self.assertEqual((1, 1), (cache.hits, cache.misses))
+            self.assertEqual(0.5, cache.hit_ratio)
+
+            # a partially cached range misses
+            self.assertEqual(self._CONTENTS[4096:12288], self._read(cache, fp, 4096, 8192))
+            self.assertEqual(2, cache.misses)
+
+            # the end of the file is not cached
+            tail = self._read(cache, fp, 4096 * 16, 4096)
+            self.assertEqual(self._CONTENTS[4096 * 16:], tail)
+            self.assertEqual(tail, self._read(cache, fp, 4096 * 16, 4096))
+            self.assertEqual(4, cache.misses)
+
+    def test_write_invalidation(self):
+        with open(self._TEST_FILE_NAME, 'rb+') as fp, AIOContext(4) as ctx, BlockCache(ctx, 1 << 20) as cache:
+            self._read(cache, fp, 0, 8192)
+
+            self.assertEqual(1, cache.submit(WriteBlock(fp, b'x' * 10, offset=5000)))
+            self.assertEqual(1, cache.invalidations)
+            self.assertEqual(4096, cache.cached_bytes)
+            cache.get_events(1, 1)
+
+            expected = bytearray(self._CONTENTS[:8192])
+            expected[5000:5010] = b'x' * 10
+            self.assertEqual(bytes(expected), self._read(cache, fp, 0, 8192))
+            self.assertEqual(bytes(expected), self._read(cache, fp, 0, 8192))
+            self.assertEqual(1, cache.hits)
+
+    def test_scan_resistance(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx, \
+                BlockCache(ctx, 4096 * 8, out_ratio=1) as cache:
+            # blocks 0 and 1 become hot: evicted from the FIFO and read again
+            for offset in range(0, 4096 * 10, 4096):
+                self._read(cache, fp, offset, 4096)
+            self._read(cache, fp, 0, 8192)
+            self.assertGreater(cache.evictions, 0)
+
+            # a scan over the rest of the file does not evict them
+            for offset in range(4096 * 10, 4096 * 16, 4096):
+                self._read(cache, fp, offset, 4096)
+
+            hits = cache.hits
+            self.assertEqual(self._CONTENTS[:8192], self._read(cache, fp, 0, 8192))
+            self.assertEqual(hits + 1, cache.hits)
+            self.assertLessEqual(cache.cached_bytes, 4096 * 8)
+
+    def test_registry(self):
+        with FileRegistry() as registry, AIOContext(4, registry=registry) as ctx, \
+                BlockCache(ctx, 1 << 20) as cache:
+            handle = registry.register(self._TEST_FILE_NAME)
+            self.assertEqual(self._CONTENTS[:4096], self._read(cache, handle, 0, 4096))
+            self.assertEqual(self._CONTENTS[:4096], self._read(cache, handle, 0, 4096))
+            self.assertEqual(1, cache.hits)
+
+    def test_ordering(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx, BlockCache(ctx, 1 << 20) as cache:
+            self._read(cache, fp, 0, 4096)
+
+            blocks = (ReadBlock(fp, bytearray(4096), offset=4096), ReadBlock(fp, bytearray(4096)),
+                      ReadBlock(fp, bytearray(4096), offset=8192))
+            self.assertEqual(3, cache.submit(*blocks))
+
+            events = list()
+            while len(events) < 3:
+                events.extend(cache.get_events(1, 3))
+
+            self.assertEqual(set(blocks), {event.aio_block for event in events})
+            for block in blocks:
+                self.assertEqual(self._CONTENTS[block.offset:block.offset + 4096], bytes(block.buffer))
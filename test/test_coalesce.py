@@ -0,0 +1,131 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+
+from linux_aio import AIOContext, Coalescer, FsyncBlock, ReadBlock, ReadVBlock, WriteBlock, WriteVBlock
+
+
+class TestCoalescer(unittest.TestCase):
+    _CONTENTS = os.urandom(4096 * 16)
+    _TEST_FILE_NAME = 'test_coalesce.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.remove(self._TEST_FILE_NAME)
+
+    def _reap_all(self, coalescer: Coalescer, count: int):
+        events = list()
+        while len(events) < count:
+            events.extend(coalescer.get_events(1, 16))
+        return events
+
+    def test_merge_reads(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx:
+            coalescer = Coalescer(ctx)
+            blocks = [ReadBlock(fp, bytearray(4096), offset=4096 * i) for i in range(8)]
+
+            self.assertEqual(8, coalescer.submit(*blocks))
+            self.assertEqual(1, coalescer.in_flight)
+
+            events = self._reap_all(coalescer, 8)
+
+            self.assertEqual(0, coalescer.in_flight)
+            self.assertEqual(set(blocks), set(event.aio_block for event in events))
+            for event in events:
+                self.assertEqual(4096, event.response)
+                offset = event.aio_block.offset
+                self.assertEqual(self._CONTENTS[offset:offset + 4096], event.buffer)
+
+    def test_merge_writes(self):
+        with open(self._TEST_FILE_NAME, 'r+b') as fp, AIOContext(4) as ctx:
+            coalescer = Coalescer(ctx)
+            contents = [os.urandom(1000) for _ in range(5)]
+            blocks = [WriteBlock(fp, content, offset=1000 * i) for i, content in enumerate(contents)]
+
+            self.assertEqual(5, coalescer.submit(*blocks))
+            self.assertEqual(1, coalescer.in_flight)
+
+            for event in self._reap_all(coalescer, 5):
+                self.assertEqual(1000, event.response)
+
+            fp.seek(0)
+            self.assertEqual(b''.join(contents), fp.read(5000))
+
+    def test_short_read(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx:
+            coalescer = Coalescer(ctx)
+            end = len(self._CONTENTS)
+            blocks = [ReadBlock(fp, bytearray(4096), offset=end - 6000 + 4096 * i) for i in range(3)]
+
+            coalescer.submit(*blocks)
+            responses = {event.aio_block: event.response for event in self._reap_all(coalescer, 3)}
+
+            self.assertEqual([4096, 6000 - 4096, 0], [responses[block] for block in blocks])
+
+    def test_gap(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx:
+            blocks = [ReadBlock(fp, bytearray(100), offset=offset) for offset in (0, 150, 300)]
+
+            coalescer = Coalescer(ctx)
+            coalescer.submit(*blocks)
+            self.assertEqual(0, coalescer.in_flight)
+            self._reap_all(coalescer, 3)
+
+            coalescer = Coalescer(ctx, max_gap=50)
+            coalescer.submit(*blocks)
+            self.assertEqual(1, coalescer.in_flight)
+
+            for event in self._reap_all(coalescer, 3):
+                offset = event.aio_block.offset
+                self.assertEqual(100, event.response)
+                self.assertEqual(self._CONTENTS[offset:offset + 100], event.buffer)
+
+    def test_limits(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(8) as ctx:
+            blocks = [ReadBlock(fp, bytearray(1024), offset=1024 * i) for i in range(10)]
+
+            coalescer = Coalescer(ctx, max_iov=4)
+            self.assertEqual(10, coalescer.submit(*blocks))
+            self.assertEqual(3, coalescer.in_flight)
+            self.assertEqual(10, len(self._reap_all(coalescer, 10)))
+
+            coalescer = Coalescer(ctx, max_bytes=5000)
+            self.assertEqual(10, coalescer.submit(*blocks))
+            self.assertEqual(3, coalescer.in_flight)
+            self.assertEqual(10, len(self._reap_all(coalescer, 10)))
+
+    def test_not_merged(self):
+        with open(self._TEST_FILE_NAME, 'r+b') as fp, AIOContext(8) as ctx:
+            coalescer = Coalescer(ctx)
+            blocks = (
+                ReadBlock(fp, bytearray(10), offset=0),
+                WriteBlock(fp, b'x' * 10, offset=10),
+                ReadBlock(fp, bytearray(10), offset=100),
+                ReadBlock(fp, bytearray(10), offset=50),
+                FsyncBlock(fp),
+                FsyncBlock(fp),
+            )
+
+            self.assertEqual(6, coalescer.submit(*blocks))
+            self.assertEqual(0, coalescer.in_flight)
+
+            events = self._reap_all(coalescer, 6)
+            self.assertEqual(set(blocks), set(event.aio_block for event in events))
+            self.assertFalse(any(isinstance(event.aio_block, (ReadVBlock, WriteVBlock)) for event in events))
+
+    def test_invalid_args(self):
+        with AIOContext(1) as ctx:
+            with self.assertRaises(ValueError):
+                Coalescer(ctx, max_bytes=0)
+            with self.assertRaises(ValueError):
+                Coalescer(ctx, max_gap=-1)
+            with self.assertRaises(ValueError):
+                Coalescer(ctx, max_iov=1 << 20)
@@ -1,9 +1,15 @@
 # coding: UTF-8
 
 import errno
+import select
+import threading
+import time
 import unittest
+from unittest import mock
 
-from linux_aio import AIOContext
+import os
+
+from linux_aio import AIOContext, AIOEventBuffer, PollBlock, WriteBlock
 
 
 class TestContext(unittest.TestCase):
@@ -64,3 +70,449 @@ class TestContext(unittest.TestCase):
             self.assertTupleEqual(tuple(), events_ret)
 
         self.assertTrue(ctx.closed)
+
+    def test_getevents_from_ring(self):
+        with AIOContext(2) as ctx, open('test_ring.txt', 'w+') as fp:
+            blocks = tuple(WriteBlock(fp, 'contents', offset=i * 8) for i in range(2))
+            self.assertEqual(2, ctx.submit(*blocks))
+
+            # wait for the completions through the syscall without consuming them
+            while ctx._ring.tail == ctx._ring.head:
+                time.sleep(0.001)
+
+            with mock.patch('linux_aio.aio_context.io_getevents', side_effect=AssertionError):
+                events = ctx.get_events(1, 2)
+
+            if len(events) < 2:
+                events += ctx.get_events(2 - len(events), 2)
+
+            self.assertSetEqual(set(blocks), set(event.aio_block for event in events))
+            self.assertTrue(all(event.response == 8 for event in events))
+            self.assertEqual(ctx._ring.head, ctx._ring.tail)
+
+        os.remove('test_ring.txt')
+
+    def test_getevents_wrap_around(self):
+        with AIOContext(2) as ctx, open('test_ring.txt', 'w+') as fp:
+            nr = ctx._ring.nr
+            blocks = (WriteBlock(fp, 'contents'), WriteBlock(fp, 'contents'))
+
+            for _ in range(nr + 3):
+                self.assertEqual(2, ctx.submit(*blocks))
+                events = ctx.get_events(2, 2)
+                self.assertEqual(2, len(events))
+                self.assertSetEqual(set(blocks), set(event.aio_block for event in events))
+                self.assertTrue(all(event.response == 8 for event in events))
+
+        os.remove('test_ring.txt')
+
+    def test_reap_into_buffer(self):
+        event_buffer = AIOEventBuffer(4)
+        self.assertEqual(4, event_buffer.capacity)
+        self.assertEqual(0, len(event_buffer))
+
+        with AIOContext(4) as ctx, open('test_ring.txt', 'w+') as fp:
+            for _ in range(2):
+                blocks = tuple(WriteBlock(fp, 'contents'[:i + 1], offset=i) for i in range(3))
+                self.assertEqual(3, ctx.submit(*blocks))
+
+                completed = 0
+                while completed < 3:
+                    self.assertEqual(ctx.reap(event_buffer, 1), len(event_buffer))
+
+                    for event in event_buffer:
+                        self.assertEqual(blocks.index(event.aio_block) + 1, event.response)
+                        self.assertEqual(0, event.response2)
+                        self.assertEqual(event_buffer.response(event.index), event.response)
+                        completed += 1
+
+            self.assertEqual(0, ctx.reap(event_buffer))
+            self.assertEqual(0, len(event_buffer))
+
+        os.remove('test_ring.txt')
+
+    def test_event_buffer_wo_capacity(self):
+        with self.assertRaises(ValueError):
+            AIOEventBuffer(0)
+
+    def test_enqueue_n_flush(self):
+        with AIOContext(2) as ctx, open('test_ring.txt', 'w+') as fp:
+            blocks = tuple(WriteBlock(fp, 'contents', offset=i * 8) for i in range(ctx._ring.nr * 2))
+            ctx.enqueue(*blocks)
+            self.assertEqual(len(blocks), ctx.queued)
+
+            completed = set()
+            submitted = 0
+            while len(completed) < len(blocks):
+                submitted += ctx.flush()
+                self.assertEqual(len(blocks), submitted + ctx.queued)
+
+                completed.update(event.aio_block for event in ctx.get_events(1, len(blocks)))
+
+            self.assertEqual(0, ctx.queued)
+            self.assertSetEqual(set(blocks), completed)
+
+            fp.seek(0)
+            self.assertEqual('contents' * len(blocks), fp.read())
+
+        os.remove('test_ring.txt')
+
+    def test_flush_drops_failed_block(self):
+        with AIOContext(2) as ctx, open('test_ring.txt', 'w+') as fp:
+            read_fd = os.open('test_ring.txt', os.O_RDONLY)
+            blocks = (WriteBlock(fp, 'contents'), WriteBlock(read_fd, 'contents'), WriteBlock(fp, 'contents'))
+            ctx.enqueue(*blocks)
+
+            with self.assertRaises(OSError) as cm:
+                ctx.flush()
+            # the first block was submitted by an earlier batch before the second one failed
+            self.assertEqual(1, cm.exception.submitted)
+            self.assertEqual(1, ctx.in_flight_ops)
+            self.assertEqual(1, ctx.queued)
+
+            self.assertEqual(1, ctx.flush())
+            self.assertEqual(0, ctx.queued)
+            self.assertEqual(0, ctx.flush())
+
+            os.close(read_fd)
+
+        os.remove('test_ring.txt')
+
+    def test_submit_more_than_max_jobs(self):
+        with AIOContext(1) as ctx, open('test_ring.txt', 'w+') as fp:
+            blocks = tuple(WriteBlock(fp, 'contents') for _ in range(4))
+            self.assertEqual(4, ctx.submit(*blocks))
+            self.assertEqual(4, len(ctx.get_events(4, 4)))
+
+        os.remove('test_ring.txt')
+
+    def test_run_completions(self):
+        with AIOContext(4) as ctx, open('test_ring.txt', 'w+') as fp:
+            calls = list()
+            blocks = tuple(WriteBlock(fp, 'contents', offset=8 * i) for i in range(3))
+
+            for idx, block in enumerate(blocks[:2]):
+                block.set_callback(lambda b, res, res2: calls.append((b.user_data, res, res2)), idx)
+            self.assertIsNone(blocks[2].callback)
+
+            ctx.submit(*blocks)
+
+            count = 0
+            while count < 3:
+                count += ctx.run_completions()
+
+            self.assertEqual([(0, 8, 0), (1, 8, 0)], sorted(calls))
+
+            defaults = list()
+            blocks[0].callback = None
+            ctx.submit(blocks[0])
+            while ctx.run_completions(default=lambda b, res, res2: defaults.append(b)) == 0:
+                pass
+
+            self.assertEqual([blocks[0]], defaults)
+
+        os.remove('test_ring.txt')
+
+    def test_run_completions_wo_pointers(self):
+        with AIOContext(4) as ctx, open('test_ring.txt', 'w+') as fp:
+            self.assertFalse(ctx.indexed)
+
+            calls = list()
+            blocks = tuple(WriteBlock(fp, 'contents', offset=8 * i) for i in range(3))
+            for block in blocks:
+                block.callback = lambda b, res, res2: calls.append(b)
+
+            # blocks with a callback are found through the slot table, not through `py_object.from_address`
+            with mock.patch('linux_aio.aio_context.py_object') as py_object:
+                py_object.from_address.side_effect = AssertionError
+                ctx.submit(*blocks)
+
+                count = 0
+                while count < 3:
+                    count += ctx.run_completions()
+
+            self.assertEqual(set(blocks), set(calls))
+            self.assertIsNone(ctx.in_flight)
+
+        os.remove('test_ring.txt')
+
+    def test_run_completions_raises_after_dispatch(self):
+        with AIOContext(4) as ctx, open('test_ring.txt', 'w+') as fp:
+            calls = list()
+
+            def fail(block, res, res2):
+                calls.append(block)
+                raise RuntimeError(block)
+
+            blocks = tuple(WriteBlock(fp, 'contents') for _ in range(2))
+            for block in blocks:
+                block.callback = fail
+
+            ctx.submit(*blocks)
+            while len(calls) < 2:
+                try:
+                    ctx.run_completions(min_jobs=2)
+                except RuntimeError:
+                    pass
+
+            self.assertEqual(set(blocks), set(calls))
+
+        os.remove('test_ring.txt')
+
+    def test_indexed(self):
+        with AIOContext(4, indexed=True) as ctx, open('test_ring.txt', 'w+') as fp:
+            self.assertTrue(ctx.indexed)
+            self.assertEqual((), ctx.in_flight)
+
+            blocks = tuple(WriteBlock(fp, 'contents', offset=8 * i) for i in range(3))
+            self.assertEqual(3, ctx.submit(*blocks))
+            self.assertEqual(set(blocks), set(ctx.in_flight))
+
+            events = list()
+            while len(events) < 3:
+                events.extend(ctx.get_events(1, 3))
+
+            self.assertEqual(set(blocks), set(event.aio_block for event in events))
+            self.assertEqual((), ctx.in_flight)
+            # a block needs no reference to itself
+            self.assertTrue(all(block._py_obj is None for block in blocks))
+
+            ctx.submit(*blocks)
+            event_buffer = AIOEventBuffer(4)
+            reaped = list()
+            while len(reaped) < 3:
+                ctx.reap(event_buffer, 1)
+                reaped.extend(event.aio_block for event in event_buffer)
+            self.assertEqual(set(blocks), set(reaped))
+
+            ctx.submit(*blocks)
+            reaped.clear()
+            for block in blocks:
+                block.callback = lambda b, res, res2: reaped.append(b)
+            while len(reaped) < 3:
+                ctx.run_completions()
+            self.assertEqual(set(blocks), set(reaped))
+            self.assertEqual((), ctx.in_flight)
+
+        os.remove('test_ring.txt')
+
+    def test_indexed_frees_rejected_slots(self):
+        with AIOContext(2, indexed=True) as ctx, open('test_ring.txt', 'w+') as fp:
+            read_fd = os.open('test_ring.txt', os.O_RDONLY)
+            blocks = (WriteBlock(fp, 'contents'), WriteBlock(read_fd, 'contents'))
+
+            self.assertEqual(1, ctx.submit(*blocks))
+            self.assertEqual((blocks[0],), ctx.in_flight)
+
+            with self.assertRaises(OSError):
+                ctx.submit(blocks[1])
+            self.assertEqual((blocks[0],), ctx.in_flight)
+
+            self.assertEqual(blocks[0], ctx.get_events(1, 1)[0].aio_block)
+            self.assertEqual((), ctx.in_flight)
+
+            os.close(read_fd)
+
+        os.remove('test_ring.txt')
+
+    def test_not_indexed(self):
+        with AIOContext(1) as ctx:
+            self.assertFalse(ctx.indexed)
+            self.assertIsNone(ctx.in_flight)
+
+    def test_deadline(self):
+        r_fd, w_fd = os.pipe()
+
+        for indexed in (False, True):
+            with AIOContext(4, indexed=indexed) as ctx:
+                block = PollBlock(r_fd, select.POLLIN)
+                block.timeout_ns = 50_000_000
+                self.assertEqual(1, ctx.submit(block))
+
+                # the wait is cut at the deadline to cancel the block
+                start = time.monotonic()
+                events = ctx.get_events(1, 4)
+                self.assertLess(time.monotonic() - start, 5)
+
+                self.assertEqual(1, len(events))
+                self.assertIs(block, events[0].aio_block)
+                self.assertTrue(events[0].timed_out)
+                self.assertEqual((), ctx.expired)
+
+                # a timeout shorter than the deadline is kept
+                block.timeout_ns = 20_000_000
+                ctx.submit(block)
+                self.assertEqual((), ctx.get_events(1, 4, timeout_ns=1_000_000))
+
+                event_buffer = AIOEventBuffer(4)
+                while ctx.reap(event_buffer, 1) == 0:
+                    pass
+                self.assertTrue(all(event.timed_out for event in event_buffer))
+
+                ctx.submit(block)
+                results = list()
+                while not results:
+                    ctx.run_completions(default=lambda b, res, res2: results.append(('default', b)),
+                                        on_timeout=lambda b, res, res2: results.append(('timeout', b)))
+                self.assertEqual([('timeout', block)], results)
+
+                # without `on_timeout`, the result of the kernel goes to the callback as it is
+                ctx.submit(block)
+                results.clear()
+                while not results:
+                    ctx.run_completions(default=lambda b, res, res2: results.append(res))
+                self.assertNotEqual([-errno.ETIMEDOUT], results)
+
+        os.close(r_fd)
+        os.close(w_fd)
+
+    def test_completed_before_deadline(self):
+        with AIOContext(4) as ctx, open('test_ring.txt', 'w+') as fp:
+            block = WriteBlock(fp, 'contents')
+            block.timeout_ns = 10_000_000_000
+            ctx.submit(block)
+
+            event = ctx.get_events(1, 1)[0]
+            self.assertEqual(8, event.response)
+            self.assertFalse(event.timed_out)
+
+            with self.assertRaises(ValueError):
+                block.timeout_ns = -1
+
+        os.remove('test_ring.txt')
+
+    def test_completed_deadlines_are_dropped(self):
+        with AIOContext(64) as ctx, open('test_ring.txt', 'w+') as fp:
+            blocks = tuple(WriteBlock(fp, 'contents', offset=8 * i) for i in range(64))
+            for block in blocks:
+                block.timeout_ns = 60_000_000_000
+
+            for _ in range(4):
+                ctx.submit(*blocks)
+                reaped = 0
+                while reaped < len(blocks):
+                    reaped += len(ctx.get_events(1, len(blocks)))
+
+                # nothing is left to cut waits at, or to keep the blocks alive
+                self.assertEqual([], ctx._deadlines)
+                self.assertEqual(0, ctx._stale_deadlines)
+
+            # entries of completed blocks do not pile up behind a live deadline
+            r_fd, w_fd = os.pipe()
+            poll = PollBlock(r_fd, select.POLLIN)
+            poll.timeout_ns = 60_000_000_000
+            ctx.submit(poll)
+
+            for _ in range(4):
+                ctx.submit(*blocks[:32])
+                reaped = 0
+                while reaped < 32:
+                    reaped += len(ctx.get_events(1, 32))
+                self.assertLessEqual(len(ctx._deadlines), 33)
+                self.assertIs(poll, ctx._deadlines[0][2])
+
+            os.write(w_fd, b'x')
+            self.assertIs(poll, ctx.get_events(1, 1)[0].aio_block)
+            self.assertEqual([], ctx._deadlines)
+
+            os.close(r_fd)
+            os.close(w_fd)
+
+        os.remove('test_ring.txt')
+
+    def test_in_flight_accounting(self):
+        with AIOContext(4, max_in_flight_bytes=20) as ctx, open('test_ring.txt', 'w+') as fp:
+            self.assertEqual(4, ctx.max_jobs)
+            self.assertEqual(20, ctx.max_in_flight_bytes)
+
+            blocks = tuple(WriteBlock(fp, 'contents', offset=8 * i) for i in range(6))
+            ctx.enqueue(*blocks)
+
+            # 2 writes of 8 bytes fit in 20 bytes
+            self.assertEqual(2, ctx.flush())
+            self.assertEqual(2, ctx.in_flight_ops)
+            self.assertEqual(16, ctx.in_flight_bytes)
+            self.assertFalse(ctx.has_capacity(1, 8))
+            self.assertTrue(ctx.has_capacity(1, 4))
+            self.assertEqual(0, ctx.flush())
+
+            reaped = 0
+            while reaped < 6:
+                reaped += len(ctx.get_events(1, 4))
+                ctx.flush()
+                self.assertLessEqual(ctx.in_flight_bytes, 20)
+
+            self.assertEqual(0, ctx.in_flight_ops)
+            self.assertEqual(0, ctx.in_flight_bytes)
+
+            # a request larger than the budget is admitted alone
+            blocks = (WriteBlock(fp, 'x' * 32), WriteBlock(fp, 'contents'))
+            ctx.enqueue(*blocks)
+            self.assertEqual(1, ctx.flush())
+            self.assertEqual(32, ctx.in_flight_bytes)
+            ctx.get_events(1, 1)
+            self.assertEqual(1, ctx.flush())
+            ctx.get_events(1, 1)
+
+        os.remove('test_ring.txt')
+
+    def test_ops_budget(self):
+        with AIOContext(2) as ctx, open('test_ring.txt', 'w+') as fp:
+            # blocks are kept alive until they are reaped
+            blocks = tuple(WriteBlock(fp, 'contents') for _ in range(3))
+            ctx.enqueue(*blocks)
+            self.assertEqual(2, ctx.flush())
+            self.assertEqual(1, ctx.queued)
+            self.assertEqual(0, ctx.in_flight_bytes)
+            self.assertFalse(ctx.has_capacity())
+            self.assertFalse(ctx.wait_for_capacity(timeout=0.01))
+
+            waiter = threading.Thread(target=lambda: ctx.get_events(2, 2))
+            waiter.start()
+            self.assertTrue(ctx.wait_for_capacity(2, timeout=5))
+            waiter.join()
+
+            self.assertEqual(1, ctx.flush())
+            ctx.get_events(1, 1)
+            self.assertEqual(0, ctx.in_flight_ops)
+
+        os.remove('test_ring.txt')
+
+    def test_concurrent_submit_n_reap(self):
+        producers = 4
+        per_producer = 500
+
+        with AIOContext(8, max_in_flight_bytes=64) as ctx, open('test_ring.txt', 'w+') as fp:
+            # blocks are kept alive until they are reaped
+            blocks = [[WriteBlock(fp, 'contents', offset=8 * (i % 8)) for i in range(per_producer)]
+                      for _ in range(producers)]
+
+            def produce(own_blocks):
+                for block in own_blocks:
+                    while True:
+                        self.assertTrue(ctx.wait_for_capacity(1, 8, timeout=5))
+                        try:
+                            ctx.submit(block)
+                            break
+                        except BlockingIOError:
+                            # the capacity is taken by another producer
+                            pass
+
+            threads = [threading.Thread(target=produce, args=(own_blocks,), daemon=True) for own_blocks in blocks]
+            for thread in threads:
+                thread.start()
+
+            # broken accounting stalls the producers, which fails here instead of hanging
+            reaped = 0
+            end = time.monotonic() + 30
+            while reaped < producers * per_producer and time.monotonic() < end:
+                reaped += len(ctx.get_events(1, 8, timeout_ns=100_000_000))
+            self.assertEqual(producers * per_producer, reaped)
+
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(0, ctx.in_flight_ops)
+            self.assertEqual(0, ctx.in_flight_bytes)
+
+        os.remove('test_ring.txt')
@@ -0,0 +1,115 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+from unittest import mock
+
+from linux_aio import AIOContext, ReadBlock
+from linux_aio.aio_event import AIOEvent
+from linux_aio.copy import copy_file, main, parse_size
+from linux_aio_bind import IOEvent
+
+
+class TestCopy(unittest.TestCase):
+    _CONTENTS = os.urandom(4096 * 10 + 123)
+    _SRC_FILE_NAME = 'test_copy_src.txt'
+    _DST_FILE_NAME = 'test_copy_dst.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._SRC_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+
+        for name in (self._SRC_FILE_NAME, self._DST_FILE_NAME):
+            if os.path.exists(name):
+                os.remove(name)
+
+    def _read_dst(self) -> bytes:
+        with open(self._DST_FILE_NAME, 'rb') as fp:
+            return fp.read()
+
+    def test_copy(self):
+        copied = copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=4096, depth=3)
+
+        self.assertEqual(len(self._CONTENTS), copied)
+        self.assertEqual(self._CONTENTS, self._read_dst())
+
+    def test_overwrite(self):
+        with open(self._DST_FILE_NAME, 'wb') as fp:
+            fp.write(b'x' * len(self._CONTENTS) * 2)
+
+        copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=1000, depth=2)
+        self.assertEqual(self._CONTENTS, self._read_dst())
+
+    def test_short_read(self):
+        def get_events(ctx, *args, **kwargs):
+            events = list()
+            for event in get_events.original(ctx, *args, **kwargs):
+                res = event.response
+                if isinstance(event.aio_block, ReadBlock) and res > 1:
+                    # as if the file system returned only the first half, like NFS or FUSE may
+                    res //= 2
+                events.append(AIOEvent(IOEvent(0, 0, res, 0), event.aio_block))
+            return tuple(events)
+
+        get_events.original = AIOContext.get_events
+        with mock.patch.object(AIOContext, 'get_events', get_events):
+            copied = copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=4096, depth=3)
+
+        self.assertEqual(self._CONTENTS, self._read_dst())
+        self.assertEqual(len(self._CONTENTS), copied)
+
+    def test_empty(self):
+        open(self._SRC_FILE_NAME, 'wb').close()
+
+        self.assertEqual(0, copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME))
+        self.assertEqual(b'', self._read_dst())
+
+    def test_sparse(self):
+        hole = 1 << 20
+        with open(self._SRC_FILE_NAME, 'wb') as fp:
+            fp.write(b'head')
+            fp.seek(hole)
+            fp.write(b'body')
+            fp.truncate(hole * 3)
+
+        copied = copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=4096, depth=4)
+        expected = b'head' + bytes(hole - 4) + b'body' + bytes(hole * 2 - 4)
+
+        self.assertEqual(expected, self._read_dst())
+        if copied < len(expected):
+            # the file system reports holes, so only data regions are written
+            self.assertLess(os.stat(self._DST_FILE_NAME).st_blocks * 512, len(expected))
+
+        copied = copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=4096, depth=4, sparse=False)
+        self.assertEqual(len(expected), copied)
+        self.assertEqual(expected, self._read_dst())
+
+    def test_direct(self):
+        try:
+            copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=8192, depth=2, direct=True)
+        except OSError:
+            self.skipTest('O_DIRECT is not supported')
+
+        self.assertEqual(self._CONTENTS, self._read_dst())
+
+    def test_direct_unaligned_chunk(self):
+        with self.assertRaises(ValueError):
+            copy_file(self._SRC_FILE_NAME, self._DST_FILE_NAME, chunk_size=1000, direct=True)
+
+    def test_main(self):
+        self.assertEqual(0, main(['--chunk-size', '4k', '--depth', '2', self._SRC_FILE_NAME, self._DST_FILE_NAME]))
+        self.assertEqual(self._CONTENTS, self._read_dst())
+
+        self.assertEqual(1, main(['not_exists.txt', self._DST_FILE_NAME]))
+
+    def test_parse_size(self):
+        self.assertEqual(4096, parse_size('4096'))
+        self.assertEqual(64 << 10, parse_size('64k'))
+        self.assertEqual(1 << 20, parse_size('1M'))
+        self.assertEqual(2 << 30, parse_size('2GiB'))
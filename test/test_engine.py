@@ -0,0 +1,90 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+
+from linux_aio import ReadBlock, ShardedEngine, WriteBlock
+from linux_aio.engine import _parse_cpu_list, numa_nodes
+
+
+class TestShardedEngine(unittest.TestCase):
+    _CONTENTS = os.urandom(4096 * 8)
+    _TEST_FILE_NAME = 'test_engine.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.remove(self._TEST_FILE_NAME)
+
+    def test_read(self):
+        with ShardedEngine(shards=2, max_jobs=4) as engine, open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(2, engine.shards)
+
+            blocks = [ReadBlock(fp, bytearray(4096), offset=4096 * i) for i in range(8)]
+            futures = engine.submit_many(blocks)
+
+            for block, future in zip(blocks, futures):
+                event = future.result(5)
+                self.assertIs(block, event.aio_block)
+                self.assertEqual(4096, event.response)
+                self.assertEqual(self._CONTENTS[block.offset:block.offset + 4096], block.buffer)
+
+    def test_route(self):
+        routed = list()
+
+        def router(block):
+            routed.append(block)
+            return block.offset // 4096
+
+        with ShardedEngine(shards=3, max_jobs=2, router=router) as engine, open(self._TEST_FILE_NAME, 'rb') as fp:
+            futures = [engine.read(fp, bytearray(100), offset=4096 * i) for i in range(6)]
+            self.assertEqual([100] * 6, [future.result(5).response for future in futures])
+
+        self.assertEqual(6, len(routed))
+
+    def test_write_n_error(self):
+        with ShardedEngine(shards=1, max_jobs=2) as engine, open(self._TEST_FILE_NAME, 'r+b') as fp:
+            self.assertEqual(8, engine.write(fp, b'contents').result(5).response)
+
+            read_fd = os.open(self._TEST_FILE_NAME, os.O_RDONLY)
+            with self.assertRaises(OSError):
+                engine.write(read_fd, b'contents').result(5)
+            # rejected by `io_submit`
+            with self.assertRaises(OSError):
+                engine.submit(WriteBlock(read_fd, b'contents', offset=1)).result(5)
+            os.close(read_fd)
+
+            fp.seek(0)
+            self.assertEqual(b'contents', fp.read(8))
+
+    def test_close_waits(self):
+        engine = ShardedEngine(shards=2, max_jobs=1)
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp:
+            futures = [engine.read(fp, bytearray(10), offset=10 * i) for i in range(20)]
+            engine.close()
+
+            self.assertTrue(all(future.done() for future in futures))
+            self.assertEqual([10] * 20, [future.result().response for future in futures])
+
+        with self.assertRaises(ValueError):
+            ShardedEngine(shards=0)
+
+    def test_affinity(self):
+        cpus = sorted(os.sched_getaffinity(0))
+
+        with ShardedEngine(shards=2, cpu_affinity=[cpus[:1]]) as engine, open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(10, engine.read(fp, bytearray(10)).result(5).response)
+
+        with ShardedEngine(shards=1, numa=True) as engine, open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(10, engine.read(fp, bytearray(10)).result(5).response)
+
+    def test_cpu_list(self):
+        self.assertEqual({0, 1, 2, 3, 8, 10, 11}, _parse_cpu_list('0-3,8,10-11\n'))
+        self.assertTrue(all(numa_nodes()))
@@ -0,0 +1,82 @@
+# coding: UTF-8
+
+import threading
+import unittest
+
+import os
+
+from linux_aio import FutureAIOContext, ReadBlock, WriteBlock
+
+
+class TestFutureAIOContext(unittest.TestCase):
+    _CONTENTS = os.urandom(4096 * 4)
+    _TEST_FILE_NAME = 'test_future_context.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.remove(self._TEST_FILE_NAME)
+
+    def test_submit(self):
+        with FutureAIOContext(4) as ctx, open(self._TEST_FILE_NAME, 'rb') as fp:
+            self.assertEqual(4, ctx.max_jobs)
+
+            block = ReadBlock(fp, bytearray(4096), offset=4096)
+            event = ctx.submit(block).result(5)
+
+            self.assertIs(block, event.aio_block)
+            self.assertEqual(4096, event.response)
+            self.assertEqual(self._CONTENTS[4096:8192], block.buffer)
+
+    def test_more_than_max_jobs(self):
+        with FutureAIOContext(2) as ctx, open(self._TEST_FILE_NAME, 'rb') as fp:
+            blocks = [ReadBlock(fp, bytearray(100), offset=100 * i) for i in range(30)]
+            futures = ctx.submit_many(blocks)
+
+            self.assertEqual([100] * 30, [future.result(5).response for future in futures])
+
+    def test_from_threads(self):
+        with FutureAIOContext(8) as ctx, open(self._TEST_FILE_NAME, 'rb') as fp:
+            results = list()
+
+            def run(idx):
+                results.append(bytes(ctx.read(fp, bytearray(16), offset=16 * idx).result(5).buffer))
+
+            threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(sorted(self._CONTENTS[16 * i:16 * (i + 1)] for i in range(8)), sorted(results))
+
+    def test_errors(self):
+        with FutureAIOContext(2) as ctx:
+            read_fd = os.open(self._TEST_FILE_NAME, os.O_RDONLY)
+            with self.assertRaises(OSError):
+                ctx.write(read_fd, b'contents').result(5)
+            os.close(read_fd)
+
+        self.assertTrue(ctx.closed)
+        with self.assertRaises(RuntimeError):
+            ctx.submit(WriteBlock(1, b''))
+
+        with self.assertRaises(ValueError):
+            FutureAIOContext(0)
+
+    def test_close_waits(self):
+        ctx = FutureAIOContext(1)
+
+        with open(self._TEST_FILE_NAME, 'r+b') as fp:
+            futures = [ctx.write(fp, b'%02d' % i, offset=2 * i) for i in range(10)]
+            ctx.close()
+            ctx.close()
+
+            self.assertTrue(all(future.result().response == 2 for future in futures))
+            fp.seek(0)
+            self.assertEqual(b''.join(b'%02d' % i for i in range(10)), fp.read(20))
@@ -0,0 +1,145 @@
+# coding: UTF-8
+
+import select
+import unittest
+
+import os
+from linux_aio_bind import IOCBCMD
+
+from linux_aio import AIOContext, BlockBatch, PollBlock, ReadBlock, ReadVBlock, RecordingHook, TraceHook
+
+
+class _CancelHook(TraceHook):
+    __slots__ = ('canceled',)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.canceled = list()
+
+    def on_cancel(self, record) -> None:
+        self.canceled.append(record)
+
+
+class _FailingHook(TraceHook):
+    def on_submit(self, record) -> None:
+        raise RuntimeError('failing hook')
+
+
+class TestTraceHook(unittest.TestCase):
+    _CONTENTS = os.urandom(4096)
+    _TEST_FILE_NAME = 'test_hooks.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.remove(self._TEST_FILE_NAME)
+
+    def test_records(self):
+        hook = RecordingHook()
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx:
+            self.assertIsNone(ctx.hook)
+            ctx.set_hook(hook)
+            self.assertIs(hook, ctx.hook)
+
+            fd = fp.fileno()
+            read = ReadBlock(fp, bytearray(100), offset=10)
+            read_v = ReadVBlock(fp, (bytearray(16), bytearray(32)), offset=64)
+            ctx.submit(read, read_v)
+
+            reaped = 0
+            while reaped < 2:
+                reaped += len(ctx.get_events(1, 2))
+
+        records = {record.block: record for record in hook.records}
+        self.assertEqual(2, len(records))
+
+        record = records[read]
+        self.assertEqual(fd, record.fd)
+        self.assertEqual(IOCBCMD.PREAD, record.cmd)
+        self.assertEqual(10, record.offset)
+        self.assertEqual(100, record.length)
+        self.assertEqual(100, record.res)
+        self.assertGreaterEqual(record.latency_ns, 0)
+        self.assertIsNone(record.cancel_ns)
+
+        record = records[read_v]
+        self.assertEqual(IOCBCMD.PREADV, record.cmd)
+        self.assertEqual(48, record.length)
+        self.assertEqual(48, record.res)
+
+    def test_sampling(self):
+        hook = RecordingHook(sample_every=3)
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(8) as ctx:
+            ctx.set_hook(hook)
+            blocks = tuple(ReadBlock(fp, bytearray(8), offset=i) for i in range(7))
+            ctx.submit(*blocks)
+
+            reaped = 0
+            while reaped < 7:
+                reaped += len(ctx.get_events(1, 8))
+
+        self.assertEqual({blocks[0], blocks[3], blocks[6]}, {record.block for record in hook.records})
+
+        with self.assertRaises(ValueError):
+            RecordingHook(sample_every=0)
+
+    def test_batch(self):
+        hook = RecordingHook()
+
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4) as ctx:
+            ctx.set_hook(hook)
+            batch = BlockBatch(2, file=fp)
+            batch.set_buffer_slices(bytearray(2048), 1024)
+            batch.set_offsets((0, 1024))
+            ctx.submit_batch(batch)
+
+            reaped = 0
+            while reaped < 2:
+                reaped += len(ctx.get_events(1, 2))
+
+        self.assertEqual([0, 1024], sorted(record.offset for record in hook.records))
+        self.assertTrue(all(record.block is batch and record.res == 1024 for record in hook.records))
+
+    def test_cancel(self):
+        hook = _CancelHook()
+        read_fd, write_fd = os.pipe()
+
+        try:
+            with AIOContext(2) as ctx:
+                ctx.set_hook(hook)
+                block = PollBlock(read_fd, select.POLLIN)
+                ctx.submit(block)
+
+                try:
+                    ctx.cancel(block)
+                except OSError:
+                    # the canceled completion is reaped from the ring (Linux 4.19 or later)
+                    ctx.get_events(1, 1)
+
+            self.assertEqual(1, len(hook.canceled))
+            self.assertIs(block, hook.canceled[0].block)
+            self.assertIsNotNone(hook.canceled[0].cancel_ns)
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_failing_hook(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(2) as ctx:
+            ctx.set_hook(_FailingHook())
+
+            # kept alive until it is reaped
+            block = ReadBlock(fp, bytearray(8))
+            with self.assertWarns(RuntimeWarning):
+                self.assertEqual(1, ctx.submit(block))
+
+            self.assertEqual(1, len(ctx.get_events(1, 1)))
+
+            ctx.set_hook(None)
+            self.assertIsNone(ctx.hook)
@@ -0,0 +1,154 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+import tempfile
+from typing import List
+
+from linux_aio_bind import IOCBRWFlag
+
+from linux_aio import AIOContext, FsyncBlock, NowaitSubmitter, ReadBlock, WriteBlock
+from linux_aio.aio_event import AIOEvent
+
+
+class TestNowaitSubmitter(unittest.TestCase):
+    _TEST_FILE_NAME = 'test_nowait.txt'
+    _CHUNK = 4096
+    _COUNT = 8
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._contents = os.urandom(self._CHUNK * self._COUNT)
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._contents)
+
+        self._fd = os.open(self._TEST_FILE_NAME, os.O_RDWR)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.close(self._fd)
+        os.remove(self._TEST_FILE_NAME)
+
+    def _drop_cache(self) -> None:
+        os.fsync(self._fd)
+        os.posix_fadvise(self._fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def _tmpfs_fd(self) -> int:
+        """a copy of the test file in tmpfs, which refuses RWF_NOWAIT on many kernels"""
+        fd, path = tempfile.mkstemp(dir='/dev/shm')
+        os.unlink(path)
+        os.write(fd, self._contents)
+        return fd
+
+    @classmethod
+    def _reap(cls, submitter: NowaitSubmitter, count: int) -> List[AIOEvent]:
+        events = list()
+        while len(events) < count:
+            events += submitter.get_events(1, count - len(events))
+        return events
+
+    def _read_all(self, fallback: str) -> None:
+        with AIOContext(self._COUNT + 1) as ctx, NowaitSubmitter(ctx, fallback) as submitter:
+            blocks = tuple(ReadBlock(self._fd, bytearray(self._CHUNK), i * self._CHUNK) for i in range(self._COUNT))
+
+            self.assertEqual(self._COUNT, submitter.submit(*blocks))
+            events = self._reap(submitter, self._COUNT)
+
+            self.assertEqual(set(blocks), {event.aio_block for event in events})
+            self.assertTrue(all(event.response == self._CHUNK for event in events))
+            for i, block in enumerate(blocks):
+                self.assertEqual(self._contents[i * self._CHUNK:(i + 1) * self._CHUNK], bytes(block.buffer))
+                self.assertEqual(0, block.rw_flag)
+
+            self.assertEqual(self._COUNT, submitter.fast + submitter.reissued)
+
+        self.assertEqual(0, ctx.in_flight_ops)
+
+    def test_threads(self):
+        self._drop_cache()
+        self._read_all('threads')
+
+    def test_aio(self):
+        self._drop_cache()
+        self._read_all('aio')
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), 'requires tmpfs at /dev/shm')
+    def test_many_fallbacks(self):
+        fd = self._tmpfs_fd()
+        try:
+            with AIOContext(4) as ctx, NowaitSubmitter(ctx) as submitter:
+                for i in range(200):
+                    block = ReadBlock(fd, bytearray(self._CHUNK), (i % self._COUNT) * self._CHUNK)
+                    self.assertEqual(1, submitter.submit(block))
+
+                    # a lost wake-up would block here until the timeout
+                    events = submitter.get_events(1, 1, timeout_ns=5_000_000_000)
+                    self.assertEqual(1, len(events))
+                    self.assertEqual(self._CHUNK, events[0].response)
+        finally:
+            os.close(fd)
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), 'requires tmpfs at /dev/shm')
+    def test_caller_nowait(self):
+        # a block that already asks for RWF_NOWAIT is reissued without it all the same, and gets it back
+        fd = self._tmpfs_fd()
+        try:
+            for fallback in ('aio', 'threads'):
+                with AIOContext(4) as ctx, NowaitSubmitter(ctx, fallback) as submitter:
+                    block = ReadBlock(fd, bytearray(self._CHUNK), rw_flags=IOCBRWFlag.NOWAIT)
+
+                    self.assertEqual(1, submitter.submit(block))
+                    events = submitter.get_events(1, 1, timeout_ns=5_000_000_000)
+                    self.assertEqual(1, len(events))
+                    self.assertEqual(self._CHUNK, events[0].response)
+                    self.assertEqual(IOCBRWFlag.NOWAIT, block.rw_flag)
+        finally:
+            os.close(fd)
+
+    def test_flags_restored(self):
+        with AIOContext(4) as ctx, NowaitSubmitter(ctx) as submitter:
+            block = ReadBlock(self._fd, bytearray(self._CHUNK), rw_flags=IOCBRWFlag.SYNC)
+
+            self.assertEqual(1, submitter.submit(block))
+            self.assertEqual(self._CHUNK, self._reap(submitter, 1)[0].response)
+            self.assertEqual(IOCBRWFlag.SYNC, block.rw_flag)
+
+    def test_writes_and_others(self):
+        data = os.urandom(self._CHUNK)
+
+        with AIOContext(4) as ctx, NowaitSubmitter(ctx) as submitter:
+            write = WriteBlock(self._fd, data, self._CHUNK)
+            self.assertEqual(1, submitter.submit(write))
+            self.assertEqual(self._CHUNK, self._reap(submitter, 1)[0].response)
+
+            # non-RW blocks are submitted as they are
+            fsync = FsyncBlock(self._fd)
+            self.assertEqual(1, submitter.submit(fsync))
+            self.assertEqual(0, self._reap(submitter, 1)[0].response)
+
+        self.assertEqual(data, os.pread(self._fd, self._CHUNK, self._CHUNK))
+
+    def test_full_ring(self):
+        with AIOContext(2) as ctx, NowaitSubmitter(ctx, 'aio') as submitter:
+            # the kernel rounds the ring up, but not this far
+            blocks = tuple(ReadBlock(self._fd, bytearray(self._CHUNK)) for _ in range(4096))
+
+            submitted = submitter.submit(*blocks)
+            self.assertLess(submitted, len(blocks))
+            for block in blocks[submitted:]:
+                self.assertEqual(0, block.rw_flag)
+
+            self._reap(submitter, submitted)
+
+    def test_invalid(self):
+        with AIOContext(1) as ctx:
+            with self.assertRaises(ValueError):
+                NowaitSubmitter(ctx, 'processes')
+            with self.assertRaises(ValueError):
+                NowaitSubmitter(ctx, workers=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+
+from linux_aio import AIOContext, AIOEventBuffer, BlockPool, ReadBlock, WriteBlock, WriteVBlock
+
+
+class TestBlockPool(unittest.TestCase):
+    _CONTENTS = 'contents\n'
+    _TEST_FILE_NAME = 'test_pool.txt'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        os.remove(cls._TEST_FILE_NAME)
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'w') as fp:
+            fp.write(self._CONTENTS)
+
+    def test_invalid_block_type(self):
+        with self.assertRaises(TypeError):
+            BlockPool(WriteVBlock)
+
+    def test_preallocate(self):
+        pool = BlockPool(ReadBlock, 4)
+        self.assertEqual(4, len(pool))
+        self.assertIs(ReadBlock, pool.block_type)
+
+        block = pool.acquire(0, bytearray(4))
+        self.assertEqual(3, len(pool))
+        self.assertIsInstance(block, ReadBlock)
+
+    def test_reuse_read_block(self):
+        pool = BlockPool(ReadBlock)
+
+        with AIOContext(2) as ctx, open(self._TEST_FILE_NAME) as fp:
+            block = pool.acquire(fp, bytearray(64))
+            block.set_priority(2, 1)
+            self.assertEqual(1, ctx.submit(block))
+
+            event = ctx.get_events(1, 1)[0]
+            self.assertEqual(self._CONTENTS.encode(), event.stripped_buffer())
+            pool.release(event.aio_block)
+            self.assertEqual(1, len(pool))
+
+            buffer = bytearray(4)
+            same_block = pool.acquire(fp.fileno(), buffer, offset=2, length=3)
+            self.assertIs(block, same_block)
+            self.assertEqual(0, len(pool))
+            self.assertEqual(0, same_block.flag)
+            self.assertEqual(0, same_block.priority_value)
+            self.assertEqual(fp.fileno(), same_block.file)
+            self.assertEqual(2, same_block.offset)
+            self.assertEqual(3, same_block.length)
+            self.assertIs(buffer, same_block.buffer)
+
+            self.assertEqual(1, ctx.submit(same_block))
+            event = ctx.get_events(1, 1)[0]
+            self.assertEqual(3, event.response)
+            self.assertEqual(self._CONTENTS.encode()[2:5], event.stripped_buffer())
+
+    def test_release_drops_buffer(self):
+        pool = BlockPool(ReadBlock)
+        buffer = bytearray(4)
+
+        block = pool.acquire(0, buffer)
+        with self.assertRaises(BufferError):
+            buffer.extend(b'more')
+
+        # the idle block neither keeps the buffer exported nor refers to it
+        pool.release(block)
+        buffer.extend(b'more')
+        self.assertEqual(8, len(buffer))
+
+    def test_reclaim(self):
+        pool = BlockPool(WriteBlock, max_free=2)
+        event_buffer = AIOEventBuffer(4)
+
+        with AIOContext(4) as ctx, open(self._TEST_FILE_NAME, 'w+') as fp:
+            blocks = tuple(pool.acquire(fp, b'content', offset=i * 7) for i in range(3))
+            # kept alive until it is reaped
+            foreign = ReadBlock(fp, bytearray(4))
+            self.assertEqual(4, ctx.submit(*blocks, foreign))
+
+            reaped = 0
+            while reaped < 4:
+                reaped += ctx.reap(event_buffer, 1)
+                pool.reclaim(event_buffer)
+
+        self.assertEqual(2, len(pool))
+
+        with open(self._TEST_FILE_NAME) as fp:
+            self.assertEqual('content' * 3, fp.read())
+
+    def test_release_foreign_block(self):
+        pool = BlockPool(WriteBlock)
+
+        with self.assertRaises(TypeError):
+            pool.release(ReadBlock(0, bytearray(4)))
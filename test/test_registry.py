@@ -0,0 +1,93 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+
+from linux_aio import AIOContext, FileRegistry, ReadBlock
+
+
+class TestFileRegistry(unittest.TestCase):
+    _TEST_FILE_NAMES = tuple(f'test_registry_{i}.txt' for i in range(3))
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        for i, name in enumerate(self._TEST_FILE_NAMES):
+            with open(name, 'w') as fp:
+                fp.write(f'contents {i}')
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        for name in self._TEST_FILE_NAMES:
+            os.remove(name)
+
+    def test_paths(self):
+        with FileRegistry(max_open=2) as registry:
+            handles = tuple(registry.register(name) for name in self._TEST_FILE_NAMES)
+            self.assertIs(handles[0], registry.register(self._TEST_FILE_NAMES[0]))
+            self.assertIsNot(handles[0], registry.register(self._TEST_FILE_NAMES[0], os.O_RDWR))
+            self.assertEqual(0, registry.open_count)
+
+            fds = [handle.fileno() for handle in handles]
+            self.assertEqual(2, registry.open_count)
+            self.assertTrue(all(fd >= 0 for fd in fds))
+
+            # the least recently used one is evicted and reopened on use
+            self.assertLess(handles[0]._fd, 0)
+            self.assertGreaterEqual(handles[0].fileno(), 0)
+            self.assertEqual(1, registry.reopens)
+            self.assertLess(handles[1]._fd, 0)
+            self.assertTrue(handles[0].verify())
+
+            registry.unregister(handles[0])
+            self.assertTrue(handles[0].closed)
+            with self.assertRaises(ValueError):
+                handles[0].fileno()
+
+        self.assertEqual(0, registry.open_count)
+        self.assertEqual(0, len(registry))
+
+    def test_file_objects(self):
+        registry = FileRegistry()
+
+        fp = open(self._TEST_FILE_NAMES[0])
+        handle = registry.register(fp)
+        self.assertIs(handle, registry.register(fp))
+        self.assertFalse(handle.owned)
+        self.assertEqual(fp.fileno(), handle.fileno())
+
+        fp.close()
+        self.assertTrue(handle.closed)
+        with self.assertRaises(ValueError):
+            handle.fileno()
+
+        fd = os.open(self._TEST_FILE_NAMES[1], os.O_RDONLY)
+        handle = registry.register(fd)
+        self.assertEqual(fd, handle.fileno())
+        self.assertTrue(handle.verify())
+        registry.close()
+        # pinned file descriptors are not closed by the registry
+        os.close(fd)
+
+        with self.assertRaises(AttributeError):
+            registry.register(object())
+
+    def test_context(self):
+        with FileRegistry(max_open=1) as registry, AIOContext(4, registry=registry) as ctx:
+            self.assertIs(registry, ctx.registry)
+            handles = tuple(registry.register(name) for name in self._TEST_FILE_NAMES)
+            blocks = tuple(ReadBlock(handle, bytearray(10)) for handle in handles)
+
+            # every block is built with an fd that is evicted by the next one
+            for i, block in enumerate(blocks):
+                self.assertEqual(1, ctx.submit(block))
+                event = ctx.get_events(1, 1)[0]
+                self.assertEqual(f'contents {i}'.encode(), bytes(event.buffer))
+
+            # reused blocks never submit stale fds
+            for i, block in reversed(tuple(enumerate(blocks))):
+                block.buffer = bytearray(10)
+                self.assertEqual(1, ctx.submit(block))
+                event = ctx.get_events(1, 1)[0]
+                self.assertEqual(f'contents {i}'.encode(), bytes(event.buffer))
@@ -0,0 +1,112 @@
+# coding: UTF-8
+
+import unittest
+
+import asyncio
+import gc
+import selectors
+import socket
+import time
+
+from linux_aio import AIOSelector
+
+
+class TestAIOSelector(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._selector = AIOSelector(16)
+        self._sockets = socket.socketpair()
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        self._selector.close()
+        for sock in self._sockets:
+            sock.close()
+
+    def test_read_write(self):
+        left, right = self._sockets
+        key = self._selector.register(left, selectors.EVENT_READ, 'data')
+
+        self.assertEqual([], self._selector.select(0))
+
+        right.send(b'ping')
+        self.assertEqual([(key, selectors.EVENT_READ)], self._selector.select(1))
+        self.assertEqual('data', key.data)
+
+        # re-armed after being reported, and still ready until it is read
+        self.assertEqual([(key, selectors.EVENT_READ)], self._selector.select(1))
+        self.assertEqual(b'ping', left.recv(4))
+        self.assertEqual([], self._selector.select(0))
+
+        key = self._selector.modify(left, selectors.EVENT_READ | selectors.EVENT_WRITE)
+        self.assertEqual([(key, selectors.EVENT_WRITE)], self._selector.select(1))
+
+    def test_batched_registration(self):
+        pairs = [socket.socketpair() for _ in range(8)]
+        try:
+            keys = [self._selector.register(left, selectors.EVENT_READ, i) for i, (left, _) in enumerate(pairs)]
+            self.assertEqual([], self._selector.select(0))
+            self.assertEqual(len(pairs), self._selector.ctx.in_flight_ops)
+
+            for _, right in pairs[::2]:
+                right.send(b'x')
+
+            ready = list()
+            end = time.monotonic() + 1
+            while len(ready) < 4 and time.monotonic() < end:
+                ready += self._selector.select(0.1)
+            self.assertEqual({key.data for key in keys[::2]}, {key.data for key, _ in ready})
+        finally:
+            for sock_pair in pairs:
+                for sock in sock_pair:
+                    sock.close()
+
+    def test_unregister(self):
+        left, right = self._sockets
+        self._selector.register(left, selectors.EVENT_READ)
+        self._selector.select(0)
+        self._selector.unregister(left)
+
+        # the canceled poll is never reported
+        right.send(b'ping')
+        self.assertEqual([], self._selector.select(0.05))
+        self.assertEqual(0, len(self._selector.get_map()))
+
+    def test_unregister_armed(self):
+        left, right = self._sockets
+
+        for _ in range(200):
+            self._selector.register(left, selectors.EVENT_READ)
+            self._selector.select(0)
+            self._selector.unregister(left)
+
+            # the canceled poll is reaped later, so it must stay alive without the selector's reference
+            gc.collect()
+            right.send(b'x')
+            self.assertEqual([], self._selector.select(0))
+            left.recv(1)
+
+    def test_timeout(self):
+        start = time.monotonic()
+        self.assertEqual([], self._selector.select(0.05))
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_event_loop(self):
+        async def echo() -> bytes:
+            loop = asyncio.get_running_loop()
+            left, right = self._sockets
+            left.setblocking(False)
+            right.setblocking(False)
+
+            await loop.sock_sendall(right, b'hello')
+            return await loop.sock_recv(left, 5)
+
+        loop = asyncio.SelectorEventLoop(AIOSelector())
+        try:
+            self.assertEqual(b'hello', loop.run_until_complete(echo()))
+        finally:
+            loop.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
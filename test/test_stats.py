@@ -0,0 +1,126 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+from linux_aio_bind import IOCBCMD
+
+from linux_aio import AIOContext, BlockBatch, LogHistogram, ReadBlock, WriteBlock
+
+
+class TestStats(unittest.TestCase):
+    _CONTENTS = os.urandom(4096)
+    _TEST_FILE_NAME = 'test_stats.txt'
+
+    def setUp(self) -> None:
+        super().setUp()
+
+        with open(self._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(self._CONTENTS)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        os.remove(self._TEST_FILE_NAME)
+
+    def test_histogram(self):
+        histogram = LogHistogram()
+        self.assertEqual(0, histogram.percentile(50))
+
+        for value in range(1, 1001):
+            histogram.record(value)
+
+        self.assertEqual(1000, histogram.count)
+        self.assertEqual(1, histogram.min)
+        self.assertEqual(1000, histogram.max)
+        self.assertAlmostEqual(500.5, histogram.mean)
+        self.assertEqual(1000, histogram.percentile(100))
+        self.assertAlmostEqual(500, histogram.percentile(50), delta=500 / 8)
+        self.assertAlmostEqual(990, histogram.percentile(99), delta=990 / 8)
+        self.assertEqual(1000, sum(count for _, count in histogram.buckets()))
+        self.assertEqual(tuple(histogram.buckets()), tuple(histogram.copy().buckets()))
+
+        with self.assertRaises(ValueError):
+            histogram.percentile(101)
+
+        merged = LogHistogram()
+        merged.merge(histogram)
+        merged.merge(histogram)
+        self.assertEqual(2000, merged.count)
+        self.assertEqual(1, merged.min)
+        self.assertEqual(histogram.percentile(50), merged.percentile(50))
+
+    def test_disabled(self):
+        with AIOContext(2) as ctx:
+            self.assertIsNone(ctx.stats)
+
+    def test_latency_and_counters(self):
+        with open(self._TEST_FILE_NAME, 'rb+') as fp, AIOContext(4, stats=True) as ctx:
+            blocks = (ReadBlock(fp, bytearray(1024)), ReadBlock(fp, bytearray(1024), offset=1024),
+                      WriteBlock(fp, b'contents'))
+            self.assertEqual(3, ctx.submit(*blocks))
+
+            reaped = 0
+            while reaped < 3:
+                reaped += len(ctx.get_events(1, 4))
+
+            stats = ctx.stats
+            self.assertEqual(1, stats.submit_calls)
+            self.assertEqual(3, stats.submitted)
+            self.assertEqual(3, stats.completed)
+            self.assertEqual(0, stats.errors)
+            self.assertEqual(2048 + 8, stats.bytes)
+            self.assertEqual(2, stats.latency(IOCBCMD.PREAD).count)
+            self.assertEqual(1, stats.latency(IOCBCMD.PWRITE).count)
+            self.assertGreater(stats.latency(IOCBCMD.PREAD).min, 0)
+            self.assertGreaterEqual(stats.getevents_calls + stats.ring_reaps, 1)
+            self.assertEqual(3, stats.submit_sizes.max)
+            self.assertFalse(stats._submitted_ns)
+
+            snapshot = stats.snapshot()
+            self.assertEqual(3, snapshot.counters['completed'])
+            self.assertGreater(snapshot.ops_per_sec(), 0)
+            self.assertGreater(snapshot.bytes_per_sec(), 0)
+
+            # kept alive until it is reaped
+            block = ReadBlock(fp, bytearray(16))
+            ctx.submit(block)
+            ctx.get_events(1, 1)
+            later = stats.snapshot()
+            self.assertEqual(4, later.counters['completed'])
+            self.assertEqual(2, snapshot.latency[IOCBCMD.PREAD].count)
+            self.assertEqual(3, later.latency[IOCBCMD.PREAD].count)
+            self.assertGreater(later.bytes_per_sec(snapshot), 0)
+
+    def test_batch(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(4, stats=True) as ctx:
+            batch = BlockBatch(2, file=fp)
+            batch.set_buffer_slices(bytearray(2048), 1024)
+            batch.set_offsets((0, 1024))
+            self.assertEqual(2, ctx.submit_batch(batch))
+
+            reaped = 0
+            while reaped < 2:
+                reaped += len(ctx.get_events(1, 4))
+
+            stats = ctx.stats
+            self.assertEqual(1, stats.submit_calls)
+            self.assertEqual(2, stats.latency(IOCBCMD.PREAD).count)
+            self.assertEqual(0, stats.errors)
+            self.assertEqual(2048, stats.bytes)
+
+    def test_prometheus(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(2, stats=True) as ctx:
+            block = ReadBlock(fp, bytearray(64))
+            ctx.submit(block)
+            ctx.get_events(1, 1)
+
+            text = ctx.stats.snapshot().to_prometheus(labels={'device': 'sda'})
+
+        lines = text.splitlines()
+        self.assertIn('# TYPE linux_aio_completed_total counter', lines)
+        self.assertIn('linux_aio_completed_total{device="sda"} 1', lines)
+        self.assertIn('linux_aio_bytes_total{device="sda"} 64', lines)
+        self.assertIn('# TYPE linux_aio_latency_seconds histogram', lines)
+        self.assertIn('linux_aio_latency_seconds_count{device="sda",op="pread"} 1', lines)
+        self.assertIn('linux_aio_latency_seconds_bucket{device="sda",op="pread",le="+Inf"} 1', lines)
+        self.assertIn('linux_aio_submit_sizes_count{device="sda"} 1', lines)
@@ -0,0 +1,77 @@
+# coding: UTF-8
+
+import unittest
+
+import os
+
+from linux_aio import AIOContext, StreamReader
+
+
+class TestStreamReader(unittest.TestCase):
+    _CONTENTS = os.urandom(4096 * 10 + 123)
+    _TEST_FILE_NAME = 'test_stream.txt'
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+
+        with open(cls._TEST_FILE_NAME, 'wb') as fp:
+            fp.write(cls._CONTENTS)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        os.remove(cls._TEST_FILE_NAME)
+
+    def test_read_path(self):
+        with StreamReader(self._TEST_FILE_NAME, chunk_size=4096, depth=4) as reader:
+            self.assertEqual(4096, reader.chunk_size)
+            self.assertEqual(4, reader.depth)
+
+            chunks = list(bytes(chunk) for chunk in reader)
+
+        self.assertEqual(11, len(chunks))
+        self.assertEqual(self._CONTENTS, b''.join(chunks))
+
+    def test_read_twice(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, StreamReader(fp, chunk_size=1000, depth=3) as reader:
+            self.assertEqual(self._CONTENTS, b''.join(bytes(chunk) for chunk in reader))
+            self.assertEqual(self._CONTENTS, b''.join(bytes(chunk) for chunk in reader))
+
+    def test_range(self):
+        with open(self._TEST_FILE_NAME, 'rb') as fp, AIOContext(2) as ctx:
+            reader = StreamReader(fp.fileno(), chunk_size=1000, depth=2, offset=100, length=2500, ctx=ctx)
+            self.assertEqual(self._CONTENTS[100:2600], b''.join(bytes(chunk) for chunk in reader))
+            reader.close()
+
+            self.assertFalse(ctx.closed)
+
+    def test_direct(self):
+        try:
+            reader = StreamReader(self._TEST_FILE_NAME, chunk_size=8192, depth=2, direct=True)
+        except OSError:
+            self.skipTest('O_DIRECT is not supported')
+
+        with reader:
+            self.assertEqual(self._CONTENTS, b''.join(bytes(chunk) for chunk in reader))
+
+    def test_stop_early(self):
+        with StreamReader(self._TEST_FILE_NAME, chunk_size=4096, depth=4) as reader:
+            for chunk in reader:
+                self.assertEqual(self._CONTENTS[:4096], bytes(chunk))
+                break
+
+            self.assertEqual(self._CONTENTS, b''.join(bytes(chunk) for chunk in reader))
+
+    def test_empty_file(self):
+        with open('test_stream_empty.txt', 'w'):
+            pass
+
+        with StreamReader('test_stream_empty.txt') as reader:
+            self.assertListEqual([], list(reader))
+
+        os.remove('test_stream_empty.txt')
+
+    def test_invalid_args(self):
+        with self.assertRaises(ValueError):
+            StreamReader(self._TEST_FILE_NAME, depth=0)